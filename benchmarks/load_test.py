@@ -0,0 +1,256 @@
+# benchmarks/load_test.py
+# Load test for main_api: starts the server with the stub LLM, fires concurrent
+# /scan uploads of synthetic ZIPs and records latency percentiles, throughput,
+# error rates and server RSS over time.
+#   python -m benchmarks.load_test --requests 50 --concurrency 8 --output load_summary.json
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import shutil
+import subprocess
+import threading
+
+import httpx
+
+from benchmarks.synthetic_repo import generate_zip
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _proc_rss_kib(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _children(pid: int):
+    kids = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                kids.extend(int(c) for c in f.read().split())
+    except OSError:
+        pass
+    return kids
+
+
+def tree_rss_kib(pid: int) -> int:
+    """
+    RSS of the server plus its child processes (analyzer subprocesses / pool), Linux only.
+    """
+    total, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        total += _proc_rss_kib(p)
+        stack.extend(_children(p))
+    return total
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.samples = []
+        self._done = threading.Event()
+        self.t0 = time.time()
+
+    def run(self):
+        while not self._done.is_set():
+            self.samples.append((round(time.time() - self.t0, 2), tree_rss_kib(self.pid)))
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def start_server(port, extra_env):
+    env = dict(os.environ)
+    env.update({"AUDITOR_LLM_BACKEND": "stub", "AUDITOR_LLM_RPM": "0"})
+    env.update(extra_env)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main_api:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("main_api exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("main_api did not become healthy within 60s")
+
+
+async def run_load(base_url, zips, requests, concurrency, profile, timeout):
+    results = []
+    counter = iter(range(requests))
+    lock = asyncio.Lock()
+
+    async def user(client, uid):
+        while True:
+            async with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            path = zips[i % len(zips)]
+            t0 = time.perf_counter()
+            try:
+                with open(path, "rb") as f:
+                    r = await client.post(
+                        f"{base_url}/scan", params={"profile": profile},
+                        files={"file": (os.path.basename(path), f, "application/zip")},
+                        headers={"X-API-Key": f"loadtest-{uid}"},
+                    )
+                status = r.status_code
+                ok = status == 200 and "total_issues" in r.text
+            except httpx.HTTPError as e:
+                status, ok = type(e).__name__, False
+            results.append({"i": i, "status": status, "ok": ok, "seconds": time.perf_counter() - t0})
+
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(user(client, u) for u in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    return results, elapsed
+
+
+def summarize(results, elapsed, rss_samples, args):
+    ok = [r["seconds"] for r in results if r["ok"]]
+    by_status = {}
+    for r in results:
+        by_status[str(r["status"])] = by_status.get(str(r["status"]), 0) + 1
+
+    def ms(v):
+        return round(v * 1000, 1) if v is not None else None
+
+    return {
+        "config": {
+            "requests": args.requests, "concurrency": args.concurrency, "profile": args.profile,
+            "files_per_repo": args.files, "distinct_repos": args.repos,
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else None,
+        "success": len(ok),
+        "errors": len(results) - len(ok),
+        "error_rate": round((len(results) - len(ok)) / len(results), 4) if results else None,
+        "status_counts": by_status,
+        "latency_ms": {
+            "p50": ms(percentile(ok, 50)), "p95": ms(percentile(ok, 95)), "p99": ms(percentile(ok, 99)),
+            "max": ms(max(ok) if ok else None), "mean": ms(sum(ok) / len(ok) if ok else None),
+        },
+        "server_rss_kib": {
+            "peak": max((s for _, s in rss_samples), default=0),
+            "samples": rss_samples,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test main_api /scan")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--profile", default="deep")
+    parser.add_argument("--files", type=int, default=30, help="Files per generated repo")
+    parser.add_argument("--repos", type=int, default=4, help="Distinct generated ZIPs to rotate through")
+    parser.add_argument("--stub-latency-ms", type=float, default=200, help="Simulated LLM latency")
+    parser.add_argument("--stub-slow-rate", type=float, default=0.0, help="Fraction of LLM calls that are slow")
+    parser.add_argument("--stub-slow-ms", type=float, default=0.0, help="Extra latency of a slow LLM call")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--url", default=None, help="Test an already running server instead of starting one")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra server environment (e.g. AUDITOR_MAX_IN_FLIGHT=2)")
+    parser.add_argument("--output", default="load_test_summary.json")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    proc = None
+    try:
+        zips = []
+        for i in range(args.repos):
+            path = os.path.join(workdir, f"repo_{i}.zip")
+            generate_zip(path, files=args.files, seed=i)
+            zips.append(path)
+
+        if args.url:
+            base_url = args.url.rstrip("/")
+            sampler = None
+        else:
+            port = _free_port()
+            extra = {
+                "AUDITOR_STUB_LATENCY_MS": str(args.stub_latency_ms),
+                "AUDITOR_STUB_SLOW_RATE": str(args.stub_slow_rate),
+                "AUDITOR_STUB_SLOW_MS": str(args.stub_slow_ms),
+            }
+            extra.update(dict(kv.split("=", 1) for kv in args.env))
+            print(f"⚙️  Starting main_api on port {port} (stub LLM, {args.stub_latency_ms:.0f} ms)...")
+            proc = start_server(port, extra)
+            base_url = f"http://127.0.0.1:{port}"
+            sampler = RssSampler(proc.pid)
+            sampler.start()
+
+        print(f"🚀 {args.requests} requests, {args.concurrency} concurrent, profile={args.profile}")
+        results, elapsed = asyncio.run(run_load(base_url, zips, args.requests, args.concurrency, args.profile, args.timeout))
+
+        if sampler:
+            sampler.stop()
+        summary = summarize(results, elapsed, sampler.samples if sampler else [], args)
+        try:
+            # How often slow LLM calls were hedged, and how often the hedge won (AUDITOR_LLM_HEDGE=1)
+            summary["llm_hedging"] = httpx.get(f"{base_url}/llm/hedging", timeout=10).json()
+        except (httpx.HTTPError, ValueError):
+            pass
+
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+        lat = summary["latency_ms"]
+        print(f"\n✅ {summary['success']} ok / {summary['errors']} errors in {summary['elapsed_seconds']}s "
+              f"({summary['throughput_rps']} req/s)")
+        print(f"   latency ms: p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} max={lat['max']}")
+        print(f"   status: {summary['status_counts']}  peak server RSS: {summary['server_rss_kib']['peak'] / 1024:.0f} MiB")
+        hedging = summary.get("llm_hedging")
+        if hedging and hedging.get("enabled"):
+            print(f"   LLM hedging: {hedging['hedged']} of {hedging['calls']} calls hedged, "
+                  f"{hedging['hedge_wins']} won by the hedge")
+        print(f"💾 Summary written to {args.output}")
+        return 0 if summary["success"] else 1
+
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+# benchmarks/run_benchmarks.py
+# Per-stage pipeline benchmarks on synthetic repositories, with a stubbed LLM:
+#   python -m benchmarks.run_benchmarks --scales small,medium
+#   python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+#   python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json
+#   python -m benchmarks.run_benchmarks --scales "" --findings 100000
+import os
+
+# Must be set before repo_tools.llm_client is imported
+os.environ.setdefault("AUDITOR_LLM_BACKEND", "stub")
+os.environ.setdefault("AUDITOR_LLM_RPM", "0")
+
+import sys
+import json
+import random
+import time
+import argparse
+import platform
+import statistics
+import shutil
+import tempfile
+import tracemalloc
+
+from benchmarks.synthetic_repo import generate_zip
+from repo_tools.workspace import WorkspaceManager
+from repo_tools.repo_loader import load_repository
+from repo_tools.static_analyzer_agent import run_static_analyzers
+from repo_tools.llm_code_reviewer_agent import llm_code_reviewer
+from repo_tools.issue_categorizer_agent import merge_and_categorize_issues
+from repo_tools.priority_agent import assign_priorities, summarize_priorities
+from repo_tools.repo_reader_agent import basic_repo_summary
+from repo_tools.issue_record import issues_to_dicts
+from repo_tools.issue_stream import IssueStream
+from graphs.issue_categorizer_node import summarize_categorized
+from graphs.aggregator_node import aggregator_node
+
+# name -> generate_repo() arguments
+SCALES = {
+    "small": {"files": 20, "avg_lines": 60},
+    "medium": {"files": 200, "avg_lines": 80},
+    "large": {"files": 1000, "avg_lines": 100},
+}
+
+STAGES = ["load_repository", "run_static_analyzers", "llm_code_reviewer",
+          "merge_and_categorize_issues", "assign_priorities", "aggregator"]
+
+
+def _run_stages(zip_path, manager):
+    """
+    Runs every stage once, feeding each the previous stage's output.
+    Yields (stage_name, callable) pairs lazily so the caller can time/trace each.
+    """
+    ctx = {}
+    with manager.job() as ws:
+        def load():
+            ctx["repo"] = load_repository(input_path=zip_path, workspace=ws)
+            return len(ctx["repo"]["code_files"])
+
+        def static():
+            r = ctx["repo"]
+            ctx["static"] = run_static_analyzers(r["repo_path"], r["code_files"])
+            return len(ctx["static"])
+
+        def review():
+            r = ctx["repo"]
+            ctx["review"] = llm_code_reviewer(
+                repo_path=r["repo_path"], code_files=r["code_files"],
+                repo_summary=basic_repo_summary(r["repo_path"], r["code_files"]),
+                static_issues=ctx["static"],
+            )
+            return len(ctx["review"]["llm_detected_issues"])
+
+        def categorize():
+            ctx["categorized"] = merge_and_categorize_issues(ctx["static"], ctx["review"]["llm_detected_issues"])
+            return len(ctx["categorized"])
+
+        def prioritize():
+            ctx["prioritized"] = assign_priorities(ctx["categorized"])
+            ctx["priority_summary"] = summarize_priorities(ctx["prioritized"])
+            return len(ctx["prioritized"])
+
+        def aggregate():
+            out = aggregator_node({
+                "repo_summary": {},
+                "overall_quality_score": ctx["review"]["overall_quality_score"],
+                "prioritized_issues": ctx["prioritized"],
+                "priority_summary": ctx["priority_summary"],
+                "categorized_summary": summarize_categorized(ctx["categorized"]),
+            })
+            # Serialization is part of the aggregator's real cost
+            json.dumps(out["final_output"])
+            return out["final_output"]["total_issues"]
+
+        for name, fn in zip(STAGES, [load, static, review, categorize, prioritize, aggregate]):
+            yield name, fn
+
+
+def bench_scale(scale, params, repeat, manager, workdir):
+    zip_path = os.path.join(workdir, f"{scale}.zip")
+    info = generate_zip(zip_path, **params)
+    print(f"\n📐 Scale '{scale}': {info['files']} files, {info['bytes'] / 1024:.0f} KiB")
+
+    timings = {s: [] for s in STAGES}
+    counts = {}
+    for _ in range(repeat):
+        for name, fn in _run_stages(zip_path, manager):
+            t0 = time.perf_counter()
+            counts[name] = fn()
+            timings[name].append(time.perf_counter() - t0)
+
+    # Separate pass for memory: tracemalloc slows Python code down a lot
+    peaks = {}
+    tracemalloc.start()
+    for name, fn in _run_stages(zip_path, manager):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        peaks[name] = max(0, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    results = {}
+    for name in STAGES:
+        secs = statistics.median(timings[name])
+        results[name] = {
+            "seconds": round(secs, 4),
+            "items": counts[name],
+            "items_per_sec": round(counts[name] / secs, 1) if secs > 0 else None,
+            "files_per_sec": round(info["files"] / secs, 1) if secs > 0 else None,
+            "peak_mem_kib": round(peaks[name] / 1024, 1),
+        }
+        r = results[name]
+        print(f"   {name:<30} {r['seconds']:>9.4f}s  {r['items']:>7} items  {r['files_per_sec'] or 0:>10.1f} files/s  {r['peak_mem_kib']:>10.1f} KiB")
+    return {"repo": info, "stages": results}
+
+
+def synthetic_findings(n, files=2000, seed=0):
+    """
+    n raw static-analyzer findings over `files` paths, shaped like the
+    analyzers' output (every finding carries its own copy of its path).
+    """
+    rng = random.Random(seed)
+    tools = [("bandit", "security", "HIGH"), ("flake8", "style", "LOW"),
+             ("radon", "complexity", "MEDIUM"), ("secrets", "security", "HIGH")]
+    findings = []
+    for i in range(n):
+        tool, kind, severity = rng.choice(tools)
+        findings.append({
+            "file": f"pkg_{i % 40}/sub_{i % 7}/module_{i % files}.py",
+            "line": rng.randint(1, 3000),
+            "type": kind,
+            "tool": tool,
+            "severity": severity,
+            "message": f"{tool} finding {i} in generated code",
+        })
+    return findings
+
+
+def _peak(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    secs = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return secs, peak
+
+
+def bench_findings(n, budget):
+    """
+    Categorize + prioritize n findings. Reports the time of each stage and
+    the memory the issue list retains as IssueRecords, plus what one plain
+    dict copy of it adds (the previous representation, copied per stage).
+    Then compares peak memory of the in-memory stages with the streaming
+    IssueStream spilling every `budget` issues.
+    """
+    static = synthetic_findings(n)
+    print(f"\n🧾 Findings: {n}")
+
+    t0 = time.perf_counter()
+    categorized = merge_and_categorize_issues(static, [])
+    t1 = time.perf_counter()
+    prioritized = assign_priorities(categorized)
+    t2 = time.perf_counter()
+    dicts = issues_to_dicts(prioritized)
+    t3 = time.perf_counter()
+    del categorized, prioritized, dicts
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    prioritized = assign_priorities(merge_and_categorize_issues(static, []))
+    records = tracemalloc.get_traced_memory()[0] - base
+    base = tracemalloc.get_traced_memory()[0]
+    dicts = issues_to_dicts(prioritized)
+    as_dicts = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    count = len(prioritized)
+    del dicts, prioritized
+
+    def in_memory():
+        for _ in assign_priorities(merge_and_categorize_issues(static, [])):
+            pass
+
+    def streamed():
+        stream = IssueStream(memory_budget=budget)
+        stream.add_static(static)
+        for _ in stream.finish():
+            pass
+
+    memory_secs, memory_peak = _peak(in_memory)
+    stream_secs, stream_peak = _peak(streamed)
+
+    result = {
+        "issues": count,
+        "categorize_seconds": round(t1 - t0, 4),
+        "prioritize_seconds": round(t2 - t1, 4),
+        "to_dicts_seconds": round(t3 - t2, 4),
+        "records_kib": round(records / 1024, 1),
+        # The dict view shares the records' strings: this is the per-copy overhead
+        "dict_copy_kib": round(as_dicts / 1024, 1),
+        "in_memory_peak_kib": round(memory_peak / 1024, 1),
+        "stream_budget": budget,
+        "stream_peak_kib": round(stream_peak / 1024, 1),
+        # Timed under tracemalloc: only comparable with each other
+        "in_memory_traced_seconds": round(memory_secs, 4),
+        "stream_traced_seconds": round(stream_secs, 4),
+    }
+    print(f"   categorize {result['categorize_seconds']:.4f}s  prioritize {result['prioritize_seconds']:.4f}s  "
+          f"to dicts {result['to_dicts_seconds']:.4f}s")
+    print(f"   records {result['records_kib']:.1f} KiB  (+{result['dict_copy_kib']:.1f} KiB per dict copy)")
+    print(f"   peak in memory {result['in_memory_peak_kib']:.1f} KiB  streamed (budget {budget}) "
+          f"{result['stream_peak_kib']:.1f} KiB")
+    return result
+
+
+def compare(current, baseline, tolerance, min_delta):
+    """
+    Returns a list of human-readable regressions (slower or hungrier than
+    baseline by more than `tolerance`, ignoring differences below min_delta seconds).
+    """
+    regressions = []
+    for scale, data in current["scales"].items():
+        base_scale = baseline.get("scales", {}).get(scale)
+        if not base_scale:
+            continue
+        for stage, r in data["stages"].items():
+            b = base_scale["stages"].get(stage)
+            if not b:
+                continue
+            if r["seconds"] > b["seconds"] * (1 + tolerance) and r["seconds"] - b["seconds"] > min_delta:
+                regressions.append(f"{scale}/{stage}: {b['seconds']}s -> {r['seconds']}s")
+            if b["peak_mem_kib"] and r["peak_mem_kib"] > b["peak_mem_kib"] * (1 + tolerance) and r["peak_mem_kib"] - b["peak_mem_kib"] > 256:
+                regressions.append(f"{scale}/{stage}: {b['peak_mem_kib']} KiB -> {r['peak_mem_kib']} KiB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI Code Auditor stage benchmarks")
+    parser.add_argument("--scales", default="small,medium", help=f"Comma-separated subset of {','.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per scale (median is reported)")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--save-baseline", default=None, help="Write results as a new baseline")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="Ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--findings", type=int, default=0, help="Also benchmark categorize/prioritize on this many synthetic findings")
+    parser.add_argument("--issue-budget", type=int, default=10000, help="Memory budget of the streaming issue stage in the --findings run")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    manager = WorkspaceManager(root=workdir)
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scales": {},
+    }
+
+    try:
+        for scale in [s.strip() for s in args.scales.split(",") if s.strip()]:
+            if scale not in SCALES:
+                parser.error(f"Unknown scale '{scale}'")
+            results["scales"][scale] = bench_scale(scale, SCALES[scale], args.repeat, manager, workdir)
+        if args.findings > 0:
+            results["findings"] = bench_findings(args.findings, args.issue_budget)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print("\n❌ Regressions vs baseline:")
+            for r in regressions:
+                print(f"   {r}")
+            return 1
+        print("\n✅ No regressions vs baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+# benchmarks/synthetic_repo.py
+# Synthetic repository generator for benchmarks and load tests:
+#   python -m benchmarks.synthetic_repo --files 200 --out /tmp/synthetic.zip
+import os
+import random
+import zipfile
+import argparse
+import tempfile
+import shutil
+
+# Snippets that trip the static analyzers the pipeline runs
+PY_SECURITY = [
+    "    result = eval(user_input)\n",
+    "    subprocess.call(user_input, shell=True)\n",
+    "    data = pickle.loads(user_input)\n",
+    "    password = \"hunter2\"\n",
+    "    digest = hashlib.md5(user_input.encode()).hexdigest()\n",
+    "    cursor.execute(\"SELECT * FROM users WHERE id = '%s'\" % user_input)\n",
+]
+PY_STYLE = [
+    "    x=1;y=2 \n",
+    "    very_long_variable_name_for_style_checks = some_function_call(argument_one, argument_two, argument_three)\n",
+    "    l = [ 1,2 ,3 ]\n",
+]
+JS_RISKY = [
+    "  eval(userInput);\n",
+    "  document.innerHTML = userInput;\n",
+    "  const token = \"sk_live_0123456789abcdef\";\n",
+]
+GO_RISKY = [
+    "\texec.Command(\"sh\", \"-c\", userInput).Run()\n",
+    "\tpassword := \"hunter2\"\n",
+]
+
+DEFAULT_MIX = {"py": 0.7, "js": 0.2, "go": 0.1}
+
+
+def _py_function(rng, name, lines, complexity, security, style):
+    out = [f"def {name}(user_input, n=0):\n"]
+    if rng.random() < complexity:
+        # Deeply branched function: radon cyclomatic complexity >= 10
+        for i in range(rng.randint(10, 16)):
+            out.append(f"    if n == {i}:\n        n += {i}\n    elif n > {i * 3}:\n        n -= 1\n")
+    for _ in range(lines):
+        r = rng.random()
+        if r < security:
+            out.append(rng.choice(PY_SECURITY))
+        elif r < security + style:
+            out.append(rng.choice(PY_STYLE))
+        else:
+            out.append(f"    n = n + {rng.randint(1, 9)}\n")
+    out.append("    return n\n\n\n")
+    return out
+
+
+def _py_file(rng, lines, complexity, security, style):
+    out = ["import os\nimport subprocess\nimport pickle\nimport hashlib\n\n\n"]
+    written = 0
+    i = 0
+    while written < lines:
+        body = rng.randint(5, 25)
+        out.extend(_py_function(rng, f"func_{i}", body, complexity, security, style))
+        written += body + 3
+        i += 1
+    return "".join(out)
+
+
+def _js_file(rng, lines, security):
+    out = ["function handler(userInput) {\n"]
+    for _ in range(lines):
+        out.append(rng.choice(JS_RISKY) if rng.random() < security else f"  let v{rng.randint(0, 99)} = {rng.randint(0, 9)};\n")
+    out.append("}\nmodule.exports = handler;\n")
+    return "".join(out)
+
+
+def _go_file(rng, lines, security):
+    out = ["package main\n\nimport \"os/exec\"\n\nfunc handler(userInput string) {\n"]
+    for _ in range(lines):
+        out.append(rng.choice(GO_RISKY) if rng.random() < security else f"\tv := {rng.randint(0, 9)}\n\t_ = v\n")
+    out.append("}\n")
+    return "".join(out)
+
+
+def generate_repo(
+    dest: str,
+    files: int = 50,
+    avg_lines: int = 80,
+    language_mix: dict = None,
+    complexity_density: float = 0.1,
+    security_density: float = 0.02,
+    style_density: float = 0.05,
+    seed: int = 42,
+) -> dict:
+    """
+    Write a deterministic fake repository under `dest`.
+
+    complexity_density: fraction of Python functions made deeply branched
+    security_density / style_density: fraction of body lines that are violations
+    Returns {"files": n, "bytes": total_bytes, "by_language": {...}}.
+    """
+    rng = random.Random(seed)
+    mix = language_mix or DEFAULT_MIX
+    langs, weights = zip(*mix.items())
+    total_bytes = 0
+    by_lang = {}
+
+    for i in range(files):
+        lang = rng.choices(langs, weights)[0]
+        lines = max(5, int(rng.gauss(avg_lines, avg_lines / 4)))
+        pkg = os.path.join(dest, f"pkg_{i % 10}", f"mod_{i // 10 % 10}")
+        os.makedirs(pkg, exist_ok=True)
+
+        if lang == "py":
+            text = _py_file(rng, lines, complexity_density, security_density, style_density)
+        elif lang == "js":
+            text = _js_file(rng, lines, security_density)
+        else:
+            text = _go_file(rng, lines, security_density)
+
+        with open(os.path.join(pkg, f"file_{i}.{lang}"), "w") as f:
+            f.write(text)
+        total_bytes += len(text)
+        by_lang[lang] = by_lang.get(lang, 0) + 1
+
+    return {"files": files, "bytes": total_bytes, "by_language": by_lang}
+
+
+def make_zip(src_dir: str, zip_path: str) -> str:
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as z:
+        for root, dirs, names in os.walk(src_dir):
+            for name in names:
+                full = os.path.join(root, name)
+                z.write(full, os.path.relpath(full, src_dir))
+    return zip_path
+
+
+def generate_zip(zip_path: str, **kwargs) -> dict:
+    """
+    generate_repo() straight into a ZIP archive (the form /scan accepts).
+    """
+    tmp = tempfile.mkdtemp(prefix="synthetic_")
+    try:
+        info = generate_repo(tmp, **kwargs)
+        make_zip(tmp, zip_path)
+        return info
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic repository ZIP")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--avg-lines", type=int, default=80)
+    parser.add_argument("--mix", default="py=0.7,js=0.2,go=0.1", help="Language weights")
+    parser.add_argument("--complexity", type=float, default=0.1)
+    parser.add_argument("--security", type=float, default=0.02)
+    parser.add_argument("--style", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    mix = {k: float(v) for k, v in (p.split("=") for p in args.mix.split(","))}
+    info = generate_zip(
+        args.out, files=args.files, avg_lines=args.avg_lines, language_mix=mix,
+        complexity_density=args.complexity, security_density=args.security,
+        style_density=args.style, seed=args.seed,
+    )
+    print(f"✅ Wrote {args.out}: {info}")
@@ -1,5 +1,9 @@
 # graph/aggregator_node.py
 from langgraph.graph import StateGraph
+from repo_tools.risk_scorer import risk_hotspots
+from repo_tools.dependency_graph import central_files
+from repo_tools.issue_record import issues_to_dicts, IssueDicts
+from repo_tools.issue_stream import RankedIssues
 
 class AggregatorState(dict):
     """
@@ -9,23 +13,65 @@ class AggregatorState(dict):
       - prioritized_issues
       - priority_summary
       - categorized_summary
+      - profile / routing_reason (which pipeline profile produced the report)
+      - llm_routing (review cascade decisions, when the cascade ran)
+      - shard_summaries (monorepos only)
+      - suppressed (baseline suppression counts, when a baseline applied)
+      - risk_scores / risk_hotspots (when the risk prepass ran)
+      - dependency_graph (import graph; its central modules are reported)
     """
 
 def aggregator_node(state: AggregatorState):
 
     print("📦 Running Final Aggregator...")
 
+    # Issues travel between stages as compact IssueRecords; the report gets plain dicts
+    # (a streamed ranking stays lazy, possibly on disk, until the report is serialized)
+    prioritized = state.get("prioritized_issues", [])
+    if isinstance(prioritized, RankedIssues):
+        issues = IssueDicts(prioritized)
+    else:
+        issues = issues_to_dicts(prioritized)
+
     final_output = {
         "project_summary": state.get("repo_summary", {}),
         "quality_score": state.get("overall_quality_score", 5.0),
-        "issues": state.get("prioritized_issues", []),
+        "issues": issues,
         "priority_summary": state.get("priority_summary", {}),
         "category_summary": state.get("categorized_summary", {}),
-        "total_issues": len(state.get("prioritized_issues", [])),
+        "total_issues": len(issues),
+        "profile": state.get("profile", "deep"),
+        "llm_review": {
+            "ran": state.get("llm_stage", "run") == "run",
+            "skipped_reason": state.get("routing_reason"),
+        },
     }
 
+    if state.get("llm_routing"):
+        final_output["llm_review"]["routing"] = state["llm_routing"]
+
+    hotspots = state.get("risk_hotspots") or risk_hotspots(state.get("risk_scores"))
+    if hotspots:
+        final_output["risk_hotspots"] = hotspots
+
+    graph = state.get("dependency_graph")
+    if graph:
+        final_output["dependencies"] = {
+            "files": len(graph["files"]),
+            "edges": graph["edge_count"],
+            "central_modules": central_files(graph, 10),
+        }
+
+    if state.get("suppressed"):
+        final_output["suppressed"] = state["suppressed"]
+
+    if state.get("shard_summaries"):
+        final_output["shards"] = state["shard_summaries"]
+
     state["final_output"] = final_output
-    return state
+    # Only return the new key: reducer-backed fields (shard_results) would
+    # otherwise be appended to themselves
+    return {"final_output": final_output}
 
 
 def build_aggregator_graph():
@@ -1,67 +1,134 @@
-from typing import TypedDict, List, Any, Optional, Dict
+import operator
+from typing import TypedDict, List, Any, Optional, Dict, Annotated
 from langgraph.graph import StateGraph
 
 # Import your nodes (Ensure folder name is consistent: 'graphs' or 'graph')
-from graphs.repo_reader_node import repo_reader_node
+from graphs.repo_reader_node import repo_loader_node, repo_summary_node
 from graphs.static_analyzer_node import static_analyzer_node
+from graphs.risk_node import risk_prepass_node
 from graphs.llm_reviewer_node import llm_reviewer_node
 from graphs.issue_categorizer_node import issue_categorizer_node
 from graphs.priority_node import priority_node
+from graphs.issue_stream_node import issue_stream_node
 from graphs.aggregator_node import aggregator_node
+from graphs.shard_node import (
+    fan_out_shards, shard_pipeline_node, shard_merge_node, SHARD_CONCURRENCY
+)
+from graphs.profile_router_node import (
+    profile_router_node, select_llm_path, normalize_profile, DEFAULT_PROFILE
+)
+from repo_tools.issue_stream import ISSUE_STREAM_ENABLED
 
 # --- DEFINING THE SHARED MEMORY (STATE) ---
 class MultiAgentState(TypedDict, total=False):
     # Inputs
     repo_input: str
     git_url: Optional[str]
+    workspace: Any  # repo_tools.workspace.Workspace owning all scratch files
+    profile: str    # fast | deep | auto
+    sharding: bool  # set False to scan a monorepo as a single project
+    analyzer_pool: Any  # optional shared repo_tools.analyzer_pool.AnalyzerPool
+    baseline: Optional[str]  # accepted-findings file; the repo's own one is used if present
     
     # Agent 1 (Reader)
     repo_path: str
     code_files: List[str]
     repo_summary: Any
+    shards: List[Dict[str, Any]]
+    dependency_graph: Optional[Dict[str, Any]]  # import graph (repo_tools.dependency_graph)
+
+    # Monorepo shards (parallel sub-pipelines, reduced by shard_merge)
+    shard_results: Annotated[List[Dict[str, Any]], operator.add]
+    shard_summaries: List[Dict[str, Any]]
 
     # Agent 2 (Static)
-    static_issues: List[Any]
+    static_issues: List[Any]  # streaming mode: only static_digest.sample
+    static_digest: Any  # streaming mode: repo_tools.static_digest.StaticDigest (what later stages read)
+    suppressed: Optional[Dict[str, Any]]  # baseline suppression counts
+    issue_stream: Any  # streaming mode: repo_tools.issue_stream.IssueStream fed by the analyzers
+
+    # Profile Router
+    llm_stage: str                 # "run" | "skip"
+    routing_reason: Optional[str]
+
+    # Risk prepass (only when the LLM runs)
+    risk_scores: List[Dict[str, Any]]
+    risk_hotspots: List[Dict[str, Any]]  # monorepos: merged top files of every shard
 
     # Agent 3 (LLM Review)
     llm_detected_issues: List[Dict[str, Any]]
     overall_quality_score: float
     llm_recommendations: List[str]
     llm_raw_response: Optional[str]
+    llm_routing: Optional[Dict[str, Any]]  # review cascade decisions (repo_tools.review_cascade)
 
     # Agent 4 (Categorizer)
-    categorized_issues: List[Dict[str, Any]]
+    categorized_issues: List[Any]  # IssueRecords (repo_tools.issue_record)
     categorized_summary: Dict[str, Any]
 
     # Agent 5 (Priority)
-    prioritized_issues: List[Dict[str, Any]]
+    prioritized_issues: Any  # IssueRecords (or issue_stream.RankedIssues); the aggregator emits dicts (lazily for RankedIssues)
     priority_summary: Dict[str, Any]
 
     # Agent 6 (Aggregator - Final Output)
     final_output: Dict[str, Any]
 
 
-def build_full_pipeline():
+def build_full_pipeline(profile: str = DEFAULT_PROFILE, stream_issues: bool = ISSUE_STREAM_ENABLED):
+    """
+    profile: default pipeline profile ("fast", "deep" or "auto"). A "profile"
+    key in the invoke() input overrides it per run.
+    stream_issues: use the fused, memory-bounded issue_stream stage instead of
+    issue_categorizer -> priority_agent.
+    """
+    default_profile = normalize_profile(profile)
+
     # Use the TypedDict State
     graph = StateGraph(MultiAgentState)
 
     # 1. Register Agents
-    graph.add_node("repo_reader", repo_reader_node)
-    graph.add_node("static_analyzer", static_analyzer_node)
+    graph.add_node("repo_reader", repo_loader_node)
+    graph.add_node("static_analyzer", lambda state: static_analyzer_node(state, stream_issues))
+    graph.add_node("profile_router", lambda state: profile_router_node(state, default_profile))
+    graph.add_node("risk_prepass", risk_prepass_node)
+    graph.add_node("llm_repo_reader", repo_summary_node)
     graph.add_node("llm_reviewer", llm_reviewer_node)
-    graph.add_node("issue_categorizer", issue_categorizer_node)
-    graph.add_node("priority_agent", priority_node)
+    graph.add_node("shard_pipeline", shard_pipeline_node)
+    graph.add_node("shard_merge", shard_merge_node)
+    if stream_issues:
+        graph.add_node("issue_stream", issue_stream_node)
+    else:
+        graph.add_node("issue_categorizer", issue_categorizer_node)
+        graph.add_node("priority_agent", priority_node)
     graph.add_node("aggregator", aggregator_node)
 
-    # 2. Build Linear Flow
+    # 2. Build Flow (LLM stages are skipped by the fast/auto profiles;
+    #    monorepos fan out to one shard_pipeline per sub-project)
     graph.set_entry_point("repo_reader")
     
-    graph.add_edge("repo_reader", "static_analyzer")
-    graph.add_edge("static_analyzer", "llm_reviewer")
-    graph.add_edge("llm_reviewer", "issue_categorizer")
-    graph.add_edge("issue_categorizer", "priority_agent")
-    graph.add_edge("priority_agent", "aggregator")
+    graph.add_conditional_edges(
+        "repo_reader",
+        lambda state: fan_out_shards(state, default_profile),
+        ["static_analyzer", "shard_pipeline"],
+    )
+    issue_stage = "issue_stream" if stream_issues else "issue_categorizer"
+    graph.add_edge("shard_pipeline", "shard_merge")
+    graph.add_edge("shard_merge", "issue_stream" if stream_issues else "priority_agent")
+    graph.add_edge("static_analyzer", "profile_router")
+    graph.add_conditional_edges(
+        "profile_router",
+        select_llm_path,
+        {"run": "risk_prepass", "skip": issue_stage},
+    )
+    graph.add_edge("risk_prepass", "llm_repo_reader")
+    graph.add_edge("llm_repo_reader", "llm_reviewer")
+    graph.add_edge("llm_reviewer", issue_stage)
+    if stream_issues:
+        graph.add_edge("issue_stream", "aggregator")
+    else:
+        graph.add_edge("issue_categorizer", "priority_agent")
+        graph.add_edge("priority_agent", "aggregator")
     
     graph.set_finish_point("aggregator")
 
-    return graph.compile()
\ No newline at end of file
+    return graph.compile().with_config(max_concurrency=SHARD_CONCURRENCY)
\ No newline at end of file
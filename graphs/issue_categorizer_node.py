@@ -9,6 +9,16 @@ class CategorizerState(TypedDict, total=False):
     categorized_issues: List[Any]
     categorized_summary: Dict[str, Any]
     
+def summarize_categorized(categorized: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary = {"total": len(categorized), "by_severity": {}, "by_category": {}}
+    for issue in categorized:
+        sev = issue.get("severity", "medium")
+        summary["by_severity"][sev] = summary["by_severity"].get(sev, 0) + 1
+        cat = issue.get("category", "other")
+        summary["by_category"][cat] = summary["by_category"].get(cat, 0) + 1
+    return summary
+
+
 def issue_categorizer_node(state):
     print("🗂️ Running Issue Categorizer...")
 
@@ -20,13 +30,7 @@ def issue_categorizer_node(state):
     # Merge & Categorize
     categorized = merge_and_categorize_issues(static, llm_issues)
 
-    # ... rest of the logic remains the same ...
-    summary = {"total": len(categorized), "by_severity": {}, "by_category": {}}
-    for issue in categorized:
-        sev = issue.get("severity", "medium")
-        summary["by_severity"][sev] = summary["by_severity"].get(sev, 0) + 1
-        cat = issue.get("category", "other")
-        summary["by_category"][cat] = summary["by_category"].get(cat, 0) + 1
+    summary = summarize_categorized(categorized)
 
     return {
         "categorized_issues": categorized,
@@ -0,0 +1,36 @@
+# graph/issue_stream_node.py
+from repo_tools.issue_stream import IssueStream
+from repo_tools.dependency_graph import file_centrality
+
+
+def issue_stream_node(state):
+    """
+    Streaming mode (AUDITOR_ISSUE_STREAM=1): categorize, deduplicate,
+    prioritize and summarize in one memory-bounded pass that spills to disk
+    on noisy repositories. Replaces the issue_categorizer and priority_agent
+    nodes; prioritized_issues is a repo_tools.issue_stream.RankedIssues.
+    """
+    print("🌊 Running Streaming Issue Stage...")
+    # The static analyzer node already fed its issues in as they were produced
+    stream = state.get("issue_stream")
+    if stream is None:
+        stream = IssueStream(
+            centrality=file_centrality(state.get("dependency_graph")),
+            workspace=state.get("workspace"),
+        )
+
+    categorized = state.get("categorized_issues")
+    if categorized is not None:
+        # Monorepos: every shard already categorized its own issues
+        stream.add_records(categorized)
+    else:
+        if state.get("issue_stream") is None:
+            stream.add_static(state.get("static_issues", []))
+        stream.add_llm(state.get("llm_detected_issues", []))
+    ranked = stream.finish()
+
+    return {
+        "categorized_summary": stream.categorized_summary,
+        "prioritized_issues": ranked,
+        "priority_summary": stream.priority_summary,
+    }
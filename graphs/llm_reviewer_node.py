@@ -1,5 +1,6 @@
 # graph/llm_reviewer_node.py
 from langgraph.graph import StateGraph
+from langgraph.config import get_stream_writer
 from repo_tools.llm_code_reviewer_agent import llm_code_reviewer
 
 class LLMReviewState(dict):
@@ -10,6 +11,9 @@ class LLMReviewState(dict):
       - code_files
       - repo_summary (dict)    # from Agent 1
       - static_issues (list)  # from Agent 2
+      - static_digest         # streaming mode: the StaticDigest of Agent 2's issues
+      - risk_scores (list)    # optional, from the risk prepass
+      - dependency_graph      # optional, import graph from the repo loader
     """
 
 def llm_reviewer_node(state: LLMReviewState):
@@ -19,18 +23,26 @@ def llm_reviewer_node(state: LLMReviewState):
     static_issues = state.get("static_issues", [])
 
     print("🧠 Running LLM Code Reviewer...")
+    # Issues go out on the "custom" stream as they arrive (see run_batch progress)
+    writer = get_stream_writer()
 
     result = llm_code_reviewer(
         repo_path=repo_path,
         code_files=code_files,
         repo_summary=repo_summary,
-        static_issues=static_issues
+        static_issues=static_issues,
+        risk_scores=state.get("risk_scores"),
+        dependency_graph=state.get("dependency_graph"),
+        on_issue=lambda issue: writer({"event": "llm_issue", "issue": issue}),
+        static_digest=state.get("static_digest"),
     )
 
     # merge results into state
     state["llm_detected_issues"] = result.get("llm_detected_issues", [])
     state["overall_quality_score"] = result.get("overall_quality_score", 5.0)
     state["llm_recommendations"] = result.get("recommendations", [])
+    if "routing" in result:
+        state["llm_routing"] = result["routing"]
     # keep raw if present for debugging
     if "raw_response" in result:
         state["llm_raw_response"] = result["raw_response"]
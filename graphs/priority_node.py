@@ -1,11 +1,13 @@
 # graph/priority_node.py
 from langgraph.graph import StateGraph
 from repo_tools.priority_agent import assign_priorities, summarize_priorities
+from repo_tools.dependency_graph import file_centrality
 
 class PriorityState(dict):
     """
     Expected inputs:
       - categorized_issues: from Agent 4
+      - dependency_graph: optional, issues in central modules rank higher
     """
     
 def priority_node(state):
@@ -15,7 +17,7 @@ def priority_node(state):
     categorized = state.get("categorized_issues", [])
 
     # Process
-    prioritized = assign_priorities(categorized)
+    prioritized = assign_priorities(categorized, file_centrality(state.get("dependency_graph")))
     summary = summarize_priorities(prioritized)
 
     # Return updates to state
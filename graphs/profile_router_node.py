@@ -0,0 +1,97 @@
+# graph/profile_router_node.py
+import os
+from langgraph.graph import StateGraph
+from typing import TypedDict, List, Any, Optional
+
+# fast = static analysis only, deep = full LLM review, auto = decide per repo
+PROFILES = ("fast", "deep", "auto")
+DEFAULT_PROFILE = "deep"
+
+# "auto" skips the LLM for repos at or below this many bytes of code...
+AUTO_TINY_REPO_BYTES = int(os.getenv("AUDITOR_AUTO_TINY_REPO_BYTES", "4000"))
+# ...or when static analysis found nothing beyond low-severity style noise
+AUTO_IGNORED_TYPES = {"style"}
+
+
+class RouterState(TypedDict, total=False):
+    profile: str
+    code_files: List[str]
+    static_issues: List[Any]
+    static_digest: Optional[Any]
+    llm_stage: str
+    routing_reason: Optional[str]
+
+
+def normalize_profile(profile: Optional[str]) -> str:
+    """
+    Validates a user-supplied profile name. Raises ValueError for unknown names.
+    """
+    profile = (profile or DEFAULT_PROFILE).strip().lower()
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{profile}'. Expected one of: {', '.join(PROFILES)}")
+    return profile
+
+
+def _has_reviewable_findings(static_issues: List[Any]) -> bool:
+    for it in static_issues or []:
+        if not isinstance(it, dict):
+            continue
+        if it.get("type") not in AUTO_IGNORED_TYPES:
+            return True
+        if str(it.get("severity", "")).upper() not in ("LOW", ""):
+            return True
+    return False
+
+
+def _findings(state: RouterState) -> List[Any]:
+    # Streaming mode: one stand-in per kind of finding instead of the full list
+    digest = state.get("static_digest")
+    return digest.kinds() if digest is not None else state.get("static_issues", [])
+
+
+def _repo_bytes(code_files: List[str]) -> int:
+    total = 0
+    for p in code_files or []:
+        try:
+            total += os.path.getsize(p)
+        except OSError:
+            pass
+    return total
+
+
+def profile_router_node(state: RouterState, default_profile: str = DEFAULT_PROFILE):
+    """
+    Decides whether the LLM stages run for this scan and records why.
+    """
+    profile = normalize_profile(state.get("profile") or default_profile)
+
+    if profile == "fast":
+        stage, reason = "skip", "fast profile: static analysis only"
+    elif profile == "deep":
+        stage, reason = "run", None
+    else:
+        size = _repo_bytes(state.get("code_files", []))
+        if size <= AUTO_TINY_REPO_BYTES:
+            stage, reason = "skip", f"auto profile: repository is tiny ({size} bytes of code)"
+        elif not _has_reviewable_findings(_findings(state)):
+            stage, reason = "skip", "auto profile: static analysis found nothing worth reviewing"
+        else:
+            stage, reason = "run", None
+
+    print(f"🧭 Profile '{profile}': LLM review {'skipped' if stage == 'skip' else 'enabled'}")
+    return {"profile": profile, "llm_stage": stage, "routing_reason": reason}
+
+
+def select_llm_path(state: RouterState) -> str:
+    """
+    Conditional edge: "run" -> LLM summarizer/reviewer, "skip" -> categorizer.
+    """
+    return state.get("llm_stage", "run")
+
+
+def build_profile_router_graph():
+    g = StateGraph(RouterState)
+    g.add_node("profile_router", profile_router_node)
+    g.set_entry_point("profile_router")
+    g.set_finish_point("profile_router")
+    return g.compile()
@@ -1,6 +1,11 @@
 from langgraph.graph import StateGraph
 from repo_tools.repo_loader import load_repository
-from repo_tools.repo_reader_agent import llm_repo_reader
+from repo_tools.repo_reader_agent import llm_repo_reader, basic_repo_summary
+from repo_tools.baseline import find_baseline
+from repo_tools.dependency_graph import build_dependency_graph, file_digests, DEP_GRAPH_ENABLED
+from repo_tools.dir_summaries import (
+    build_directory_summaries, select_directory_summaries, cached_repo_summary, get_summary_cache
+)
 from typing import TypedDict, Optional, List, Any
 
 
@@ -10,6 +15,15 @@ class RepoState(TypedDict, total=False):
     repo_path: Optional[str]
     code_files: Optional[List[str]]
     repo_summary: Optional[Any]
+    shards: Optional[List[Any]]
+    workspace: Optional[Any]
+    baseline: Optional[str]  # explicit baseline path in, resolved path out
+    dependency_graph: Optional[Any]  # repo_tools.dependency_graph index
+    analyzer_pool: Optional[Any]     # import parsing runs on its workers
+    # Not used by the loader itself, but read by the shard fan-out edge that
+    # follows it (LangGraph hands edges the node's input schema)
+    profile: Optional[str]
+    sharding: Optional[bool]
 
 def repo_reader_node(state: RepoState):
     repo_input = state.get("repo_input")
@@ -17,7 +31,8 @@ def repo_reader_node(state: RepoState):
 
     repo_data = load_repository(
         input_path=repo_input,
-        git_url=git_url
+        git_url=git_url,
+        workspace=state.get("workspace")
     )
 
     state["repo_path"] = repo_data["repo_path"]
@@ -33,6 +48,61 @@ def repo_reader_node(state: RepoState):
     return state
 
 
+def repo_loader_node(state: RepoState):
+    """
+    Loads the repository only; repo_summary gets the cheap static summary so
+    profiles that skip the LLM still report something useful.
+    """
+    print("📂 Loading Repository...")
+
+    repo_data = load_repository(
+        input_path=state.get("repo_input"),
+        git_url=state.get("git_url"),
+        workspace=state.get("workspace")
+    )
+    repo_path, code_files = repo_data["repo_path"], repo_data["code_files"]
+
+    # Import graph shared by the summary, risk ranking, reviewer and priorities
+    dependency_graph = None
+    if DEP_GRAPH_ENABLED:
+        pool = state.get("analyzer_pool")
+        dependency_graph = build_dependency_graph(
+            repo_path, code_files, executor=pool.executor if pool is not None else None
+        )
+        print(f"🕸️  Import graph: {len(code_files)} files, {dependency_graph['edge_count']} edges")
+
+    return {
+        "repo_path": repo_path,
+        "code_files": code_files,
+        "shards": repo_data.get("shards", []),
+        "repo_summary": basic_repo_summary(repo_path, code_files, dependency_graph),
+        "baseline": find_baseline(repo_path, state.get("baseline")),
+        "dependency_graph": dependency_graph,
+    }
+
+
+def repo_summary_node(state: RepoState):
+    """
+    LLM half of the repo reader: replaces the static summary with Gemini's.
+    """
+    print("📖 Running LLM Repo Reader...")
+    repo_path, code_files = state.get("repo_path"), state.get("code_files", [])
+    graph = state.get("dependency_graph")
+
+    # Bottom-up directory summaries (cached per subtree hash) keep the prompt bounded,
+    # and an unchanged tree reuses the last LLM summary outright
+    cache = get_summary_cache()
+    summaries = build_directory_summaries(
+        repo_path, code_files, digests=file_digests(graph), cache=cache
+    )
+    summary = cached_repo_summary(
+        summaries,
+        lambda: llm_repo_reader(repo_path, code_files, graph, select_directory_summaries(summaries)),
+        cache,
+    )
+    return {"repo_summary": summary}
+
+
 def build_repo_reader_graph():
     graph = StateGraph(RepoState)
     graph.add_node("repo_reader", repo_reader_node)
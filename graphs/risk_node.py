@@ -0,0 +1,42 @@
+# graph/risk_node.py
+from typing import TypedDict, List, Any, Optional, Dict
+from langgraph.graph import StateGraph
+from repo_tools.risk_scorer import score_files
+from repo_tools.dependency_graph import file_centrality
+
+
+class RiskState(TypedDict, total=False):
+    repo_path: str
+    code_files: List[str]
+    static_issues: List[Any]
+    static_digest: Optional[Any]
+    analyzer_pool: Optional[Any]
+    dependency_graph: Optional[Any]
+    risk_scores: List[Dict[str, Any]]
+
+
+def risk_prepass_node(state: RiskState):
+    """
+    Ranks every code file by risk so the LLM reviewer's limited snippet
+    budget goes to the riskiest files and lines.
+    """
+    print("🎯 Running Risk Prepass...")
+    pool = state.get("analyzer_pool")
+    digest = state.get("static_digest")
+    risk_scores = score_files(
+        state.get("repo_path"),
+        state.get("code_files", []),
+        state.get("static_issues", []),
+        executor=pool.executor if pool is not None else None,
+        centrality=file_centrality(state.get("dependency_graph")),
+        static_weights=digest.weights if digest is not None else None,
+    )
+    return {"risk_scores": risk_scores}
+
+
+def build_risk_graph():
+    graph = StateGraph(RiskState)
+    graph.add_node("risk_prepass", risk_prepass_node)
+    graph.set_entry_point("risk_prepass")
+    graph.set_finish_point("risk_prepass")
+    return graph.compile()
@@ -0,0 +1,229 @@
+# graph/shard_node.py
+import os
+from typing import TypedDict, Dict, Any, Optional
+from langgraph.graph import StateGraph
+from langgraph.config import get_stream_writer
+from langgraph.types import Send
+
+from repo_tools.static_analyzer_agent import run_static_analyzers
+from repo_tools.issue_categorizer_agent import merge_and_categorize_issues, static_issue_fingerprint
+from repo_tools.issue_record import by_severity
+from repo_tools.baseline import apply_baseline
+from repo_tools.risk_scorer import score_files, risk_hotspots
+from repo_tools.dependency_graph import file_centrality, file_digests
+from repo_tools.dir_summaries import (
+    build_directory_summaries, select_directory_summaries, cached_repo_summary, get_summary_cache
+)
+from repo_tools.repo_reader_agent import basic_repo_summary
+from graphs.profile_router_node import profile_router_node, DEFAULT_PROFILE
+from graphs.issue_categorizer_node import summarize_categorized
+
+
+# Max shards processed at once (each shard = static tools + up to two LLM calls)
+SHARD_CONCURRENCY = int(os.getenv("AUDITOR_SHARD_CONCURRENCY", str(os.cpu_count() or 4)))
+
+
+class ShardState(TypedDict, total=False):
+    shard: Dict[str, Any]      # {"name", "root", "code_files"} from detect_shards
+    profile: str
+    analyzer_pool: Optional[Any]
+    baseline: Optional[str]
+    dependency_graph: Optional[Any]  # whole-repo import graph (repo-relative paths)
+
+
+def fan_out_shards(state: Dict[str, Any], default_profile: str = DEFAULT_PROFILE):
+    """
+    Conditional edge after the repo reader. Monorepos get one Send per shard
+    (run in parallel by LangGraph); everything else takes the normal path.
+    """
+    shards = state.get("shards") or []
+    if len(shards) < 2 or state.get("sharding") is False:
+        return "static_analyzer"
+
+    profile = state.get("profile") or default_profile
+    print(f"🧩 Monorepo detected: {len(shards)} shards")
+    return [
+        Send("shard_pipeline", {
+            "shard": s, "profile": profile,
+            "analyzer_pool": state.get("analyzer_pool"), "baseline": state.get("baseline"),
+            "dependency_graph": state.get("dependency_graph"),
+        })
+        for s in shards
+    ]
+
+
+def _shard_relative(file: Optional[str], shard_name: str) -> Optional[str]:
+    # Issues come back relative to the shard root; make them repo-relative
+    if not file or os.path.isabs(file) or shard_name == ".":
+        return file
+    return f"{shard_name}/{file}"
+
+
+def shard_pipeline_node(state: ShardState):
+    """
+    Static analysis, optional LLM review and categorization for one shard.
+    """
+    shard = state["shard"]
+    name, root, files = shard["name"], shard["root"], shard["code_files"]
+    print(f"🧩 Shard '{name}': {len(files)} files")
+
+    # The tools only get this shard's code_files (the secret scanner walks the
+    # root but skips nested shards), so findings should already be this shard's;
+    # the filter just drops any a tool reports under some other path
+    owned = {os.path.relpath(f, root).replace(os.sep, "/") for f in files}
+    static_issues = [
+        it for it in run_static_analyzers(
+            root, files, pool=state.get("analyzer_pool"), exclude_dirs=shard.get("nested")
+        )
+        # Secret findings also cover config files, which no shard lists as code
+        if isinstance(it, dict) and (it.get("file") in owned or it.get("tool") == "secrets")
+    ]
+    # Baseline fingerprints use repo-relative paths
+    static_issues, suppressed = apply_baseline(
+        static_issues, state.get("baseline"),
+        fingerprint=lambda it: static_issue_fingerprint(it, file=_shard_relative(it.get("file"), name)),
+    )
+
+    routing = profile_router_node({
+        "profile": state.get("profile"),
+        "code_files": files,
+        "static_issues": static_issues,
+    })
+
+    summary = basic_repo_summary(root, files)
+    llm_issues, score, recommendations, hotspots, llm_routing = [], None, [], [], None
+
+    if routing["llm_stage"] == "run":
+        # Imported lazily: the LLM agents are only needed when the LLM runs
+        from repo_tools.repo_reader_agent import llm_repo_reader
+        from repo_tools.llm_code_reviewer_agent import llm_code_reviewer
+
+        pool = state.get("analyzer_pool")
+        prefix = "" if name == "." else name + "/"
+        risk_scores = score_files(
+            root, files, static_issues,
+            executor=pool.executor if pool is not None else None,
+            centrality=file_centrality(state.get("dependency_graph"), prefix),
+        )
+        hotspots = [dict(h, file=_shard_relative(h["file"], name)) for h in risk_hotspots(risk_scores)]
+
+        cache = get_summary_cache()
+        summaries = build_directory_summaries(
+            root, files, digests=file_digests(state.get("dependency_graph"), prefix), cache=cache
+        )
+        summary = cached_repo_summary(
+            summaries,
+            lambda: llm_repo_reader(root, files, directories=select_directory_summaries(summaries)),
+            cache,
+            kind="shard",
+        )
+        writer = get_stream_writer()
+        review = llm_code_reviewer(
+            repo_path=root,
+            code_files=files,
+            repo_summary=summary,
+            static_issues=static_issues,
+            risk_scores=risk_scores,
+            on_issue=lambda issue: writer({
+                "event": "llm_issue", "shard": name,
+                "issue": dict(issue, file=_shard_relative(issue.get("file"), name)),
+            }),
+        )
+        score = review.get("overall_quality_score", 5.0)
+        recommendations = review.get("recommendations", [])
+        llm_routing = review.get("routing")
+        for it in review.get("llm_detected_issues", []):
+            it = dict(it)
+            it["file"] = _shard_relative(it.get("file"), name)
+            llm_issues.append(it)
+
+    for it in static_issues:
+        it["file"] = _shard_relative(it.get("file"), name)
+
+    categorized = merge_and_categorize_issues(static_issues, llm_issues)
+
+    llm_review = {"ran": routing["llm_stage"] == "run", "skipped_reason": routing["routing_reason"]}
+    if llm_routing:
+        llm_review["routing"] = llm_routing
+
+    return {"shard_results": [{
+        "name": name,
+        "root": root,
+        "file_count": len(files),
+        "repo_summary": summary,
+        "quality_score": score,
+        "recommendations": recommendations,
+        "llm_review": llm_review,
+        "static_issues": static_issues,
+        "suppressed": suppressed,
+        "risk_hotspots": hotspots,
+        "llm_detected_issues": llm_issues,
+        "categorized_issues": categorized,
+        "categorized_summary": summarize_categorized(categorized),
+    }]}
+
+
+def shard_merge_node(state: Dict[str, Any]):
+    """
+    Reduce step: combine per-shard results into the whole-repo state.
+    """
+    results = sorted(state.get("shard_results", []), key=lambda r: r["name"])
+    print(f"🧩 Merging {len(results)} shard results...")
+
+    static_issues, llm_issues, categorized = [], [], []
+    for r in results:
+        static_issues.extend(r["static_issues"])
+        llm_issues.extend(r["llm_detected_issues"])
+        categorized.extend(r["categorized_issues"])
+
+    # Same ordering merge_and_categorize_issues uses for a single run
+    categorized.sort(key=by_severity)
+
+    # Repo quality = file-weighted mean over shards the LLM actually scored
+    scored = [(r["quality_score"], r["file_count"]) for r in results if r["quality_score"] is not None]
+    weight = sum(n for _, n in scored)
+    update = {
+        "static_issues": static_issues,
+        "llm_detected_issues": llm_issues,
+        "categorized_issues": categorized,
+        "categorized_summary": summarize_categorized(categorized),
+        "llm_stage": "run" if scored else "skip",
+        "routing_reason": None if scored else "no shard needed LLM review",
+        "repo_summary": {
+            "project_type": "monorepo",
+            "shards": {r["name"]: r["repo_summary"] for r in results},
+        },
+        "shard_summaries": [
+            {
+                "name": r["name"],
+                "file_count": r["file_count"],
+                "quality_score": r["quality_score"],
+                "recommendations": r["recommendations"],
+                "llm_review": r["llm_review"],
+                "category_summary": r["categorized_summary"],
+            }
+            for r in results
+        ],
+    }
+    hotspots = sorted((h for r in results for h in r["risk_hotspots"]), key=lambda h: (-h["score"], h["file"]))
+    if hotspots:
+        update["risk_hotspots"] = hotspots[:10]
+
+    suppressed = [r["suppressed"] for r in results if r.get("suppressed")]
+    if suppressed:
+        by_tool = {}
+        for s in suppressed:
+            for tool, n in s["by_tool"].items():
+                by_tool[tool] = by_tool.get(tool, 0) + n
+        update["suppressed"] = {**suppressed[0], "count": sum(s["count"] for s in suppressed), "by_tool": by_tool}
+    if weight:
+        update["overall_quality_score"] = round(sum(s * n for s, n in scored) / weight, 2)
+    return update
+
+
+def build_shard_graph():
+    g = StateGraph(ShardState)
+    g.add_node("shard_pipeline", shard_pipeline_node)
+    g.set_entry_point("shard_pipeline")
+    g.set_finish_point("shard_pipeline")
+    return g.compile()
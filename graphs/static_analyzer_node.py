@@ -1,14 +1,33 @@
-from typing import TypedDict, List, Any
+from typing import TypedDict, List, Any, Optional, Dict
 from langgraph.graph import StateGraph
-from repo_tools.static_analyzer_agent import run_static_analyzers
+from repo_tools.static_analyzer_agent import run_static_analyzers, iter_static_analyzers
+from repo_tools.baseline import apply_baseline, iter_baseline
+from repo_tools.issue_stream import IssueStream
+from repo_tools.static_digest import StaticDigest
+from repo_tools.dependency_graph import file_centrality
 
 # Define the schema explicitly
 class AnalyzerState(TypedDict, total=False):
     repo_path: str
     code_files: List[str]
-    static_issues: List[Any]
+    static_issues: List[Any]      # streaming mode: only static_digest.sample
+    static_digest: Optional[Any]  # streaming mode: repo_tools.static_digest.StaticDigest
+    analyzer_pool: Optional[Any]  # shared AnalyzerPool (batch scans)
+    baseline: Optional[str]       # accepted-findings file (repo_tools.baseline)
+    suppressed: Optional[Dict[str, Any]]
+    issue_stream: Optional[Any]   # repo_tools.issue_stream.IssueStream (streaming mode)
+    dependency_graph: Optional[Any]
+    workspace: Optional[Any]
 
-def static_analyzer_node(state: AnalyzerState):
+
+def static_analyzer_node(state: AnalyzerState, stream_issues: bool = False):
+    """
+    stream_issues: also feed every issue into a new IssueStream (returned as
+    issue_stream) as the analyzers produce it, so categorizing overlaps the
+    analyzer runs instead of waiting for the whole list. The full list is
+    then never held: later stages get a StaticDigest (static_digest) and
+    static_issues is only its bounded sample.
+    """
     # Now these keys will actually exist
     repo_path = state.get("repo_path") 
     code_files = state.get("code_files")
@@ -17,13 +36,35 @@ def static_analyzer_node(state: AnalyzerState):
         return {"static_issues": ["Error: No repo_path provided"]}
 
     print("🔍 Running Static Analyzer...")
-    static_issues = run_static_analyzers(repo_path, code_files)
+    pool = state.get("analyzer_pool")
+    if not stream_issues:
+        static_issues = run_static_analyzers(repo_path, code_files, pool=pool)
+        # Drop accepted findings before they reach the LLM prompt and later stages
+        static_issues, suppressed = apply_baseline(static_issues, state.get("baseline"))
+        update = {"static_issues": static_issues}
+    else:
+        if pool is not None:
+            issues = run_static_analyzers(repo_path, code_files, pool=pool)
+        else:
+            issues = iter_static_analyzers(repo_path, code_files)
+        issues, suppressed = iter_baseline(issues, state.get("baseline"))
+        stream = IssueStream(
+            centrality=file_centrality(state.get("dependency_graph")),
+            workspace=state.get("workspace"),
+        )
+        digest = StaticDigest()
+        stream.add_static(digest.collect(issues))
+        update = {"static_issues": digest.sample, "static_digest": digest, "issue_stream": stream}
+
+    if suppressed is None:
+        return update
 
-    return {"static_issues": static_issues}
+    print(f"🙈 Baseline suppressed {suppressed['count']} known findings")
+    return dict(update, suppressed=suppressed)
 
 def build_static_analyzer_graph():
     graph = StateGraph(AnalyzerState)
     graph.add_node("static_analyzer", static_analyzer_node)
     graph.set_entry_point("static_analyzer")
     graph.set_finish_point("static_analyzer")
-    return graph.compile()
\ No newline at end of file
+    return graph.compile()
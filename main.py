@@ -1,10 +1,72 @@
 import json
 import os
+import argparse
 # Ensure this import matches your filename
 from graphs.full_pipeline import build_full_pipeline
+from graphs.profile_router_node import PROFILES, DEFAULT_PROFILE
+from repo_tools.workspace import get_workspace_manager
+from repo_tools.batch_runner import run_batch, is_git_url, BATCH_CONCURRENCY
+from repo_tools.baseline import write_baseline
+from repo_tools.issue_record import json_default
+from repo_tools.watch_session import WatchSession
+
+parser = argparse.ArgumentParser(description="AI Code Auditor")
+parser.add_argument("--zip", dest="zip_path",
+                    default=r"C:\Users\rksin\OneDrive\Desktop\lang_graph_tut\test_file.zip",
+                    help="Path to a ZIP archive of the repository")
+parser.add_argument("--git-url", default=None, help="Clone and scan this Git URL instead of a ZIP")
+parser.add_argument("--profile", choices=PROFILES, default=DEFAULT_PROFILE,
+                    help="fast = static only, deep = full LLM review, auto = LLM only when worthwhile")
+parser.add_argument("--output", default="audit_report.json", help="Where to write the JSON report")
+parser.add_argument("--no-sharding", dest="sharding", action="store_false",
+                    help="Scan a monorepo as a single project instead of one sub-pipeline per sub-project")
+parser.add_argument("--baseline", default=None,
+                    help="Accepted-findings file to suppress (default: the repo's .auditor-baseline.json)")
+parser.add_argument("--write-baseline", default=None, metavar="PATH",
+                    help="Save every finding of this scan as accepted, for use with --baseline")
+parser.add_argument("--batch", nargs="+", metavar="ZIP_OR_GIT_URL",
+                    help="Scan many repositories with shared analyzers; one report per repo in --output-dir")
+parser.add_argument("--output-dir", default="audit_reports", help="Where --batch writes its reports")
+parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Repos scanned at once in --batch")
+parser.add_argument("--watch", default=None, metavar="DIR",
+                    help="Keep a local directory loaded and rewrite --output after every save")
+args = parser.parse_args()
 
 # Build the graph
-app = build_full_pipeline()
+app = build_full_pipeline(profile=args.profile)
+
+if args.batch:
+    os.makedirs(args.output_dir, exist_ok=True)
+    items = []
+    for src in args.batch:
+        key = "git_url" if is_git_url(src) else "repo_input"
+        items.append({"name": src, key: src, "sharding": args.sharding})
+
+    print(f"🚀 Batch scan of {len(items)} repositories (profile={args.profile})\n")
+    for n, result in enumerate(run_batch(app, items, profile=args.profile, concurrency=args.concurrency), start=1):
+        base = os.path.splitext(os.path.basename(result["name"].rstrip("/")))[0] or "repo"
+        out_path = os.path.join(args.output_dir, f"{result['index']:03d}_{base}.json")
+        with open(out_path, "w") as f:
+            json.dump(result, f, indent=2)
+        status = "✅" if result["status"] == "done" else "❌"
+        print(f"{status} [{n}/{len(items)}] {result['name']} -> {out_path}")
+    raise SystemExit(0)
+
+if args.watch:
+    session = WatchSession(args.watch, profile=args.profile, baseline=args.baseline)
+    with open(args.output, "w") as f:
+        json.dump(session.report, f, indent=2)
+    print(f"✅ {session.report['total_issues']} issues in {session.last_update['seconds']:.2f}s -> {args.output}")
+    print(f"👀 Watching {session.repo_path} (Ctrl+C to stop)")
+    try:
+        for update in session.watch():
+            with open(args.output, "w") as f:
+                json.dump(session.report, f, indent=2)
+            print(f"🔁 [{session.watcher_kind}] {', '.join(update['files']) or 'baseline'}: "
+                  f"{session.report['total_issues']} issues, report updated in {update['seconds'] * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    raise SystemExit(0)
 
 print("🚀 Starting Autonomous Code Review Pipeline...")
 print("------------------------------------------------")
@@ -14,20 +76,32 @@ print("3️⃣  LLM Architect")
 print("4️⃣  Issue Categorizer")
 print("5️⃣  Priority Agent")
 print("6️⃣  Final Aggregator")
+print(f"   Profile: {args.profile}")
 print("------------------------------------------------\n")
 
-# Run!
-result = app.invoke({
-    "repo_input": r"C:\Users\rksin\OneDrive\Desktop\lang_graph_tut\test_file.zip"
-})
+# Run! (the extracted repo is deleted when the block exits)
+with get_workspace_manager().job() as workspace:
+    inputs = {"workspace": workspace, "profile": args.profile, "sharding": args.sharding}
+    if args.baseline:
+        inputs["baseline"] = os.path.abspath(args.baseline)
+    if args.git_url:
+        inputs["git_url"] = args.git_url
+    else:
+        inputs["repo_input"] = args.zip_path
+    result = app.invoke(inputs)
+
+    # Extract final clean output (inside the workspace: a streamed
+    # ranking is read from its run files while the report is written)
+    final_report = result.get("final_output", {})
 
-# Extract final clean output
-final_report = result.get("final_output", {})
+    print("\n✨ PIPELINE FINISHED! HERE IS THE JSON REPORT:\n")
+    print(json.dumps(final_report, indent=2, default=json_default))
 
-print("\n✨ PIPELINE FINISHED! HERE IS THE JSON REPORT:\n")
-print(json.dumps(final_report, indent=2))
+    # Optional: Save to file
+    with open(args.output, "w") as f:
+        json.dump(final_report, f, indent=2, default=json_default)
+    print(f"\n✅ Report saved to {args.output}")
 
-# Optional: Save to file
-with open("audit_report.json", "w") as f:
-    json.dump(final_report, f, indent=2)
-print("\n✅ Report saved to audit_report.json")
\ No newline at end of file
+    if args.write_baseline:
+        n = write_baseline(args.write_baseline, final_report.get("issues", []))
+        print(f"✅ Baseline of {n} accepted findings saved to {args.write_baseline}")
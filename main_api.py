@@ -1,16 +1,38 @@
 import os
+import json
+import uuid
 import shutil
+from typing import List
 import uvicorn
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 # --- IMPORT YOUR EXISTING PIPELINE ---
 # This uses the code you already wrote and verified
 from graphs.full_pipeline import build_full_pipeline
+from graphs.profile_router_node import normalize_profile, DEFAULT_PROFILE
+from repo_tools.workspace import get_workspace_manager
+from repo_tools.job_queue import get_job_queue, get_result_store
+from repo_tools.admission import AdmissionMiddleware, FairScheduler
+from repo_tools.batch_runner import run_batch
+from repo_tools.issue_store import get_issue_store
+from repo_tools.issue_record import json_default
+from repo_tools.scan_history import get_scan_history, project_name
+from repo_tools.llm_client import hedge_stats
+
+# "inline" runs the scan inside the request; "queue" hands it to worker.py processes
+SCAN_MODE = os.getenv("AUDITOR_SCAN_MODE", "inline")
 
 app = FastAPI(title="AI Code Auditor API")
 
+# Bounded, per-client fair admission for inline scans (queue mode has its own backlog)
+# Registered before CORS: the last middleware added is the outermost, so CORS
+# headers also go on admission's 429/413 responses
+scheduler = FairScheduler()
+app.add_middleware(AdmissionMiddleware, scheduler=scheduler, enabled=lambda: job_queue is None)
+
 # Enable CORS (Allows React to connect)
 app.add_middleware(
     CORSMiddleware,
@@ -23,52 +45,338 @@ app.add_middleware(
 # Initialize your graph ONCE when server starts
 print("⚙️  Initializing AI Pipeline...")
 pipeline = build_full_pipeline()
-print("✅ AI Agents Ready.")
+job_queue = get_job_queue() if SCAN_MODE == "queue" else None
+result_store = get_result_store() if SCAN_MODE == "queue" else None
+# Indexed per-issue storage behind the paginated /scan/{scan_id}/... queries
+issue_store = get_issue_store()
+# Per-project fingerprint history behind /projects/{project}/diff and /trend
+scan_history = get_scan_history()
+print(f"✅ AI Agents Ready. (scan mode: {SCAN_MODE})")
 
 @app.get("/")
 def health_check():
     return {"status": "System Operational", "mode": "Autonomous Agents Active"}
 
+@app.get("/admission")
+def admission_stats():
+    return scheduler.stats()
+
+@app.get("/llm/hedging")
+def llm_hedging_stats():
+    return hedge_stats()
+
 @app.post("/scan")
-async def scan_repository(file: UploadFile = File(...)):
+async def scan_repository(
+    file: UploadFile = File(...),
+    profile: str = Query(DEFAULT_PROFILE, description="fast | deep | auto"),
+    project: str = Query(None, description="History key (default: the upload's file name)"),
+    ref: str = Query(None, description="Commit / version label stored with the scan history"),
+    sharding: bool = Query(True, description="false: scan a monorepo as a single project"),
+):
     """
-    Receives a ZIP file -> Runs YOUR existing pipeline -> Returns YOUR final JSON.
+    Receives a ZIP file -> Runs YOUR existing pipeline -> Returns YOUR final JSON
+    (issues paged through /scan/{scan_id}/issues when the issue store is on).
     """
-    # 1. Save the uploaded file temporarily
-    temp_filename = f"temp_{file.filename}"
-    temp_path = os.path.abspath(temp_filename)
+    try:
+        profile = normalize_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    project = project or project_name(file.filename)
+
+    if job_queue is not None:
+        # Copying the upload and the enqueue block: keep them off the event loop
+        return await run_in_threadpool(enqueue_scan, file, profile, project, ref, sharding)
+
+    # 1. Save the uploaded file into a per-request workspace
+    # (unique directory, so concurrent uploads with the same name can't collide)
+    workspace = get_workspace_manager().create()
+    temp_path = workspace.file_path(file.filename)
     
     try:
         with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            shutil.copyfileobj(file.file, buffer, 1024 * 1024)
             
-        print(f"\n📥 New Scan Request: {file.filename}")
+        print(f"\n📥 New Scan Request: {file.filename} (profile={profile})")
 
         # 2. Run YOUR pipeline
         # We pass the exact input structure your graph expects
         inputs = {
-            "repo_input": temp_path
+            "repo_input": temp_path,
+            "workspace": workspace,
+            "profile": profile,
+            "sharding": sharding,
         }
         
         # Invoke the graph (Agents 1-6 will run)
         print("🚀 Agents Dispatched...")
-        result = pipeline.invoke(inputs)
+        # (in a worker thread, so other requests keep being served meanwhile)
+        result = await run_in_threadpool(pipeline.invoke, inputs)
         print("✅ Analysis Complete.")
 
         # 3. Extract the final report from your state
         # (Your aggregator node puts it in 'final_output')
         final_report = result.get("final_output", {})
 
-        return JSONResponse(content=final_report)
+        # 4. Persist it so the UI can page through issues instead of re-downloading,
+        # and so later scans of the same project can be diffed against it
+        if issue_store is not None or scan_history is not None:
+            scan_id = uuid.uuid4().hex
+            await run_in_threadpool(record_report, scan_id, final_report, project, ref)
+            final_report = paged_report(scan_id, final_report)
+
+        # Serialized here, before the workspace (and a streamed ranking's run files) goes
+        return Response(
+            json.dumps(final_report, default=json_default, ensure_ascii=False, separators=(",", ":")),
+            media_type="application/json",
+        )
 
     except Exception as e:
         print(f"❌ Error during scan: {str(e)}")
         return HTTPException(status_code=500, detail=str(e))
         
     finally:
-        # 4. Cleanup the uploaded zip
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        # 5. Cleanup the uploaded zip and the extracted repo
+        workspace.cleanup()
+
+@app.post("/scan/batch")
+async def scan_batch(
+    files: List[UploadFile] = File(default=[]),
+    git_urls: List[str] = Form(default=[]),
+    profile: str = Query(DEFAULT_PROFILE, description="fast | deep | auto"),
+    progress: bool = Query(False, description="also stream LLM issues as they are found"),
+    sharding: bool = Query(True, description="false: scan monorepos as single projects"),
+):
+    """
+    Scans many ZIPs and/or Git URLs in one request. Streams back one JSON line
+    (NDJSON) per repository as each one finishes; with progress=true, lines
+    with status "progress" (e.g. each LLM issue) arrive while scans run.
+    """
+    try:
+        profile = normalize_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not files and not git_urls:
+        raise HTTPException(status_code=400, detail="Provide at least one file or git_url")
+
+    # Uploads live in one workspace for the whole batch, removed once streaming ends
+    workspace = get_workspace_manager().create()
+    items = []
+    try:
+        for i, f in enumerate(files):
+            path = workspace.file_path(f"{i}_{f.filename}")
+            with open(path, "wb") as buffer:
+                shutil.copyfileobj(f.file, buffer, 1024 * 1024)
+            items.append({"name": f.filename, "repo_input": path, "sharding": sharding})
+        for url in git_urls:
+            items.append({"name": url, "git_url": url, "sharding": sharding})
+    except Exception:
+        workspace.cleanup()
+        raise
+
+    print(f"\n📥 New Batch Request: {len(items)} repositories (profile={profile})")
+
+    def stream():
+        try:
+            for result in run_batch(pipeline, items, profile=profile, progress=progress):
+                yield json.dumps(result) + "\n"
+        finally:
+            workspace.cleanup()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def record_report(scan_id: str, report: dict, project: str, ref: str = None):
+    if issue_store is not None:
+        issue_store.save_report(scan_id, report)
+    if scan_history is not None:
+        scan_history.record_scan(scan_id, project, report, ref=ref)
+
+
+def paged_report(scan_id: str, report: dict) -> dict:
+    """
+    The report as returned to clients: once its issues are in the issue store
+    they are fetched page by page from /scan/{scan_id}/issues, not inlined.
+    """
+    if issue_store is None:
+        return {"scan_id": scan_id, **report}
+    summary = {k: v for k, v in report.items() if k != "issues"}
+    return {"scan_id": scan_id, "issues_url": f"/scan/{scan_id}/issues", **summary}
+
+
+def enqueue_scan(file: UploadFile, profile: str, project: str, ref: str = None, sharding: bool = True):
+    """
+    Queue mode: store the upload for the workers and return a job handle.
+    """
+    job_id = uuid.uuid4().hex
+    result_store.save_upload(job_id, file.file)
+    job_queue.enqueue(
+        {"filename": file.filename, "profile": profile, "project": project, "ref": ref, "sharding": sharding},
+        job_id=job_id,
+    )
+    print(f"\n📬 Queued Scan Request: {file.filename} -> job {job_id}")
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": "queued", "status_url": f"/scan/{job_id}"},
+    )
+
+
+@app.get("/scan/{job_id}")
+def scan_status(job_id: str):
+    """
+    Queue mode: job status, plus the report once a worker has finished it.
+    """
+    if job_queue is None:
+        raise HTTPException(status_code=404, detail="Server is not running in queue mode")
+
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+
+    if job["status"] == "done":
+        report = result_store.get_result(job_id)
+        # Workers store the issues under the job id, so they page like inline scans
+        if report is not None and issue_store is not None and issue_store.get_scan(job_id) is not None:
+            report = paged_report(job_id, report)
+        job["report"] = report
+    return job
+
+
+def _require_scan(scan_id: str):
+    if issue_store is None:
+        raise HTTPException(status_code=404, detail="Issue store is disabled (AUDITOR_ISSUE_DB=off)")
+    scan = issue_store.get_scan(scan_id)
+    if scan is None:
+        raise HTTPException(status_code=404, detail="Unknown scan")
+    return scan
+
+
+@app.get("/scan/{scan_id}/summary")
+def scan_summary(scan_id: str):
+    """
+    The stored report without its issues array.
+    """
+    return _require_scan(scan_id)
+
+
+@app.get("/scan/{scan_id}/baseline")
+def scan_baseline(scan_id: str):
+    """
+    Every finding of a stored scan as a baseline file. Commit it to the repo
+    root as .auditor-baseline.json to suppress these findings in later scans.
+    """
+    _require_scan(scan_id)
+    return {"version": 1, "fingerprints": issue_store.fingerprints(scan_id)}
+
+
+@app.get("/scan/{scan_id}/issues")
+def scan_issues(
+    scan_id: str,
+    severity: List[str] = Query(default=[]),
+    category: List[str] = Query(default=[]),
+    priority: List[str] = Query(default=[]),
+    source: List[str] = Query(default=[]),
+    file: List[str] = Query(default=[]),
+    path_prefix: str = Query(None, description="Only files under this directory"),
+    sort: str = Query("priority", description="priority | severity | confidence | file"),
+    order: str = Query(None, description="asc | desc (default depends on sort)"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+):
+    """
+    One filtered, sorted page of a stored scan's issues.
+    """
+    _require_scan(scan_id)
+    filters = {"severity": severity, "category": category, "priority": priority, "source": source, "file": file}
+    try:
+        return issue_store.query_issues(
+            scan_id, filters=filters, path_prefix=path_prefix,
+            sort=sort, order=order, limit=limit, cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/scan/{scan_id}/files")
+def scan_files(
+    scan_id: str,
+    sort: str = Query("count", description="count | priority | file"),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Per-file issue counts for a stored scan.
+    """
+    _require_scan(scan_id)
+    try:
+        return {"scan_id": scan_id, "items": issue_store.file_aggregates(scan_id, sort=sort, limit=limit, offset=offset)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/scan/{scan_id}/dirs")
+def scan_dirs(scan_id: str, depth: int = Query(None, ge=1, description="Roll up to this many path levels")):
+    """
+    Per-directory issue counts for a stored scan.
+    """
+    _require_scan(scan_id)
+    return {"scan_id": scan_id, "items": issue_store.directory_aggregates(scan_id, depth=depth)}
+
+
+def _require_history():
+    if scan_history is None:
+        raise HTTPException(status_code=404, detail="Scan history is disabled (AUDITOR_HISTORY_DB=off)")
+    return scan_history
+
+
+@app.get("/projects")
+def list_projects():
+    return {"items": _require_history().list_projects()}
+
+
+@app.get("/projects/{project}/trend")
+def project_trend(
+    project: str,
+    limit: int = Query(100, ge=1, le=1000),
+    since: float = Query(None, description="Only scans at or after this Unix timestamp"),
+):
+    """
+    Per-scan severity counts and new/fixed counts, oldest first.
+    """
+    return {"project": project, "items": _require_history().trend(project, limit=limit, since=since)}
+
+
+@app.get("/projects/{project}/diff")
+def project_diff(
+    project: str,
+    base: str = Query(None, description="Scan id (default: the scan before head)"),
+    head: str = Query(None, description="Scan id (default: the project's latest scan)"),
+    limit: int = Query(100, ge=1, le=1000),
+    persisting: bool = Query(False, description="Also list persisting issues"),
+):
+    """
+    New / fixed / persisting issues between two scans of a project.
+    """
+    history = _require_history()
+    if head is None:
+        latest = history.latest_scans(project, 1)
+        if not latest:
+            raise HTTPException(status_code=404, detail="Unknown project")
+        head = latest[0]
+
+    head_scan = history.get_scan(head)
+    if head_scan is None or head_scan["project"] != project:
+        raise HTTPException(status_code=404, detail="Unknown head scan for this project")
+    base = base or head_scan["previous_id"]
+    if base is None:
+        raise HTTPException(status_code=400, detail="Head is the project's first scan; pass base explicitly")
+    base_scan = history.get_scan(base)
+    if base_scan is None or base_scan["project"] != project:
+        raise HTTPException(status_code=404, detail="Unknown base scan for this project")
+
+    return {"project": project, **history.diff(base, head, limit=limit, include_persisting=persisting)}
+
 
 if __name__ == "__main__":
     # Start the server
@@ -0,0 +1,267 @@
+# repo_tools/admission.py
+import os
+import json
+import math
+import time
+import asyncio
+from collections import deque
+from typing import Dict, Optional
+from fastapi import HTTPException
+
+# Scans allowed to run at the same time
+MAX_IN_FLIGHT = int(os.getenv("AUDITOR_MAX_IN_FLIGHT", "4"))
+# Scans allowed to wait for a slot; beyond that requests get 429
+MAX_QUEUED = int(os.getenv("AUDITOR_MAX_QUEUED", "32"))
+# Longest a request may wait in the queue before giving up with 429 (0 = forever)
+MAX_QUEUE_WAIT = float(os.getenv("AUDITOR_MAX_QUEUE_WAIT", "600"))
+# Uploads larger than this are rejected with 413 while they stream in
+MAX_UPLOAD_BYTES = int(os.getenv("AUDITOR_MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+
+
+def parse_client_weights(raw: str) -> Dict[str, float]:
+    """
+    "team-a=4,nightly-batch=0.5" -> {"team-a": 4.0, "nightly-batch": 0.5}
+    """
+    weights = {}
+    for part in (raw or "").split(","):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            try:
+                weights[key.strip()] = max(float(value), 0.01)
+            except ValueError:
+                continue
+    return weights
+
+
+# Relative share per client key (API key or IP); unlisted clients get 1.0
+CLIENT_WEIGHTS = parse_client_weights(os.getenv("AUDITOR_CLIENT_WEIGHTS", ""))
+
+
+class AdmissionRejected(Exception):
+    """The scan queue is full (or the wait took too long); retry later."""
+
+    def __init__(self, retry_after: int, reason: str = "Scan queue is full"):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class FairScheduler:
+    """
+    Bounded admission with weighted fair queuing between clients.
+
+    Each client has a virtual clock that advances by 1/weight per admitted
+    scan; when a slot frees up, the waiting client with the smallest clock goes
+    next. A client that submits 200 scans therefore only gets its weighted share
+    of slots while others are waiting, instead of everything in FIFO order.
+    Must be used from a single asyncio event loop.
+    """
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT, max_queued=MAX_QUEUED,
+                 weights: Optional[Dict[str, float]] = None, max_wait=MAX_QUEUE_WAIT):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+        self.weights = CLIENT_WEIGHTS if weights is None else weights
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.queued = 0
+        self._waiters: Dict[str, deque] = {}
+        self._vtime: Dict[str, float] = {}
+        self._global_vtime = 0.0
+        # Exponential moving average of scan duration, used for Retry-After
+        self._avg_duration = 30.0
+
+    def weight(self, client: str) -> float:
+        # Weights may be configured with or without the "key:"/"ip:" prefix
+        if client in self.weights:
+            return self.weights[client]
+        return self.weights.get(client.split(":", 1)[-1], 1.0)
+
+    def retry_after(self) -> int:
+        waves = (self.queued + self.in_flight) / float(self.max_in_flight)
+        return max(1, int(math.ceil(self._avg_duration * max(waves, 1.0))))
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "queued_by_client": {c: len(q) for c, q in self._waiters.items() if q},
+            "avg_scan_seconds": round(self._avg_duration, 2),
+        }
+
+    def _start_tag(self, client: str) -> float:
+        # Idle clients re-enter at the current virtual time (no banked credit)
+        return max(self._vtime.get(client, 0.0), self._global_vtime)
+
+    def _grant(self, client: str):
+        start = self._start_tag(client)
+        self._global_vtime = start
+        self._vtime[client] = start + 1.0 / self.weight(client)
+        self.in_flight += 1
+
+    def _dispatch(self):
+        while self.in_flight < self.max_in_flight and self.queued:
+            client = min(
+                (c for c, q in self._waiters.items() if q),
+                key=lambda c: (self._start_tag(c), c),
+            )
+            fut = self._waiters[client].popleft()
+            self.queued -= 1
+            if not self._waiters[client]:
+                del self._waiters[client]
+            if fut.done():  # waiter gave up
+                continue
+            self._grant(client)
+            fut.set_result(True)
+
+        # Forget clocks of idle clients that are not ahead of everyone else
+        for c in [c for c, v in self._vtime.items() if c not in self._waiters and v <= self._global_vtime]:
+            del self._vtime[c]
+
+    async def acquire(self, client: str):
+        """
+        Wait for a slot. Raises AdmissionRejected when the queue is full or the
+        wait exceeds max_wait.
+        """
+        if self.in_flight < self.max_in_flight and self.queued == 0:
+            self._grant(client)
+            return
+
+        if self.queued >= self.max_queued:
+            raise AdmissionRejected(self.retry_after())
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(client, deque()).append(fut)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(fut, timeout=self.max_wait or None)
+        except asyncio.TimeoutError:
+            self._abandon(client, fut)
+            raise AdmissionRejected(self.retry_after(), reason="Timed out waiting for a scan slot")
+        except BaseException:
+            # Client disconnected while waiting
+            if fut.done() and not fut.cancelled():
+                self.release()
+            else:
+                self._abandon(client, fut)
+            raise
+
+    def _abandon(self, client: str, fut):
+        q = self._waiters.get(client)
+        if q and fut in q:
+            q.remove(fut)
+            self.queued -= 1
+            if not q:
+                del self._waiters[client]
+
+    def release(self, duration: Optional[float] = None):
+        self.in_flight = max(0, self.in_flight - 1)
+        if duration is not None:
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+        self._dispatch()
+
+
+def client_key(scope) -> str:
+    """
+    Fairness key: the X-API-Key header if present, otherwise the client IP.
+    """
+    for name, value in scope.get("headers") or []:
+        if name == b"x-api-key" and value:
+            return "key:" + value.decode("latin-1")
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class UploadTooLarge(HTTPException):
+    """
+    Raised from inside receive(); an HTTPException so FastAPI's body parser
+    re-raises it (and answers 413) instead of turning it into a generic 400.
+    """
+
+    def __init__(self, limit: int):
+        super().__init__(status_code=413, detail=f"Upload exceeds {limit} bytes")
+
+
+async def _send_json(send, status: int, body: dict, headers=None):
+    payload = json.dumps(body).encode("utf-8")
+    raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    for k, v in (headers or {}).items():
+        raw_headers.append((k.lower().encode(), str(v).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": payload})
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware for scan submissions (POST requests under `path_prefix`):
+      - rejects with 429 + Retry-After before the body is read when the queue is full
+      - waits for a fair-share slot, and holds it until the response is finished
+      - counts body bytes as they stream in and aborts with 413 past max_upload_bytes
+    """
+
+    def __init__(self, app, scheduler: FairScheduler = None, path_prefix: str = "/scan",
+                 max_upload_bytes: int = MAX_UPLOAD_BYTES, enabled=lambda: True):
+        self.app = app
+        self.scheduler = scheduler or FairScheduler()
+        self.path_prefix = path_prefix
+        self.max_upload_bytes = max_upload_bytes
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.path_prefix):
+            return await self.app(scope, receive, send)
+
+        # 1. Cheap size check from the declared length
+        limit = self.max_upload_bytes
+        for name, value in scope.get("headers") or []:
+            if name != b"content-length":
+                continue
+            try:
+                declared = int(value or 0)
+            except ValueError:
+                return await _send_json(send, 400, {"detail": "Malformed Content-Length header"})
+            if limit and declared > limit:
+                return await _send_json(send, 413, {"detail": f"Upload exceeds {limit} bytes"})
+
+        # 2. Admission (skipped when scans are handed off to workers)
+        admitted = False
+        if self.enabled():
+            try:
+                await self.scheduler.acquire(client_key(scope))
+                admitted = True
+            except AdmissionRejected as e:
+                return await _send_json(
+                    send, 429, {"detail": e.reason, "retry_after": e.retry_after},
+                    headers={"Retry-After": e.retry_after},
+                )
+
+        # 3. Enforce the size limit on the actual stream (chunked uploads, lying headers)
+        received = 0
+        started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if limit and received > limit:
+                    raise UploadTooLarge(limit)
+            return message
+
+        async def tracking_send(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        t0 = time.time()
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except UploadTooLarge:
+            if not started:
+                await _send_json(send, 413, {"detail": f"Upload exceeds {limit} bytes"})
+        finally:
+            if admitted:
+                self.scheduler.release(time.time() - t0)
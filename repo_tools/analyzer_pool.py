@@ -0,0 +1,70 @@
+# repo_tools/analyzer_pool.py
+import os
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any
+
+from repo_tools.static_analyzer_agent import submit_python_tools
+from repo_tools.secret_scanner import scan_secrets, SECRET_SCAN_ENABLED
+from repo_tools.clone_detector import detect_clones, CLONE_DETECTION_ENABLED
+
+# Worker processes shared by every scan that uses the pool
+ANALYZER_WORKERS = int(os.getenv("AUDITOR_ANALYZER_WORKERS", str(os.cpu_count() or 2)))
+
+
+def _warm_up():
+    # Pay the import cost once per worker instead of once per scan
+    import bandit.core.manager  # noqa: F401
+    import flake8.main.application  # noqa: F401
+    import radon.complexity  # noqa: F401
+
+
+class AnalyzerPool:
+    """
+    Long-lived processes running Bandit, Flake8 and Radon through their Python
+    APIs. Many repositories (e.g. a /scan/batch request) share one pool, so the
+    analyzers are started once instead of once per repo per tool.
+    """
+
+    def __init__(self, workers: int = ANALYZER_WORKERS):
+        self.workers = max(1, workers)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+
+    def run(self, repo_path: str, code_files: List[str], exclude_dirs=None) -> List[Dict[str, Any]]:
+        """
+        Same result (and ordering) as run_static_analyzers without a pool.
+        """
+        collect = submit_python_tools(repo_path, code_files, executor=self.executor, workers=self.workers)
+        # Secret-scan and tokenizer batches queue up behind the tools' batches on the same workers
+        extra = []
+        if SECRET_SCAN_ENABLED:
+            extra += scan_secrets(repo_path, exclude_dirs or (), executor=self.executor, workers=self.workers)
+        if CLONE_DETECTION_ENABLED:
+            extra += detect_clones(repo_path, code_files, executor=self.executor, workers=self.workers)
+        return list(collect()) + extra
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_analyzer_pool() -> AnalyzerPool:
+    """
+    Process-wide pool, started on first use and shut down at exit.
+    """
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = AnalyzerPool()
+            atexit.register(_shared_pool.shutdown)
+        return _shared_pool
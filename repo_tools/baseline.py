@@ -0,0 +1,238 @@
+# repo_tools/baseline.py
+import os
+import json
+import math
+import bisect
+import hashlib
+import threading
+from array import array
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Callable, Tuple
+
+from repo_tools.issue_categorizer_agent import static_issue_fingerprint
+
+# Baseline applied to every scan unless the repo ships its own
+BASELINE_FILE = os.getenv("AUDITOR_BASELINE", "")
+# Looked up in the repository root (first match wins)
+REPO_BASELINE_NAMES = (".auditor-baseline.json", ".auditor-baseline")
+# Bloom filter false-positive rate (false positives are re-checked exactly)
+BLOOM_ERROR_RATE = float(os.getenv("AUDITOR_BASELINE_FP_RATE", "0.01"))
+# Length of the categorizer's hex issue ids
+FINGERPRINT_LEN = 10
+
+
+def _as_int(fp: str) -> Optional[int]:
+    # Categorizer-format ids pack into an int; anything else doesn't
+    if len(fp) != FINGERPRINT_LEN:
+        return None
+    try:
+        return int(fp, 16)
+    except ValueError:
+        return None
+
+
+class BloomFilter:
+    """
+    Plain bit-array Bloom filter using double hashing over one blake2b digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(d[:8], "little"), int.from_bytes(d[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class Baseline:
+    """
+    Accepted issue fingerprints. Lookups go through a Bloom filter first (most
+    findings of a scan are not in the baseline), and filter hits are
+    confirmed against a sorted array of the fingerprints, so there are no
+    false suppressions. The categorizer's 10-hex-digit ids pack into 8 bytes
+    each; anything else (hand-written entries) is kept in a small set.
+    """
+
+    def __init__(self, fingerprints: Iterable[str], source: str = None):
+        packed, other = set(), set()
+        for fp in fingerprints:
+            fp = str(fp).strip().upper()
+            if not fp:
+                continue
+            n = _as_int(fp)
+            if n is None:
+                other.add(fp)
+            else:
+                packed.add(n)
+
+        self.source = source
+        self._sorted = array("Q", sorted(packed))
+        self._other = other
+        self._bloom = BloomFilter(len(packed) + len(other))
+        for fp in other:
+            self._bloom.add(fp)
+        for n in self._sorted:
+            self._bloom.add(format(n, "X").zfill(FINGERPRINT_LEN))
+
+    def __len__(self):
+        return len(self._sorted) + len(self._other)
+
+    def __contains__(self, fp: str) -> bool:
+        fp = str(fp).upper()
+        if fp not in self._bloom:
+            return False
+        if fp in self._other:
+            return True
+        n = _as_int(fp)
+        if n is None:
+            return False
+        i = bisect.bisect_left(self._sorted, n)
+        return i < len(self._sorted) and self._sorted[i] == n
+
+    def filter(
+        self,
+        issues: Iterable[Dict[str, Any]],
+        fingerprint: Callable[[Dict[str, Any]], str] = static_issue_fingerprint,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Split static issues into (kept, suppressed_summary).
+        """
+        summary = {"count": 0, "by_tool": {}}
+        return list(self.iter_kept(issues, summary, fingerprint)), summary
+
+    def iter_kept(
+        self,
+        issues: Iterable[Dict[str, Any]],
+        summary: Dict[str, Any],
+        fingerprint: Callable[[Dict[str, Any]], str] = static_issue_fingerprint,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        filter() as a generator: yields the kept issues and counts the
+        suppressed ones into `summary` ("count" and "by_tool") as it goes.
+        """
+        by_tool = summary["by_tool"]
+        for it in issues:
+            if isinstance(it, dict) and fingerprint(it) in self:
+                tool = it.get("tool") or it.get("source") or "static"
+                by_tool[tool] = by_tool.get(tool, 0) + 1
+                summary["count"] += 1
+            else:
+                yield it
+
+
+def read_fingerprints(path: str) -> List[str]:
+    """
+    Accepts a JSON baseline ({"fingerprints": [...]}), a saved report (its
+    issues' ids) or plain text with one fingerprint per line.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return [l.split("#", 1)[0].strip() for l in text.splitlines() if l.split("#", 1)[0].strip()]
+
+    if isinstance(data, dict) and "fingerprints" in data:
+        return list(data["fingerprints"])
+    if isinstance(data, dict) and "issues" in data:
+        data = data["issues"]
+    return [it["id"] if isinstance(it, dict) else it for it in data if it]
+
+
+def write_baseline(path: str, issues: List[Dict[str, Any]]) -> int:
+    """
+    Save every issue id of a report as accepted. Returns the count written.
+    """
+    fingerprints = sorted({it["id"] for it in issues if isinstance(it, dict) and it.get("id")})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "fingerprints": fingerprints}, f, indent=0)
+    return len(fingerprints)
+
+
+def find_baseline(repo_path: Optional[str], explicit: Optional[str] = None) -> Optional[str]:
+    """
+    Explicit path > baseline committed in the repo root > AUDITOR_BASELINE.
+    """
+    if explicit:
+        return explicit
+    if repo_path:
+        for name in REPO_BASELINE_NAMES:
+            candidate = os.path.join(repo_path, name)
+            if os.path.isfile(candidate):
+                return candidate
+    return BASELINE_FILE or None
+
+
+_cache: Dict[Tuple[str, float], Baseline] = {}
+_cache_lock = threading.Lock()
+
+
+def load_baseline(path: Optional[str]) -> Optional[Baseline]:
+    """
+    Baseline for `path`, reused while the file is unchanged (API servers and
+    batch runs see the same global baseline on every scan).
+    """
+    if not path:
+        return None
+    try:
+        key = (os.path.abspath(path), os.path.getmtime(path))
+    except OSError:
+        print(f"⚠️  Baseline not found: {path}")
+        return None
+
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    baseline = Baseline(read_fingerprints(path), source=path)
+    with _cache_lock:
+        # Repo-local baselines live in temp dirs; don't let them pile up
+        if len(_cache) >= 16:
+            _cache.clear()
+        _cache[key] = baseline
+    return baseline
+
+
+def apply_baseline(
+    issues: List[Dict[str, Any]],
+    path: Optional[str],
+    fingerprint: Callable[[Dict[str, Any]], str] = static_issue_fingerprint,
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    (kept_issues, suppressed_summary or None when no baseline applies).
+    """
+    baseline = load_baseline(path)
+    if baseline is None:
+        return issues, None
+    kept, summary = baseline.filter(issues, fingerprint)
+    summary["baseline_size"] = len(baseline)
+    summary["baseline"] = os.path.basename(path)
+    return kept, summary
+
+
+def iter_baseline(
+    issues: Iterable[Dict[str, Any]],
+    path: Optional[str],
+    fingerprint: Callable[[Dict[str, Any]], str] = static_issue_fingerprint,
+) -> Tuple[Iterator[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    apply_baseline() for an issue iterator (e.g. iter_static_analyzers()):
+    (kept issues, as an iterator; suppressed_summary or None). The summary's
+    counts are complete once the iterator is exhausted.
+    """
+    baseline = load_baseline(path)
+    if baseline is None:
+        return iter(issues), None
+    summary = {"count": 0, "by_tool": {}, "baseline_size": len(baseline), "baseline": os.path.basename(path)}
+    return baseline.iter_kept(issues, summary, fingerprint), summary
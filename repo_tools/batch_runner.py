@@ -0,0 +1,118 @@
+# repo_tools/batch_runner.py
+import os
+import time
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterator, Optional
+
+from repo_tools.workspace import get_workspace_manager
+from repo_tools.analyzer_pool import get_analyzer_pool
+from repo_tools.issue_record import materialize_issues
+
+# Repositories scanned at the same time within one batch
+BATCH_CONCURRENCY = int(os.getenv("AUDITOR_BATCH_CONCURRENCY", "4"))
+
+
+def is_git_url(value: str) -> bool:
+    return value.startswith(("http://", "https://", "git@", "ssh://", "git://")) or value.endswith(".git")
+
+
+def _scan_one(pipeline, index: int, item: Dict[str, Any], profile: Optional[str], pool, emit=None) -> Dict[str, Any]:
+    start = time.time()
+    with get_workspace_manager().job() as workspace:
+        inputs = {"workspace": workspace, "profile": profile, "analyzer_pool": pool}
+        if item.get("git_url"):
+            inputs["git_url"] = item["git_url"]
+        else:
+            inputs["repo_input"] = item["repo_input"]
+        if item.get("sharding") is False:
+            inputs["sharding"] = False
+        if emit is None:
+            result = pipeline.invoke(inputs)
+        else:
+            # Stream the run: "custom" events (LLM issues as they are parsed)
+            # are forwarded, the last "values" chunk is the final state
+            # LangGraph parks a waiter for the custom stream in the same
+            # executor, so it needs one slot on top of the graph's own limit
+            limit = (getattr(pipeline, "config", None) or {}).get("max_concurrency")
+            config = {"max_concurrency": limit + 1} if limit else None
+            result = {}
+            for mode, chunk in pipeline.stream(inputs, config, stream_mode=["custom", "values"]):
+                if mode == "custom":
+                    emit({"index": index, "name": item["name"], "status": "progress", **chunk})
+                else:
+                    result = chunk
+
+        # The report leaves with the result; its issues can't stay in this workspace
+        report = materialize_issues(result.get("final_output", {}))
+
+    return {
+        "index": index,
+        "name": item["name"],
+        "status": "done",
+        "seconds": round(time.time() - start, 2),
+        "report": report,
+    }
+
+
+def run_batch(
+    pipeline,
+    items: List[Dict[str, Any]],
+    profile: Optional[str] = None,
+    concurrency: int = BATCH_CONCURRENCY,
+    pool=None,
+    progress: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Scan many repositories with one pipeline.
+
+    items: [{"name": ..., "repo_input": zip_path} or {"name": ..., "git_url": url}],
+    optionally with "sharding": False to scan that repo as a single project
+    Repos are loaded and scanned `concurrency` at a time; static analysis goes
+    through one shared AnalyzerPool and LLM calls through the shared rate limiter
+    in repo_tools/llm_client.py. Yields one result per repo as soon as it finishes:
+      {"index", "name", "status": "done", "seconds", "report"}
+      or {"index", "name", "status": "error", "error"}
+    where index is the item's position in `items`. With progress=True, events
+    from running scans are interleaved as they happen, e.g. each LLM issue:
+      {"index", "name", "status": "progress", "event": "llm_issue", "issue"}
+    """
+    pool = pool or get_analyzer_pool()
+    if progress:
+        yield from _run_batch_with_progress(pipeline, items, profile, concurrency, pool)
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {
+            executor.submit(_scan_one, pipeline, i, item, profile, pool): i
+            for i, item in enumerate(items)
+        }
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                yield fut.result()
+            except Exception as e:
+                print(f"❌ Batch item {items[i]['name']} failed: {e}")
+                yield {"index": i, "name": items[i]["name"], "status": "error", "error": str(e)}
+
+
+def _run_batch_with_progress(pipeline, items, profile, concurrency, pool) -> Iterator[Dict[str, Any]]:
+    # Scans push progress events and their final result onto one queue
+    events: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    def scan(i, item):
+        try:
+            events.put(_scan_one(pipeline, i, item, profile, pool, emit=events.put))
+        except Exception as e:
+            print(f"❌ Batch item {item['name']} failed: {e}")
+            events.put({"index": i, "name": item["name"], "status": "error", "error": str(e)})
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for i, item in enumerate(items):
+            executor.submit(scan, i, item)
+        remaining = len(items)
+        while remaining:
+            event = events.get()
+            if event["status"] != "progress":
+                remaining -= 1
+            yield event
@@ -0,0 +1,285 @@
+# repo_tools/clone_detector.py
+import os
+import re
+import zlib
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple
+
+# Set to 0 to leave clone detection out of run_static_analyzers
+CLONE_DETECTION_ENABLED = os.getenv("AUDITOR_CLONE_DETECTION", "1") != "0"
+# A clone must span at least this many normalized tokens and source lines
+CLONE_MIN_TOKENS = int(os.getenv("AUDITOR_CLONE_MIN_TOKENS", "60"))
+CLONE_MIN_LINES = int(os.getenv("AUDITOR_CLONE_MIN_LINES", "6"))
+# Winnowing window: one fingerprint is kept per this many consecutive hashes,
+# which still guarantees every clone of CLONE_MIN_TOKENS is seen
+CLONE_WINNOW = int(os.getenv("AUDITOR_CLONE_WINNOW", "8"))
+# Upper bound on distinct fingerprints held in the index; once full, later
+# files are still matched against it but add nothing new
+CLONE_MAX_INDEX = int(os.getenv("AUDITOR_CLONE_MAX_INDEX", "500000"))
+# Blocks made mostly of literals (rule tables, fixtures) are data, not copied logic
+CLONE_MAX_LITERAL_RATIO = 0.3
+# Occurrences kept per fingerprint (boilerplate repeated everywhere is not interesting)
+CLONE_MAX_BUCKET = 8
+CLONE_MAX_FILE_BYTES = int(os.getenv("AUDITOR_CLONE_MAX_FILE_BYTES", str(1024 * 1024)))
+CLONE_PARALLEL_MIN_FILES = int(os.getenv("AUDITOR_CLONE_PARALLEL_MIN_FILES", "64"))
+CLONE_WORKERS = int(os.getenv("AUDITOR_CLONE_WORKERS", str(os.cpu_count() or 2)))
+
+HASH_COMMENT_EXTS = {".py", ".rb", ".sh"}
+TOKEN = re.compile(
+    r"(?P<ws>\s+)"
+    r"|(?P<comment>//[^\n]*|/\*.*?\*/)"
+    r"|(?P<str>\"\"\".*?\"\"\"|'''.*?'''|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)"
+    r"|(?P<id>[A-Za-z_$][\w$]*)"
+    r"|(?P<num>\d[\w.]*)"
+    r"|(?P<op>\S)",
+    re.S,
+)
+HASH_COMMENT = re.compile(r"#[^\n]*")
+
+# Identifiers are normalized away (renamed copies still match); keywords stay
+KEYWORDS = frozenset("""
+    and as assert async await break case catch class const continue def default del do elif else
+    enum except export extends final finally fn for foreach from func function go if impl import in
+    interface is lambda let match new nil not null or package pass private protected public raise
+    return self static struct super switch this throw throws try type var void while with yield
+""".split())
+
+_BASE = 1_000_003
+_MOD = (1 << 61) - 1
+
+
+def _token_id(text: str) -> int:
+    # Stable across processes (unlike hash()), so workers agree on values
+    return zlib.crc32(text.encode("utf-8", "ignore")) + 1
+
+
+_ID, _STR, _NUM = _token_id("$id"), _token_id("$str"), _token_id("$num")
+
+
+def tokenize(path: str) -> Tuple[array, array]:
+    """
+    Normalized token ids and their 1-based line numbers for one file.
+    """
+    try:
+        if os.path.getsize(path) > CLONE_MAX_FILE_BYTES:
+            return array("I"), array("I")
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+    except OSError:
+        return array("I"), array("I")
+
+    if os.path.splitext(path)[1].lower() in HASH_COMMENT_EXTS:
+        # Same length, so line numbers are unaffected
+        text = HASH_COMMENT.sub(lambda m: " " * len(m.group()), text)
+
+    tokens, lines = array("I"), array("I")
+    line = 1
+    for m in TOKEN.finditer(text):
+        kind = m.lastgroup
+        if kind == "id":
+            word = m.group()
+            tokens.append(_token_id(word) if word in KEYWORDS else _ID)
+        elif kind == "str":
+            tokens.append(_STR)
+        elif kind == "num":
+            tokens.append(_NUM)
+        elif kind == "op":
+            tokens.append(_token_id(m.group()))
+        if kind != "ws" and kind != "comment":
+            lines.append(line)
+        line += m.group().count("\n")
+    return tokens, lines
+
+
+def winnow(tokens: array, k: int = CLONE_MIN_TOKENS, w: int = CLONE_WINNOW) -> List[Tuple[int, int]]:
+    """
+    Rabin-Karp hashes of every k-token window, reduced by winnowing to
+    (hash, start) fingerprints: the minimum of each w consecutive hashes.
+    """
+    n = len(tokens)
+    if n < k:
+        return []
+    top = pow(_BASE, k - 1, _MOD)
+    h = 0
+    for t in tokens[:k]:
+        h = (h * _BASE + t) % _MOD
+    hashes = [h]
+    for i in range(k, n):
+        h = ((h - tokens[i - k] * top) * _BASE + tokens[i]) % _MOD
+        hashes.append(h)
+
+    # Sliding-window minimum over a deque of candidate positions; the
+    # rightmost minimum wins so runs of equal hashes select one position
+    picked, window, last = [], deque(), -1
+    for i, h in enumerate(hashes):
+        while window and hashes[window[-1]] >= h:
+            window.pop()
+        window.append(i)
+        if window[0] <= i - w:
+            window.popleft()
+        if i >= w - 1 or i == len(hashes) - 1:
+            j = window[0]
+            if j != last:
+                picked.append((hashes[j], j))
+                last = j
+    return picked
+
+
+def fingerprint_file(path: str):
+    """
+    Worker entry point: (path, tokens, lines, fingerprints) for one file.
+    """
+    tokens, lines = tokenize(path)
+    return path, tokens, lines, winnow(tokens)
+
+
+def _fingerprint_many(paths: List[str]):
+    return [fingerprint_file(p) for p in paths]
+
+
+def _extend(a: array, i: int, b: array, j: int) -> Tuple[int, int, int]:
+    """
+    Grow a seed match a[i:]==b[j:] both ways; returns (start_a, start_b, length).
+    """
+    # Seeds arrive in position order, so the backward walk is short
+    while i > 0 and j > 0 and a[i - 1] == b[j - 1]:
+        i -= 1
+        j -= 1
+    # Forward: compare doubling slices (C speed), then bisect the failing one
+    n, size = 0, CLONE_MIN_TOKENS
+    while True:
+        chunk = a[i + n:i + n + size]
+        if chunk != b[j + n:j + n + size]:
+            break
+        n += len(chunk)
+        if len(chunk) < size:
+            return i, j, n
+        size *= 2
+    lo, hi = 0, min(size, len(a) - i - n, len(b) - j - n)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[i + n:i + n + mid] == b[j + n:j + n + mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return i, j, n + lo
+
+
+def find_clones(files) -> List[Dict[str, Any]]:
+    """
+    files: [(path, tokens, lines, fingerprints)] in repository order.
+    Each file's fingerprints are looked up in the index of everything seen
+    before it (including its own earlier part), so every duplicated block is
+    reported once, on its later copy.
+    """
+    # fingerprint -> occurrences packed as (file index << 32) | token position
+    index: Dict[int, List[int]] = {}
+    clones = []
+    for fid, (path, tokens, lines, prints) in enumerate(files):
+        # (other file, diagonal) -> end of the region already checked there
+        covered: Dict[Tuple[int, int], int] = {}
+        reported: List[Tuple[int, int]] = []  # token ranges of this file already reported
+        for h, pos in prints:
+            bucket = index.get(h)
+            for packed in bucket or ():
+                ofid, opos = packed >> 32, packed & 0xFFFFFFFF
+                diag = pos - opos
+                if pos < covered.get((ofid, diag), -1) or any(s <= pos < e for s, e in reported):
+                    continue
+                other = files[ofid][1]
+                if other[opos:opos + CLONE_MIN_TOKENS] != tokens[pos:pos + CLONE_MIN_TOKENS]:
+                    continue  # hash collision
+                start_b, start_a, length = _extend(other, opos, tokens, pos)
+                covered[(ofid, diag)] = start_a + length
+                if ofid == fid and start_b + length > start_a:
+                    length = start_a - start_b  # periodic code: report one period
+                # Another copy of a block already reported for this file adds nothing
+                overlap = sum(max(0, min(e, start_a + length) - max(s, start_a)) for s, e in reported)
+                if length < CLONE_MIN_TOKENS or overlap * 2 > length:
+                    continue
+                block = tokens[start_a:start_a + length]
+                if (block.count(_STR) + block.count(_NUM)) > CLONE_MAX_LITERAL_RATIO * length:
+                    continue
+                reported.append((start_a, start_a + length))
+                first, last = lines[start_a], lines[start_a + length - 1]
+                if last - first + 1 < CLONE_MIN_LINES:
+                    continue
+                olines = files[ofid][2]
+                clones.append({
+                    "file": path, "line": first, "end_line": last, "tokens": length,
+                    "other_file": files[ofid][0],
+                    "other_line": olines[start_b], "other_end_line": olines[start_b + length - 1],
+                })
+
+            # Added after the lookup so a file also matches its own earlier blocks
+            if bucket is None:
+                if len(index) >= CLONE_MAX_INDEX:
+                    continue
+                bucket = index[h] = []
+            if len(bucket) < CLONE_MAX_BUCKET:
+                bucket.append((fid << 32) | pos)
+    return clones
+
+
+def _batches(paths: List[str], n: int) -> List[List[str]]:
+    # Contiguous batches keep results in code_files order
+    size = max(1, -(-len(paths) // max(1, n)))
+    return [paths[i:i + size] for i in range(0, len(paths), size)]
+
+
+def fingerprint_files(
+    paths: List[str],
+    executor=None,
+    workers: int = CLONE_WORKERS,
+) -> List[Tuple[str, array, array, List[Tuple[int, int]]]]:
+    """
+    fingerprint_file() of every path, in order; in parallel over `executor`
+    (an optional process pool with `workers` processes) or a temporary pool
+    for large inputs.
+    """
+    paths = list(paths or [])
+    if executor is None and (len(paths) < CLONE_PARALLEL_MIN_FILES or workers <= 1):
+        return _fingerprint_many(paths)
+    if executor is not None:
+        return [f for batch in executor.map(_fingerprint_many, _batches(paths, workers * 4)) for f in batch]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [f for batch in pool.map(_fingerprint_many, _batches(paths, workers * 4)) for f in batch]
+
+
+def clone_issues(repo_path: str, files) -> List[Dict[str, Any]]:
+    """
+    find_clones() over fingerprinted `files` (see fingerprint_files), as
+    maintainability issues on the later copy of each block.
+    """
+    issues = []
+    for c in find_clones(files):
+        n_lines = c["end_line"] - c["line"] + 1
+        other = os.path.relpath(c["other_file"], repo_path).replace(os.sep, "/")
+        issues.append({
+            "file": c["file"],
+            "line": c["line"],
+            "severity": "MEDIUM" if n_lines >= 30 else "LOW",
+            "type": "maintainability",
+            "tool": "clones",
+            "message": (
+                f"Duplicated block (lines {c['line']}-{c['end_line']}, {c['tokens']} tokens) "
+                f"copies {other}:{c['other_line']}-{c['other_end_line']}"
+            ),
+        })
+    return issues
+
+
+def detect_clones(
+    repo_path: str,
+    code_files: List[str],
+    executor=None,
+    workers: int = CLONE_WORKERS,
+) -> List[Dict[str, Any]]:
+    """
+    Duplicated code blocks across code_files as maintainability issues.
+    Tokenizing and hashing run in parallel (`executor`: an optional process
+    pool with `workers` processes); matching runs over one shared index.
+    """
+    return clone_issues(repo_path, fingerprint_files(code_files, executor=executor, workers=workers))
@@ -0,0 +1,230 @@
+# repo_tools/code_chunker.py
+import os
+import ast
+from typing import List, Dict, Any, Optional, Tuple
+
+# Longest enclosing function/class shown whole; larger ones fall back to a window
+CHUNK_MAX_LINES = int(os.getenv("AUDITOR_CHUNK_MAX_LINES", "60"))
+# Lines of context around a flagged line outside any (small enough) function
+CHUNK_CONTEXT = 6
+# Ranges this close together are merged into one hunk
+CHUNK_MERGE_GAP = 3
+# Lines of code per file in the reviewer prompt
+SNIPPET_MAX_LINES = int(os.getenv("AUDITOR_SNIPPET_MAX_LINES", "150"))
+
+PYTHON_EXTENSIONS = {".py", ".pyw"}
+# Languages whose blocks are delimited by { } (others use the indentation fallback)
+BRACE_EXTENSIONS = {
+    ".js", ".jsx", ".ts", ".tsx", ".java", ".c", ".h", ".cpp", ".cc", ".hpp",
+    ".go", ".php", ".swift", ".kt", ".rs", ".cs", ".scala",
+}
+
+Range = Tuple[int, int]  # 1-indexed, inclusive
+
+
+def _window(line: int, total: int, context: int = CHUNK_CONTEXT) -> Range:
+    return max(1, line - context), min(total, line + context)
+
+
+def _python_blocks(source: str) -> Optional[List[Range]]:
+    """
+    (start, end) of every function and class, decorators included; None on a syntax error.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    blocks = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            blocks.append((start, node.end_lineno or node.lineno))
+    return blocks
+
+
+def _brace_depths(lines: List[str]) -> List[Tuple[int, int]]:
+    """
+    (depth before, depth after) of every line, skipping braces in strings and comments.
+    """
+    depths, depth, in_block_comment = [], 0, False
+    for text in lines:
+        before = depth
+        i, quote = 0, None
+        while i < len(text):
+            ch = text[i]
+            if in_block_comment:
+                if text.startswith("*/", i):
+                    in_block_comment = False
+                    i += 1
+            elif quote:
+                if ch == "\\":
+                    i += 1
+                elif ch == quote:
+                    quote = None
+            elif ch in "\"'`":
+                quote = ch
+            elif text.startswith("//", i):
+                break
+            elif text.startswith("/*", i):
+                in_block_comment = True
+                i += 1
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth = max(0, depth - 1)
+            i += 1
+        if quote != "`":
+            quote = None  # only template literals span lines
+        depths.append((before, depth))
+    return depths
+
+
+def _brace_blocks(lines: List[str]) -> List[Range]:
+    """
+    (start, end) of every { } block, starting at the line that opens it.
+    """
+    blocks, stack = [], []
+    for n, (before, after) in enumerate(_brace_depths(lines), start=1):
+        # Closings first (a "} else {" line closes one block and opens another)
+        low = min(before, after)
+        while len(stack) > low:
+            start = stack.pop()
+            blocks.append((start, n))
+        while len(stack) < after:
+            stack.append(n)
+    for start in stack:
+        blocks.append((start, len(lines)))
+    return blocks
+
+
+def _indent_blocks(lines: List[str]) -> List[Range]:
+    """
+    Fallback: a line followed by more deeply indented lines starts a block
+    that runs until the indentation drops back.
+    """
+    indents = [None if not t.strip() else len(t) - len(t.lstrip()) for t in lines]
+    blocks, stack = [], []  # stack of (indent, start)
+    last = 0
+    for n, ind in enumerate(indents, start=1):
+        if ind is None:
+            continue
+        while stack and ind <= stack[-1][0]:
+            _, start = stack.pop()
+            blocks.append((start, last))
+        stack.append((ind, n))
+        last = n
+    for _, start in stack:
+        blocks.append((start, last))
+    return [(s, e) for s, e in blocks if e > s]
+
+
+def code_blocks(path: str, source: str) -> Tuple[List[Range], bool]:
+    """
+    Blocks of a file and whether they are definitions: functions/classes via
+    the AST for Python (True), otherwise { } blocks for brace languages or
+    indentation blocks, which also include loops and conditionals (False).
+    """
+    lines = source.splitlines()
+    ext = os.path.splitext(path)[1].lower()
+    if ext in PYTHON_EXTENSIONS:
+        blocks = _python_blocks(source)
+        if blocks is not None:
+            return blocks, True
+        return _indent_blocks(lines), False
+    if ext in BRACE_EXTENSIONS:
+        return _brace_blocks(lines), False
+    return _indent_blocks(lines), False
+
+
+def enclosing_range(
+    blocks: List[Range], line: int, total: int, definitions: bool = False, max_lines: int = CHUNK_MAX_LINES
+) -> Range:
+    """
+    The block to show for `line`, at most `max_lines` long, else a window.
+    Among definitions, the innermost one (the method, not its class);
+    among plain blocks, the outermost one (the function, not one of its loops).
+    """
+    best = None
+    for start, end in blocks:
+        if start <= line <= end and end - start + 1 <= max_lines:
+            if best is None or (start > best[0] if definitions else start < best[0]):
+                best = (start, end)
+    return best or _window(line, total)
+
+
+def merge_ranges(ranges: List[Range], gap: int = CHUNK_MERGE_GAP) -> List[Range]:
+    """
+    Sorted, non-overlapping intervals; ranges overlapping or within `gap` lines are joined.
+    """
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + gap + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(s, e) for s, e in merged]
+
+
+def build_snippet(path: str, lines: List[int], max_lines: int = SNIPPET_MAX_LINES) -> Dict[str, Any]:
+    """
+    Whole enclosing functions/classes around every flagged line of one file,
+    merged into hunks and rendered with line numbers (">>" marks flagged
+    lines). Hunks are taken in the order of `lines` (most important first)
+    until `max_lines` are used, then shown in file order.
+
+    Returns {"snippet", "ranges": [[start, end]], "lines": flagged lines shown}.
+    """
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            source = f.read()
+    except Exception as e:
+        return {"snippet": f"<unable to read file: {e}>", "ranges": [], "lines": []}
+
+    text_lines = source.splitlines()
+    total = len(text_lines)
+    if not total:
+        return {"snippet": "", "ranges": [], "lines": []}
+
+    flagged = []
+    for ln in lines:
+        if isinstance(ln, int) and 1 <= ln <= total and ln not in flagged:
+            flagged.append(ln)
+    if not flagged:
+        # No usable line: build_snippet() falls back to the top of the file (at most 120 lines)
+        flagged_ranges = [(1, min(total, 120, max_lines))]
+    else:
+        blocks, definitions = code_blocks(path, source)
+        flagged_ranges = [enclosing_range(blocks, ln, total, definitions) for ln in flagged]
+
+    # Budget: hunks in priority order, each trimmed to a window if it no longer fits
+    chosen: List[Range] = []
+    used = 0
+    for ln, rng in zip(flagged or [None], flagged_ranges):
+        if any(s <= (ln or rng[0]) <= e for s, e in chosen):
+            continue  # already shown (deduplicated)
+        size = rng[1] - rng[0] + 1
+        if used + size > max_lines and ln is not None:
+            rng = _window(ln, total)
+            size = rng[1] - rng[0] + 1
+        if used + size > max_lines:
+            break
+        chosen.append(rng)
+        used += size
+    hunks = merge_ranges(chosen)
+
+    shown = {ln for ln in flagged if any(s <= ln <= e for s, e in hunks)}
+    out = []
+    for i, (start, end) in enumerate(hunks):
+        if i or start > 1:
+            out.append("   ...")
+        for n in range(start, end + 1):
+            prefix = ">> " if n in shown else "   "
+            out.append(f"{prefix}{n:>4}: {text_lines[n - 1].rstrip()}")
+    if hunks and hunks[-1][1] < total:
+        out.append("   ...")
+
+    return {
+        "snippet": "\n".join(out),
+        "ranges": [[s, e] for s, e in hunks],
+        "lines": sorted(shown),
+    }
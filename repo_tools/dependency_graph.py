@@ -0,0 +1,318 @@
+# repo_tools/dependency_graph.py
+import os
+import re
+import ast
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+# Set to 0 to skip building the import graph when a repository is loaded
+DEP_GRAPH_ENABLED = os.getenv("AUDITOR_DEP_GRAPH", "1") != "0"
+# Below this many files imports are parsed inline
+DEP_PARALLEL_MIN_FILES = int(os.getenv("AUDITOR_DEP_PARALLEL_MIN_FILES", "64"))
+DEP_WORKERS = int(os.getenv("AUDITOR_DEP_WORKERS", str(os.cpu_count() or 2)))
+DEP_MAX_FILE_BYTES = int(os.getenv("AUDITOR_DEP_MAX_FILE_BYTES", str(2 * 1024 * 1024)))
+# Parsed files (per process) and built graphs kept for reuse, keyed by content hash
+DEP_FILE_CACHE_SIZE = int(os.getenv("AUDITOR_DEP_FILE_CACHE", "20000"))
+DEP_GRAPH_CACHE_SIZE = 16
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_ITERATIONS = 50
+
+JS_EXTENSIONS = {".js", ".ts", ".jsx", ".tsx", ".mjs", ".cjs"}
+# Tried in order when a relative JS/TS specifier has no extension
+JS_RESOLVE_SUFFIXES = ["", ".ts", ".tsx", ".js", ".jsx", ".mjs", "/index.ts", "/index.js"]
+
+JS_IMPORT = re.compile(
+    r"""(?:\bimport\s+(?:[\w*{}\s,$]+\s+from\s+)?|\bexport\s+[\w*{}\s,$]+\s+from\s+|\brequire\s*\(\s*|\bimport\s*\(\s*)"""
+    r"""["']([^"'\n]+)["']"""
+)
+GO_IMPORT_BLOCK = re.compile(r"^import\s*\((.*?)^\)", re.S | re.M)
+GO_IMPORT_LINE = re.compile(r"^import\s+(?:[\w.]+\s+)?\"([^\"]+)\"", re.M)
+GO_IMPORT_SPEC = re.compile(r"^\s*(?:[\w.]+\s+)?\"([^\"]+)\"", re.M)
+
+
+def _python_imports(source: str) -> List[Tuple[str, ...]]:
+    """
+    Candidate module names per import statement, most specific first.
+    Relative imports keep their leading dots.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    found = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.extend((alias.name,) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = "." * node.level + (node.module or "")
+            sep = "" if base.endswith(".") else "."
+            # `from pkg import name` may import the submodule pkg.name
+            for alias in node.names:
+                found.append((base + sep + alias.name, base) if alias.name != "*" else (base,))
+    return found
+
+
+def _go_imports(source: str) -> List[Tuple[str, ...]]:
+    specs = GO_IMPORT_LINE.findall(source)
+    for block in GO_IMPORT_BLOCK.findall(source):
+        specs.extend(GO_IMPORT_SPEC.findall(block))
+    return [(s,) for s in specs]
+
+
+_file_cache: "OrderedDict[str, List[Tuple[str, ...]]]" = OrderedDict()
+
+
+def parse_imports(path: str) -> Tuple[str, str, List[Tuple[str, ...]]]:
+    """
+    (path, content hash, imports) for one file. Parses are cached per content
+    hash, so long-lived pool workers skip files they have already seen.
+    """
+    try:
+        if os.path.getsize(path) > DEP_MAX_FILE_BYTES:
+            return path, "", []
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return path, "", []
+
+    ext = os.path.splitext(path)[1].lower()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    key = ext + digest
+    cached = _file_cache.get(key)
+    if cached is not None:
+        _file_cache.move_to_end(key)
+        return path, digest, cached
+
+    source = data.decode("utf-8", errors="ignore")
+    if ext == ".py":
+        imports = _python_imports(source)
+    elif ext in JS_EXTENSIONS:
+        imports = [(s,) for s in JS_IMPORT.findall(source)]
+    elif ext == ".go":
+        imports = _go_imports(source)
+    else:
+        imports = []
+
+    _file_cache[key] = imports
+    if len(_file_cache) > DEP_FILE_CACHE_SIZE:
+        _file_cache.popitem(last=False)
+    return path, digest, imports
+
+
+def _parse_many(paths: List[str]):
+    return [parse_imports(p) for p in paths]
+
+
+class _Resolver:
+    """
+    Maps import specifiers to indexes into the repo's file list.
+    """
+
+    def __init__(self, repo_path: str, rels: List[str]):
+        self.rels = rels
+        self.by_rel = {r: i for i, r in enumerate(rels)}
+        self.py_modules: Dict[str, int] = {}
+        self.go_dirs: Dict[str, List[int]] = {}
+        init_dirs = {os.path.dirname(r) for r in rels if r.endswith("/__init__.py") or r == "__init__.py"}
+
+        for i, rel in enumerate(rels):
+            if rel.endswith(".py"):
+                parts = rel[:-3].split("/")
+                if parts[-1] == "__init__":
+                    parts = parts[:-1]
+                if not parts:
+                    continue
+                # Importable from the repo root, from the top of its package
+                # (src/ layouts), and by any dotted suffix of two or more parts
+                top = len(parts) - 1
+                while top > 0 and "/".join(parts[:top]) in init_dirs:
+                    top -= 1
+                names = {".".join(parts), ".".join(parts[top:])}
+                names.update(".".join(parts[k:]) for k in range(len(parts) - 1))
+                for name in names:
+                    self.py_modules.setdefault(name, i)
+            elif rel.endswith(".go"):
+                self.go_dirs.setdefault(os.path.dirname(rel), []).append(i)
+
+    def resolve(self, rel: str, candidates: Tuple[str, ...]) -> List[int]:
+        ext = os.path.splitext(rel)[1]
+        if ext == ".py":
+            for name in candidates:
+                if name.startswith("."):
+                    level = len(name) - len(name.lstrip("."))
+                    package = rel.split("/")[:-1]
+                    if level - 1 > len(package):
+                        continue
+                    prefix = package[:len(package) - (level - 1)]
+                    name = ".".join(prefix + [p for p in name.lstrip(".").split(".") if p])
+                target = self.py_modules.get(name)
+                if target is not None:
+                    return [target]
+            return []
+        if ext in JS_EXTENSIONS:
+            spec = candidates[0]
+            if not spec.startswith("."):
+                return []  # package import
+            base = os.path.normpath(os.path.join(os.path.dirname(rel), spec)).replace(os.sep, "/")
+            for suffix in JS_RESOLVE_SUFFIXES:
+                target = self.by_rel.get(base + suffix)
+                if target is not None:
+                    return [target]
+            return []
+        if ext == ".go":
+            # Longest repo directory that the import path ends with
+            parts = candidates[0].split("/")
+            for k in range(len(parts)):
+                files = self.go_dirs.get("/".join(parts[k:]))
+                if files:
+                    return files
+        return []
+
+
+def _pagerank(out_edges: List[array], n: int) -> List[float]:
+    if n == 0:
+        return []
+    rank = [1.0 / n] * n
+    for _ in range(PAGERANK_ITERATIONS):
+        nxt = [(1.0 - PAGERANK_DAMPING) / n] * n
+        dangling = 0.0
+        for u in range(n):
+            targets = out_edges[u]
+            if targets:
+                share = PAGERANK_DAMPING * rank[u] / len(targets)
+                for v in targets:
+                    nxt[v] += share
+            else:
+                dangling += rank[u]
+        spread = PAGERANK_DAMPING * dangling / n
+        nxt = [r + spread for r in nxt]
+        delta = sum(abs(a - b) for a, b in zip(nxt, rank))
+        rank = nxt
+        if delta < 1e-9:
+            break
+    return rank
+
+
+_graph_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_graph_lock = threading.Lock()
+
+
+def build_dependency_graph(
+    repo_path: str,
+    code_files: List[str],
+    executor=None,
+    workers: int = DEP_WORKERS,
+) -> Dict[str, Any]:
+    """
+    Import graph of the repository's own modules:
+      {"files": [rel], "imports": [[target index]], "fan_in": [...],
+       "fan_out": [...], "centrality": [...], "edge_count", "digests", "content_hash"}
+    Edges point from importer to imported file; centrality is PageRank over
+    them scaled so the most central file is 1.0. Imports of third-party
+    packages are not edges. Graphs are cached per content hash of the repo.
+    """
+    paths = list(code_files or [])
+    if executor is None and (len(paths) < DEP_PARALLEL_MIN_FILES or workers <= 1):
+        parsed = _parse_many(paths)
+    else:
+        size = max(1, -(-len(paths) // (max(1, workers) * 4)))
+        batches = [paths[i:i + size] for i in range(0, len(paths), size)]
+        if executor is not None:
+            parsed = [p for batch in executor.map(_parse_many, batches) for p in batch]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = [p for batch in pool.map(_parse_many, batches) for p in batch]
+
+    rels = [os.path.relpath(p, repo_path).replace(os.sep, "/") for p, _, _ in parsed]
+    content_hash = hashlib.blake2b(
+        "\n".join(f"{r}\0{d}" for r, (_, d, _) in sorted(zip(rels, parsed))).encode(), digest_size=16
+    ).hexdigest()
+    with _graph_lock:
+        cached = _graph_cache.get(content_hash)
+        if cached is not None:
+            _graph_cache.move_to_end(content_hash)
+            return cached
+
+    resolver = _Resolver(repo_path, rels)
+    n = len(rels)
+    out_edges = []
+    for i, (rel, (_, _, imports)) in enumerate(zip(rels, parsed)):
+        targets = set()
+        for candidates in imports:
+            targets.update(resolver.resolve(rel, candidates))
+        targets.discard(i)
+        out_edges.append(array("I", sorted(targets)))
+
+    fan_in = [0] * n
+    for targets in out_edges:
+        for v in targets:
+            fan_in[v] += 1
+    rank = _pagerank(out_edges, n)
+    top = max(rank) if rank else 1.0
+
+    graph = {
+        "files": rels,
+        "imports": [list(t) for t in out_edges],
+        "fan_in": fan_in,
+        "fan_out": [len(t) for t in out_edges],
+        "centrality": [round(r / top, 4) for r in rank],
+        "edge_count": sum(len(t) for t in out_edges),
+        "digests": [d for _, d, _ in parsed],  # per-file content hashes (reused by dir_summaries)
+        "content_hash": content_hash,
+    }
+    with _graph_lock:
+        _graph_cache[content_hash] = graph
+        if len(_graph_cache) > DEP_GRAPH_CACHE_SIZE:
+            _graph_cache.popitem(last=False)
+    return graph
+
+
+def file_centrality(graph: Optional[Dict[str, Any]], prefix: str = "") -> Dict[str, float]:
+    """
+    {file: centrality} for every file in the graph. With `prefix` ("svc_a/"),
+    only files under it are kept, keyed relative to it (monorepo shards).
+    """
+    if not graph:
+        return {}
+    return {
+        f[len(prefix):]: c
+        for f, c in zip(graph["files"], graph["centrality"])
+        if f.startswith(prefix)
+    }
+
+
+def file_digests(graph: Optional[Dict[str, Any]], prefix: str = "") -> Dict[str, str]:
+    """
+    {file: content hash} from the graph, filtered and keyed like file_centrality().
+    """
+    if not graph:
+        return {}
+    return {
+        f[len(prefix):]: d
+        for f, d in zip(graph["files"], graph.get("digests") or [])
+        if d and f.startswith(prefix)
+    }
+
+
+def central_files(graph: Optional[Dict[str, Any]], n: int = 10) -> List[Dict[str, Any]]:
+    """
+    The n most central modules with their fan-in/fan-out, most central first.
+    """
+    if not graph:
+        return []
+    order = sorted(range(len(graph["files"])), key=lambda i: (-graph["centrality"][i], graph["files"][i]))
+    return [
+        {
+            "file": graph["files"][i],
+            "centrality": graph["centrality"][i],
+            "fan_in": graph["fan_in"][i],
+            "fan_out": graph["fan_out"][i],
+        }
+        for i in order[:n]
+        if graph["fan_in"][i] or graph["fan_out"][i]
+    ]
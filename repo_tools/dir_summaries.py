@@ -0,0 +1,338 @@
+# repo_tools/dir_summaries.py
+import os
+import json
+import time
+import heapq
+import hashlib
+import threading
+import posixpath
+from collections import OrderedDict
+from contextlib import closing
+from typing import Callable, Optional, Dict, Any, List
+
+from repo_tools.job_queue import DATA_DIR
+from repo_tools.sqlite_store import SQLiteStore
+from repo_tools.repo_reader_agent import EXTENSION_LANGUAGES
+
+# SQLite file caching directory summaries by subtree hash; "off" keeps only the in-process cache
+SUMMARY_CACHE_DB = os.getenv("AUDITOR_SUMMARY_CACHE_DB", os.path.join(DATA_DIR, "dir_summaries.db"))
+# Rows kept in the SQLite cache (least recently used are pruned beyond this)
+SUMMARY_CACHE_ROWS = int(os.getenv("AUDITOR_SUMMARY_CACHE_ROWS", "200000"))
+SUMMARY_MEMORY_ROWS = 20000
+# Directory summaries that go into the repo reader prompt
+SUMMARY_PROMPT_BUDGET = int(os.getenv("AUDITOR_SUMMARY_PROMPT_BUDGET", "40"))
+
+TOP_FILES = 3
+MAX_ENTRY_POINTS = 5
+ENTRY_POINT_NAMES = {
+    "main.py", "__main__.py", "app.py", "manage.py", "wsgi.py", "asgi.py", "cli.py",
+    "index.js", "index.ts", "main.js", "main.ts", "server.js", "server.ts", "main.go",
+    "main.rs", "lib.rs", "Main.java", "Application.java",
+}
+# Directory name -> role shown in the summary
+DIR_ROLES = {
+    "tests": "tests", "test": "tests", "__tests__": "tests", "spec": "tests",
+    "docs": "docs", "doc": "docs", "examples": "examples", "example": "examples",
+    "scripts": "scripts", "tools": "tools", "bin": "scripts", "migrations": "migrations",
+    "api": "api", "routes": "api", "handlers": "api", "controllers": "api",
+    "models": "models", "schemas": "models", "services": "services", "utils": "utilities",
+    "helpers": "utilities", "lib": "library", "pkg": "library", "internal": "library",
+    "cmd": "entry points", "config": "config", "settings": "config", "vendor": "vendored",
+    "third_party": "vendored", "benchmarks": "benchmarks",
+}
+
+
+def _file_digest(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except OSError:
+        return "missing"
+
+
+def _merge_top(entries: List[List[Any]], n: int) -> List[List[Any]]:
+    return heapq.nlargest(n, entries, key=lambda e: (e[1], e[0]))
+
+
+def summarize_directory(files: List[Dict[str, Any]], children: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summary of one directory from its own files' metadata ({"name", "size"})
+    and its subdirectories' summaries. Paths inside are relative to the
+    directory, so the summary depends only on the subtree's content.
+    """
+    languages: Dict[str, int] = {}
+    for f in files:
+        lang = EXTENSION_LANGUAGES.get(os.path.splitext(f["name"])[1].lower(), "other")
+        languages[lang] = languages.get(lang, 0) + 1
+
+    largest = [[f["name"], f["size"]] for f in files]
+    entry_points = sorted(f["name"] for f in files if f["name"] in ENTRY_POINT_NAMES)
+    roles = set()
+    total_files, total_bytes = len(files), sum(f["size"] for f in files)
+
+    for name, child in sorted(children.items()):
+        total_files += child["files"]
+        total_bytes += child["bytes"]
+        for lang, n in child["languages"].items():
+            languages[lang] = languages.get(lang, 0) + n
+        largest.extend([f"{name}/{p}", size] for p, size in child["largest_files"])
+        entry_points.extend(f"{name}/{p}" for p in child["entry_points"])
+        role = DIR_ROLES.get(name.lower())
+        if role:
+            roles.add(role)
+
+    return {
+        "files": total_files,
+        "bytes": total_bytes,
+        "languages": dict(sorted(languages.items(), key=lambda kv: (-kv[1], kv[0]))),
+        "own_files": len(files),
+        "subdirs": sorted(children),
+        "largest_files": _merge_top(largest, TOP_FILES),
+        "entry_points": entry_points[:MAX_ENTRY_POINTS],
+        "child_roles": sorted(roles),
+    }
+
+
+class SummaryCache(SQLiteStore):
+    """
+    Directory summaries keyed by the Merkle hash of their subtree (and
+    whole-tree LLM summaries, see cached_repo_summary): an
+    in-process LRU in front of an optional SQLite table shared by every
+    scan (and process) using the same AUDITOR_DATA_DIR.
+    """
+
+    def __init__(self, path: Optional[str] = SUMMARY_CACHE_DB, max_rows: int = SUMMARY_CACHE_ROWS):
+        self.path = path if path and path.lower() not in ("off", "none") else None
+        self.max_rows = max_rows
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path:
+            self._init_db("""
+                CREATE TABLE IF NOT EXISTS dir_summaries (
+                    hash TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    used_at REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_dir_summaries_used ON dir_summaries(used_at);
+            """)
+
+    def get_many(self, hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        with self._lock:
+            for h in hashes:
+                s = self._memory.get(h)
+                if s is not None:
+                    self._memory.move_to_end(h)
+                    found[h] = s
+        missing = [h for h in hashes if h not in found]
+        if not self.path or not missing:
+            return found
+
+        with closing(self._connect()) as conn:
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT hash, summary FROM dir_summaries WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for h, summary in rows:
+                    found[h] = json.loads(summary)
+            # Mark hits as recently used so pruning keeps live subtrees
+            hits = [h for h in missing if h in found]
+            if hits:
+                now = time.time()
+                conn.executemany("UPDATE dir_summaries SET used_at = ? WHERE hash = ?", [(now, h) for h in hits])
+        self._remember({h: found[h] for h in missing if h in found})
+        return found
+
+    def put_many(self, summaries: Dict[str, Dict[str, Any]]) -> None:
+        if not summaries:
+            return
+        self._remember(summaries)
+        if not self.path:
+            return
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO dir_summaries (hash, summary, used_at) VALUES (?, ?, ?)",
+                    [(h, json.dumps(s), now) for h, s in summaries.items()],
+                )
+                if self.max_rows > 0:
+                    (count,) = conn.execute("SELECT COUNT(*) FROM dir_summaries").fetchone()
+                    if count > self.max_rows:
+                        conn.execute(
+                            "DELETE FROM dir_summaries WHERE hash IN "
+                            "(SELECT hash FROM dir_summaries ORDER BY used_at LIMIT ?)",
+                            (count - self.max_rows,),
+                        )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _remember(self, summaries: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            for h, s in summaries.items():
+                self._memory[h] = s
+                self._memory.move_to_end(h)
+            while len(self._memory) > SUMMARY_MEMORY_ROWS:
+                self._memory.popitem(last=False)
+
+
+def build_directory_summaries(
+    repo_path: str,
+    code_files: List[str],
+    digests: Optional[Dict[str, str]] = None,
+    cache: Optional[SummaryCache] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Bottom-up summaries of every directory holding code: {dir: summary},
+    "." being the repository root. Each summary also carries its "hash"
+    (Merkle hash over file content hashes and child hashes), so only
+    directories whose subtree changed since a cached scan are recomputed.
+
+    digests: optional {repo-relative file: content hash} (e.g. from the
+    dependency graph) to avoid reading files a second time.
+    """
+    digests = digests or {}
+    own: Dict[str, List[Dict[str, Any]]] = {}
+    for path in code_files:
+        rel = os.path.relpath(path, repo_path).replace(os.sep, "/")
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        d = posixpath.dirname(rel) or "."
+        own.setdefault(d, []).append({
+            "name": posixpath.basename(rel), "size": size,
+            "digest": digests.get(rel) or _file_digest(path),
+        })
+
+    # Every ancestor of a directory with code is part of the tree
+    children: Dict[str, List[str]] = {".": []}
+    for d in list(own):
+        if d in children:
+            continue
+        children[d] = []
+        while d != ".":
+            parent = posixpath.dirname(d) or "."
+            known = parent in children
+            children.setdefault(parent, []).append(d)
+            if known:
+                break
+            d = parent
+    # Deepest first, so children are done before their parents
+    order = sorted(children, key=lambda d: (-(0 if d == "." else d.count("/") + 1), d))
+
+    hashes: Dict[str, str] = {}
+    for d in order:
+        h = hashlib.blake2b(digest_size=16)
+        for f in sorted(own.get(d, []), key=lambda f: f["name"]):
+            h.update(f"f\0{f['name']}\0{f['digest']}\n".encode())
+        for c in sorted(children[d]):
+            h.update(f"d\0{posixpath.basename(c)}\0{hashes[c]}\n".encode())
+        hashes[d] = h.hexdigest()
+
+    cached = cache.get_many(list(set(hashes.values()))) if cache is not None else {}
+    computed: Dict[str, Dict[str, Any]] = {}
+    summaries: Dict[str, Dict[str, Any]] = {}
+    for d in order:
+        h = hashes[d]
+        summary = cached.get(h) or computed.get(h)
+        if summary is None:
+            summary = summarize_directory(
+                own.get(d, []),
+                {posixpath.basename(c): summaries[c] for c in children[d]},
+            )
+            computed[h] = summary
+        summaries[d] = dict(summary, path=d, hash=h)
+
+    if cache is not None:
+        cache.put_many(computed)
+    print(f"🗂️  Directory summaries: {len(summaries)} dirs, {len(computed)} recomputed")
+    return summaries
+
+
+def cached_repo_summary(
+    summaries: Dict[str, Dict[str, Any]],
+    summarize: Callable[[], Dict[str, Any]],
+    cache: Optional[SummaryCache] = None,
+    kind: str = "repo",
+) -> Dict[str, Any]:
+    """
+    The LLM summary of a whole tree, cached under its root Merkle hash:
+    rescanning an unchanged tree reuses it without calling summarize().
+    `kind` keeps summaries built from different prompts apart. Failed
+    summaries (with an "error" key) are not cached.
+    """
+    root = summaries.get(".")
+    if cache is None or root is None:
+        return summarize()
+    key = f"{kind}:{root['hash']}"
+    summary = cache.get_many([key]).get(key)
+    if summary is not None:
+        print("📖 Repo summary unchanged (cached)")
+        return summary
+    summary = summarize()
+    if isinstance(summary, dict) and "error" not in summary:
+        cache.put_many({key: summary})
+    return summary
+
+
+def _child(d: str, name: str) -> str:
+    return name if d == "." else f"{d}/{name}"
+
+
+def select_directory_summaries(
+    summaries: Dict[str, Dict[str, Any]],
+    budget: int = SUMMARY_PROMPT_BUDGET,
+) -> List[Dict[str, Any]]:
+    """
+    A bounded, prompt-sized view of the tree: starting from the root, the
+    largest directory (by files in its subtree) is repeatedly expanded into
+    its children until `budget` directories are selected. Returns compact
+    summaries, shallowest first.
+    """
+    if not summaries:
+        return []
+    chosen = {"."}
+    frontier = []
+    expand = "."
+    while True:
+        for name in summaries[expand]["subdirs"]:
+            child = _child(expand, name)
+            heapq.heappush(frontier, (-summaries[child]["files"], child))
+        if not frontier or len(chosen) >= budget:
+            break
+        _, expand = heapq.heappop(frontier)
+        chosen.add(expand)
+
+    out = []
+    for d in sorted(chosen, key=lambda p: (0 if p == "." else p.count("/") + 1, p)):
+        s = summaries[d]
+        out.append({
+            "dir": d,
+            "files": s["files"],
+            "kb": round(s["bytes"] / 1024, 1),
+            "languages": dict(list(s["languages"].items())[:3]),
+            "largest_files": [p for p, _ in s["largest_files"]],
+            "entry_points": s["entry_points"],
+            "child_roles": s["child_roles"],
+            # Subdirectories not expanded into their own entry
+            "collapsed_subdirs": sum(1 for c in s["subdirs"] if _child(d, c) not in chosen),
+        })
+    return out
+
+
+_cache = None
+
+
+def get_summary_cache() -> SummaryCache:
+    """
+    Process-wide cache at AUDITOR_SUMMARY_CACHE_DB (memory-only when "off").
+    """
+    global _cache
+    if _cache is None:
+        _cache = SummaryCache(SUMMARY_CACHE_DB)
+    return _cache
@@ -1,17 +1,19 @@
 # repo_tools/issue_categorizer_agent.py
 import hashlib
 import re
+from functools import lru_cache
 from typing import List, Dict, Any
 
+from repo_tools.issue_record import IssueRecord, CATEGORIES, by_severity
+
 # Canonical categories we use across the pipeline
-CANONICAL_CATEGORIES = {
-    "security", "performance", "bug", "maintainability", "readability", "style", "tests", "other"
-}
+CANONICAL_CATEGORIES = set(CATEGORIES)
 
 # Mapping heuristics for static tool types to categories
 STATIC_TYPE_TO_CATEGORY = {
     "security": "security",
     "complexity": "maintainability",
+    "maintainability": "maintainability",
     "style": "style",
     "performance": "performance",
     "bug": "bug",
@@ -34,19 +36,34 @@ SEVERITY_MAP = {
     "warning": "medium",
 }
 
+_WHITESPACE = re.compile(r"\s+")
+
 def _norm_text(s: str) -> str:
     if not s:
         return ""
-    return re.sub(r"\s+", " ", s.strip())
+    return _WHITESPACE.sub(" ", s.strip())
 
 def _fingerprint_issue(file: str, line: Any, description: str) -> str:
     """
     Create a deterministic short id for an issue based on file, line and description.
     """
-    key = f"{file}|{line}|{_norm_text(description)[:250]}"
+    return _fingerprint_normalized(file, line, _norm_text(description))
+
+def _fingerprint_normalized(file: str, line: Any, norm_description: str) -> str:
+    key = f"{file}|{line}|{norm_description[:250]}"
     h = hashlib.md5(key.encode("utf-8")).hexdigest()
     return h[:10].upper()
 
+def static_issue_fingerprint(it: Dict[str, Any], file: str = None) -> str:
+    """
+    The id merge_and_categorize_issues will give a raw static-analyzer issue.
+    `file` overrides the issue's own path (e.g. shard-relative -> repo-relative).
+    """
+    file = file or it.get("file") or it.get("filename") or "<unknown>"
+    line = it.get("line") or it.get("line_number") or it.get("lineno") or None
+    raw_msg = it.get("message") or it.get("issue_text") or str(it)
+    return _fingerprint_issue(file, line, raw_msg)
+
 def _map_severity(raw: Any, tool: str = None, value: Any = None) -> str:
     """
     Normalize severity into critical/high/medium/low.
@@ -80,6 +97,7 @@ def _map_severity(raw: Any, tool: str = None, value: Any = None) -> str:
 
     return "medium"
 
+@lru_cache(maxsize=1024)
 def _normalize_category(raw_cat: str, fallback_type: str = None) -> str:
     if not raw_cat:
         # fallback from tool/type
@@ -114,90 +132,102 @@ def _normalize_category(raw_cat: str, fallback_type: str = None) -> str:
 
     return "other"
 
-def merge_and_categorize_issues(static_issues: List[Dict[str, Any]], llm_issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+@lru_cache(maxsize=256)
+def _severity_token(raw: str) -> str:
+    # Tools use a handful of severity tokens: map each once
+    return _map_severity(raw)
+
+def categorize_static_issue(it: Dict[str, Any]) -> IssueRecord:
     """
-    Combine static + llm issues, normalize, deduplicate, and return canonical list of issues.
+    One raw static-analyzer issue as a canonical IssueRecord.
     """
-    merged = []
-
-    # Process static issues first
-    for it in static_issues or []:
-        file = it.get("file") or it.get("filename") or "<unknown>"
-        line = it.get("line") or it.get("line_number") or it.get("lineno") or None
-        tool = it.get("tool") or it.get("source") or "static"
-        raw_type = it.get("type") or it.get("issue_type") or None
-        raw_msg = it.get("message") or it.get("issue_text") or str(it)
-        value = it.get("value")  # e.g., radon complexity numeric
-
-        category = _normalize_category(raw_type, fallback_type=raw_type)
-        severity = _map_severity(it.get("severity") or it.get("issue_severity") or it.get("level"), tool=tool, value=value)
-
-        obj = {
-            "id": _fingerprint_issue(file, line, raw_msg),
-            "file": file,
-            "line": line,
-            "category": category,
-            "severity": severity,
-            "description": _norm_text(raw_msg),
-            "source": tool,
-            "confidence": 0.9  # static tools are usually reliable
-        }
-        merged.append(obj)
-
-    # Process LLM-detected issues
-    for it in llm_issues or []:
-        file = it.get("file") or "<unknown>"
-        line = it.get("line") or None
-        raw_cat = it.get("category") or ""
-        severity_raw = it.get("severity") or it.get("level") or None
-        desc = it.get("description") or it.get("suggestion") or str(it)
-
-        category = _normalize_category(raw_cat, fallback_type=None)
-        severity = _map_severity(severity_raw, tool="llm")
-
-        obj = {
-            "id": _fingerprint_issue(file, line, desc),
-            "file": file,
-            "line": line,
-            "category": category,
-            "severity": severity,
-            "description": _norm_text(desc),
-            "source": "llm",
-            # LLM confidence is lower than deterministic static tools by default
-            "confidence": float(it.get("confidence", 0.6))
-        }
-        merged.append(obj)
+    file = it.get("file") or it.get("filename") or "<unknown>"
+    line = it.get("line") or it.get("line_number") or it.get("lineno") or None
+    tool = it.get("tool") or it.get("source") or "static"
+    raw_type = it.get("type") or it.get("issue_type") or None
+    raw_msg = it.get("message") or it.get("issue_text") or str(it)
+    value = it.get("value")  # e.g., radon complexity numeric
+
+    category = _normalize_category(raw_type, fallback_type=raw_type) if isinstance(raw_type, str) or raw_type is None else "other"
+    raw_sev = it.get("severity") or it.get("issue_severity") or it.get("level")
+    if value is None and isinstance(raw_sev, str):
+        severity = _severity_token(raw_sev)
+    else:
+        severity = _map_severity(raw_sev, tool=tool, value=value)
+    description = _norm_text(raw_msg)
+
+    return IssueRecord(
+        id=_fingerprint_normalized(file, line, description),
+        file=file,
+        line=line,
+        category=category,
+        severity=severity,
+        description=description,
+        source=tool,
+        confidence=0.9  # static tools are usually reliable
+    )
+
+def categorize_llm_issue(it: Dict[str, Any]) -> IssueRecord:
+    """
+    One LLM-detected issue as a canonical IssueRecord.
+    """
+    file = it.get("file") or "<unknown>"
+    line = it.get("line") or None
+    raw_cat = it.get("category") or ""
+    severity_raw = it.get("severity") or it.get("level") or None
+    desc = it.get("description") or it.get("suggestion") or str(it)
+
+    category = _normalize_category(raw_cat, fallback_type=None) if isinstance(raw_cat, str) else "other"
+    severity = _map_severity(severity_raw, tool="llm")
+    description = _norm_text(desc)
+
+    return IssueRecord(
+        id=_fingerprint_normalized(file, line, description),
+        file=file,
+        line=line,
+        category=category,
+        severity=severity,
+        description=description,
+        source="llm",
+        # LLM confidence is lower than deterministic static tools by default
+        confidence=float(it.get("confidence", 0.6))
+    )
+
+def merge_duplicate(prev: IssueRecord, it: IssueRecord) -> IssueRecord:
+    """
+    Combine a later issue with the same fingerprint into the one kept so far.
+    Returns the record to keep (`prev`, updated in place, or `it`).
+    """
+    # keep the one with higher confidence; if equal, keep higher severity
+    if it.confidence > prev.confidence:
+        return it
+    # maybe update severity to worse one
+    severity_rank = {"critical":4, "high":3, "medium":2, "low":1}
+    if severity_rank.get(it.severity,2) > severity_rank.get(prev.severity,2):
+        prev.severity = it.severity
+    # append notes to description if different
+    if it.description != prev.description:
+        prev.description = prev.description + " || " + it.description
+    return prev
+
+def merge_and_categorize_issues(static_issues: List[Dict[str, Any]], llm_issues: List[Dict[str, Any]]) -> List[IssueRecord]:
+    """
+    Combine static + llm issues, normalize, deduplicate, and return canonical list of issues
+    as IssueRecords (repo_tools.issue_record.issues_to_dicts() gives the dict form).
+    """
+    merged = [categorize_static_issue(it) for it in static_issues or []]
+    merged.extend(categorize_llm_issue(it) for it in llm_issues or [])
 
     # Deduplicate: keep highest-confidence entry per fingerprint
     dedup = {}
     for it in merged:
-        fid = it["id"]
+        fid = it.id
         prev = dedup.get(fid)
-        if not prev:
-            dedup[fid] = it
-        else:
-            # keep the one with higher confidence; if equal, keep higher severity
-            if it.get("confidence", 0.5) > prev.get("confidence", 0.5):
-                dedup[fid] = it
-            else:
-                # maybe update severity to worse one
-                severity_rank = {"critical":4, "high":3, "medium":2, "low":1}
-                if severity_rank.get(it["severity"],2) > severity_rank.get(prev["severity"],2):
-                    prev["severity"] = it["severity"]
-                # append notes to description if different
-                if it["description"] != prev["description"]:
-                    prev["description"] = prev["description"] + " || " + it["description"]
+        dedup[fid] = it if not prev else merge_duplicate(prev, it)
 
     # Convert to list and sort by severity + confidence
-    def severity_score(s):
-        mapping = {"critical": 100, "high": 75, "medium": 50, "low": 25}
-        return mapping.get(s, 50)
-
+    # (categories are canonical already: IssueRecord maps anything else to "other")
     categorized = list(dedup.values())
-    categorized.sort(key=lambda x: ( -severity_score(x.get("severity")), -x.get("confidence", 0.0), x.get("file", "")))
-
-    # Add a small normalized category field to ensure it's canonical
-    for it in categorized:
-        it["category"] = it.get("category") if it.get("category") in CANONICAL_CATEGORIES else "other"
+    categorized.sort(key=by_severity)
 
     return categorized
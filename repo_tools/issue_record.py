@@ -0,0 +1,221 @@
+# repo_tools/issue_record.py
+import sys
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Canonical vocabularies: records store an index into these, not the string
+SEVERITIES = ("critical", "high", "medium", "low")
+CATEGORIES = ("security", "performance", "bug", "maintainability", "readability", "style", "tests", "other")
+
+_SEVERITY_CODES = {s: i for i, s in enumerate(SEVERITIES)}
+_CATEGORY_CODES = {c: i for i, c in enumerate(CATEGORIES)}
+
+# Sources are open-ended (any static tool name), so their table grows on demand
+_sources: List[str] = ["static", "llm", "bandit", "flake8", "radon", "secrets", "clones"]
+_source_codes: Dict[str, int] = {s: i for i, s in enumerate(_sources)}
+_sources_lock = threading.Lock()
+
+_KEYS = frozenset((
+    "id", "file", "line", "category", "severity", "description", "source",
+    "confidence", "priority_score", "priority",
+))
+_PRIORITY_KEYS = frozenset(("priority_score", "priority"))
+
+
+def _source_code(name: str) -> int:
+    code = _source_codes.get(name)
+    if code is None:
+        with _sources_lock:
+            code = _source_codes.get(name)
+            if code is None:
+                code = len(_sources)
+                _sources.append(sys.intern(name))
+                _source_codes[name] = code
+    return code
+
+
+def intern_path(path: Any) -> Any:
+    """
+    The shared copy of a file path string (non-strings pass through).
+    """
+    return sys.intern(path) if type(path) is str else path
+
+
+class IssueRecord:
+    """
+    One categorized (and later prioritized) issue, stored compactly: no
+    per-record dict, interned file paths, and category/severity/source kept
+    as small integer codes. Stages pass these around; issues_to_dicts()
+    turns them back into the plain dicts reports and APIs expose.
+
+    get() and [] accept the dict keys, so code written against issue dicts
+    can read records unchanged.
+    """
+
+    __slots__ = (
+        "id", "file", "line", "description", "confidence", "priority_score",
+        "_category", "_severity", "_source", "_priority",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        file: str,
+        line: Optional[int],
+        category: str,
+        severity: str,
+        description: str,
+        source: str,
+        confidence: float,
+    ):
+        self.id = id
+        self.file = intern_path(file)
+        self.line = line
+        self.description = description
+        self.confidence = confidence
+        self.priority_score = None
+        self._category = _CATEGORY_CODES.get(category, _CATEGORY_CODES["other"])
+        self._severity = _SEVERITY_CODES.get(severity, _SEVERITY_CODES["medium"])
+        self._source = _source_code(source)
+        self._priority = None
+
+    @property
+    def category(self) -> str:
+        return CATEGORIES[self._category]
+
+    @category.setter
+    def category(self, value: str) -> None:
+        self._category = _CATEGORY_CODES.get(value, _CATEGORY_CODES["other"])
+
+    @property
+    def severity(self) -> str:
+        return SEVERITIES[self._severity]
+
+    @severity.setter
+    def severity(self, value: str) -> None:
+        self._severity = _SEVERITY_CODES.get(value, _SEVERITY_CODES["medium"])
+
+    @property
+    def source(self) -> str:
+        return _sources[self._source]
+
+    @property
+    def priority(self) -> Optional[str]:
+        return None if self._priority is None else SEVERITIES[self._priority]
+
+    @priority.setter
+    def priority(self, value: Optional[str]) -> None:
+        self._priority = None if value is None else _SEVERITY_CODES.get(value, _SEVERITY_CODES["medium"])
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in _KEYS or (key in _PRIORITY_KEYS and self.priority_score is None):
+            return default
+        return getattr(self, key)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _KEYS or (key in _PRIORITY_KEYS and self.priority_score is None):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {
+            "id": self.id,
+            "file": self.file,
+            "line": self.line,
+            "category": CATEGORIES[self._category],
+            "severity": SEVERITIES[self._severity],
+            "description": self.description,
+            "source": _sources[self._source],
+            "confidence": self.confidence,
+        }
+        if self.priority_score is not None:
+            d["priority_score"] = self.priority_score
+            d["priority"] = SEVERITIES[self._priority]
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "IssueRecord":
+        rec = cls(
+            d.get("id"), d.get("file"), d.get("line"), d.get("category"), d.get("severity"),
+            d.get("description"), d.get("source") or "static", d.get("confidence", 0.6),
+        )
+        if d.get("priority_score") is not None:
+            rec.priority_score = d["priority_score"]
+            rec.priority = d.get("priority")
+        return rec
+
+    def to_row(self) -> tuple:
+        """
+        Plain tuple form for spilling to disk (codes are only valid in this process).
+        """
+        return (self.id, self.file, self.line, self.description, self.confidence, self.priority_score,
+                self._category, self._severity, self._source, self._priority)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "IssueRecord":
+        rec = cls.__new__(cls)
+        (rec.id, rec.file, rec.line, rec.description, rec.confidence, rec.priority_score,
+         rec._category, rec._severity, rec._source, rec._priority) = row
+        rec.file = intern_path(rec.file)
+        return rec
+
+    def __repr__(self) -> str:
+        return f"IssueRecord({self.to_dict()!r})"
+
+
+def by_severity(rec: IssueRecord):
+    """
+    Sort key for categorized issues: worst severity, then most confident, then file.
+    """
+    return (rec._severity, -rec.confidence, rec.file or "")
+
+
+def as_record(issue: Any) -> IssueRecord:
+    return issue if isinstance(issue, IssueRecord) else IssueRecord.from_dict(issue)
+
+
+def issues_to_dicts(issues: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Plain dicts for the report/serialization boundary (dicts pass through).
+    """
+    return [it.to_dict() if isinstance(it, IssueRecord) else it for it in issues]
+
+
+class IssueDicts:
+    """
+    issues_to_dicts() without the list: a sized view that builds each dict
+    as it is iterated (again on every iteration). Reports carry one for
+    issue_stream.RankedIssues, so spilled rankings stay on disk until the
+    report is serialized. Its records may live in the scan's workspace:
+    serialize before the workspace is cleaned up, with json_default.
+    """
+
+    __slots__ = ("_issues",)
+
+    def __init__(self, issues: Any):
+        self._issues = issues
+
+    def __len__(self) -> int:
+        return len(self._issues)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (it.to_dict() if isinstance(it, IssueRecord) else it for it in self._issues)
+
+
+def json_default(obj: Any) -> Any:
+    """
+    `default=` hook for json.dump(s) of reports (encodes IssueDicts views).
+    """
+    if isinstance(obj, IssueDicts):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def materialize_issues(report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    `report` with a lazy issues view replaced by the list, for reports that
+    outlive their scan's workspace.
+    """
+    if isinstance(report.get("issues"), IssueDicts):
+        report["issues"] = list(report["issues"])
+    return report
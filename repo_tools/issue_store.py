@@ -0,0 +1,337 @@
+# repo_tools/issue_store.py
+import os
+import json
+import time
+import base64
+import posixpath
+from contextlib import closing
+from typing import Optional, Dict, Any, List
+
+from repo_tools.job_queue import DATA_DIR
+from repo_tools.sqlite_store import SQLiteStore
+
+# SQLite file holding persisted scan reports; "off" disables persistence
+ISSUE_DB = os.getenv("AUDITOR_ISSUE_DB", os.path.join(DATA_DIR, "issues.db"))
+# Oldest scans beyond this many are pruned on ingest (0 = keep everything)
+ISSUE_RETENTION = int(os.getenv("AUDITOR_ISSUE_RETENTION", "200"))
+
+SEVERITY_RANK = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+
+# sort name -> (key columns, default order). Ties always break on report order (seq).
+SORTS = {
+    "priority": (("priority_score",), "desc"),
+    "severity": (("severity_rank", "priority_score"), "desc"),
+    "confidence": (("confidence",), "desc"),
+    "file": (("file", "line_no"), "asc"),
+}
+
+# Filter name -> column (all indexed together with scan_id)
+FILTERS = {
+    "severity": "severity",
+    "category": "category",
+    "priority": "priority",
+    "source": "source",
+    "file": "file",
+}
+
+MAX_PAGE_SIZE = 500
+
+
+def _dir_of(path: str) -> str:
+    return posixpath.dirname((path or "").replace("\\", "/")) or "."
+
+
+def _encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+class IssueStore(SQLiteStore):
+    """
+    Scan reports persisted to SQLite, one row per issue, indexed so a UI can
+    fetch a filtered, sorted page (or per-file / per-directory aggregates)
+    instead of downloading the whole report.
+
+    Pagination is keyset-based: the cursor is the sort key of the last row
+    returned, so deep pages cost the same as the first one.
+    """
+
+    def __init__(self, path: str = ISSUE_DB, retention: int = ISSUE_RETENTION):
+        self.path = path
+        self.retention = retention
+        self._init_db("""
+            CREATE TABLE IF NOT EXISTS scans (
+                id TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                total_issues INTEGER NOT NULL,
+                summary TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_scans_created ON scans(created_at);
+
+            CREATE TABLE IF NOT EXISTS issues (
+                scan_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                file TEXT NOT NULL,
+                dir TEXT NOT NULL,
+                line_no INTEGER NOT NULL,
+                severity TEXT,
+                severity_rank INTEGER NOT NULL,
+                category TEXT,
+                priority TEXT,
+                priority_score REAL NOT NULL,
+                confidence REAL NOT NULL,
+                source TEXT,
+                data TEXT NOT NULL,
+                PRIMARY KEY (scan_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS idx_issues_severity ON issues(scan_id, severity);
+            CREATE INDEX IF NOT EXISTS idx_issues_category ON issues(scan_id, category);
+            CREATE INDEX IF NOT EXISTS idx_issues_priority ON issues(scan_id, priority);
+            CREATE INDEX IF NOT EXISTS idx_issues_source ON issues(scan_id, source);
+            CREATE INDEX IF NOT EXISTS idx_issues_file ON issues(scan_id, file, line_no);
+            CREATE INDEX IF NOT EXISTS idx_issues_dir ON issues(scan_id, dir);
+            CREATE INDEX IF NOT EXISTS idx_issues_score ON issues(scan_id, priority_score DESC, seq);
+            CREATE INDEX IF NOT EXISTS idx_issues_rank ON issues(scan_id, severity_rank DESC, priority_score DESC, seq);
+            CREATE INDEX IF NOT EXISTS idx_issues_confidence ON issues(scan_id, confidence DESC, seq);
+        """)
+
+    ############################
+    # Ingest
+    ############################
+    def save_report(self, scan_id: str, report: Dict[str, Any]) -> int:
+        """
+        Store a final_output report. Everything except the issues array is
+        kept as the scan summary. Returns the number of issues stored.
+        """
+        issues = report.get("issues") or []
+        summary = {k: v for k, v in report.items() if k != "issues"}
+        rows = []
+        for seq, it in enumerate(issues):
+            file = str(it.get("file") or "<unknown>")
+            line = it.get("line")
+            rows.append((
+                scan_id, seq, file, _dir_of(file),
+                line if isinstance(line, int) else 0,
+                it.get("severity"), SEVERITY_RANK.get(it.get("severity"), 0),
+                it.get("category"), it.get("priority"),
+                float(it.get("priority_score") or 0.0), float(it.get("confidence") or 0.0),
+                it.get("source"), json.dumps(it),
+            ))
+
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM issues WHERE scan_id = ?", (scan_id,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO scans (id, created_at, total_issues, summary) VALUES (?, ?, ?, ?)",
+                    (scan_id, time.time(), len(rows), json.dumps(summary)),
+                )
+                conn.executemany("INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._prune(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def _prune(self, conn):
+        if self.retention <= 0:
+            return
+        old = [r[0] for r in conn.execute(
+            "SELECT id FROM scans ORDER BY created_at DESC LIMIT -1 OFFSET ?", (self.retention,)
+        )]
+        for scan_id in old:
+            conn.execute("DELETE FROM issues WHERE scan_id = ?", (scan_id,))
+            conn.execute("DELETE FROM scans WHERE id = ?", (scan_id,))
+
+    ############################
+    # Queries
+    ############################
+    def get_scan(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """
+        The report without its issues array, or None for an unknown scan.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT created_at, total_issues, summary FROM scans WHERE id = ?", (scan_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"scan_id": scan_id, "created_at": row[0], "total_issues": row[1], "report": json.loads(row[2])}
+
+    def fingerprints(self, scan_id: str) -> List[str]:
+        """
+        Every issue id of a stored scan (e.g. to export it as a baseline).
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT json_extract(data, '$.id') FROM issues WHERE scan_id = ? ORDER BY 1", (scan_id,)
+            ).fetchall()
+        return [r[0] for r in rows if r[0]]
+
+    def query_issues(
+        self,
+        scan_id: str,
+        filters: Dict[str, List[str]] = None,
+        path_prefix: str = None,
+        sort: str = "priority",
+        order: str = None,
+        limit: int = 50,
+        cursor: str = None,
+        with_total: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        One page of issues. `filters` maps FILTERS names to accepted values
+        (OR within a filter, AND across filters); `path_prefix` keeps files
+        under a directory. Pass the returned next_cursor to get the next page.
+        Raises ValueError for unknown sort/order/filter names or a bad cursor.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort '{sort}'. Use one of: {', '.join(SORTS)}")
+        cols, default_order = SORTS[sort]
+        order = (order or default_order).lower()
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        where, params = ["scan_id = ?"], [scan_id]
+        for name, values in (filters or {}).items():
+            if name not in FILTERS:
+                raise ValueError(f"Unknown filter '{name}'")
+            if values:
+                where.append(f"{FILTERS[name]} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        if path_prefix:
+            prefix = path_prefix.replace("\\", "/").rstrip("/") + "/"
+            # Range instead of LIKE so the file index is used
+            where.append("file >= ? AND file < ?")
+            params.extend([prefix, prefix + "\U0010ffff"])
+
+        total = None
+        if with_total:
+            with closing(self._connect()) as conn:
+                total = conn.execute(f"SELECT COUNT(*) FROM issues WHERE {' AND '.join(where)}", params).fetchone()[0]
+
+        page_where, page_params = list(where), list(params)
+        if cursor:
+            values = _decode_cursor(cursor, len(cols) + 1)
+            clause, clause_params = _keyset_clause(cols, order, values)
+            page_where.append(clause)
+            page_params.extend(clause_params)
+
+        direction = order.upper()
+        order_by = ", ".join(f"{c} {direction}" for c in cols) + ", seq ASC"
+        sql = (f"SELECT {', '.join(cols)}, seq, data FROM issues WHERE {' AND '.join(page_where)} "
+               f"ORDER BY {order_by} LIMIT ?")
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, page_params + [limit + 1]).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(list(rows[-1][:len(cols) + 1])) if has_more else None
+        return {
+            "scan_id": scan_id,
+            "items": [json.loads(r[-1]) for r in rows],
+            "next_cursor": next_cursor,
+            "total": total,
+        }
+
+    def file_aggregates(self, scan_id: str, sort: str = "count", limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Per-file issue counts (total and per severity) and the highest priority score.
+        """
+        order_by = {"count": "issues DESC, file", "priority": "max_priority_score DESC, file", "file": "file"}
+        if sort not in order_by:
+            raise ValueError(f"Unknown sort '{sort}'. Use one of: {', '.join(order_by)}")
+        sql = f"""
+            SELECT file, COUNT(*) AS issues,
+                   SUM(severity = 'critical'), SUM(severity = 'high'),
+                   SUM(severity = 'medium'), SUM(severity = 'low'),
+                   MAX(priority_score) AS max_priority_score
+            FROM issues WHERE scan_id = ? GROUP BY file
+            ORDER BY {order_by[sort]} LIMIT ? OFFSET ?
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, (scan_id, max(1, min(int(limit), MAX_PAGE_SIZE)), max(0, int(offset)))).fetchall()
+        return [_aggregate_row(r) for r in rows]
+
+    def directory_aggregates(self, scan_id: str, depth: int = None) -> List[Dict[str, Any]]:
+        """
+        Per-directory aggregates. With `depth`, deeper directories are rolled up
+        into their ancestor `depth` levels below the root.
+        """
+        sql = """
+            SELECT dir, COUNT(*),
+                   SUM(severity = 'critical'), SUM(severity = 'high'),
+                   SUM(severity = 'medium'), SUM(severity = 'low'),
+                   MAX(priority_score)
+            FROM issues WHERE scan_id = ? GROUP BY dir
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, (scan_id,)).fetchall()
+
+        rolled = {}
+        for r in rows:
+            d = r[0]
+            if depth is not None and d != ".":
+                parts = d.split("/")
+                # Keep the leading "" of absolute paths so "/a/b" rolls up to "/a"
+                d = "/".join(parts[:depth + (parts[0] == "")])
+            agg = rolled.setdefault(d, [d, 0, 0, 0, 0, 0, 0.0])
+            for i in range(1, 6):
+                agg[i] += r[i] or 0
+            agg[6] = max(agg[6], r[6] or 0.0)
+
+        out = [_aggregate_row(r, key="dir") for r in rolled.values()]
+        out.sort(key=lambda a: (-a["issues"], a["dir"]))
+        return out
+
+
+def _keyset_clause(cols, order, values):
+    """
+    "Rows after `values`" for ORDER BY cols <order>, seq ASC, written as an
+    OR-chain so SQLite can use the composite index.
+    """
+    op = "<" if order == "desc" else ">"
+    *keys, seq = values
+    parts, params = [], []
+    for i, col in enumerate(cols):
+        eq = [f"{c} = ?" for c in cols[:i]]
+        parts.append("(" + " AND ".join(eq + [f"{col} {op} ?"]) + ")")
+        params.extend(keys[:i] + [keys[i]])
+    parts.append("(" + " AND ".join([f"{c} = ?" for c in cols] + ["seq > ?"]) + ")")
+    params.extend(keys + [seq])
+    return "(" + " OR ".join(parts) + ")", params
+
+
+def _aggregate_row(r, key="file"):
+    return {
+        key: r[0],
+        "issues": r[1],
+        "by_severity": {"critical": r[2] or 0, "high": r[3] or 0, "medium": r[4] or 0, "low": r[5] or 0},
+        "max_priority_score": r[6],
+    }
+
+
+_store = None
+
+
+def get_issue_store() -> Optional[IssueStore]:
+    """
+    Process-wide store at AUDITOR_ISSUE_DB, or None when persistence is off.
+    """
+    global _store
+    if ISSUE_DB.lower() in ("", "off", "none"):
+        return None
+    if _store is None:
+        _store = IssueStore(ISSUE_DB)
+    return _store
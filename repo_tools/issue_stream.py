@@ -0,0 +1,218 @@
+# repo_tools/issue_stream.py
+import os
+import heapq
+import pickle
+import shutil
+import tempfile
+import weakref
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from repo_tools.issue_record import IssueRecord, as_record
+from repo_tools.issue_categorizer_agent import (
+    categorize_static_issue, categorize_llm_issue, merge_duplicate
+)
+from repo_tools.priority_agent import compute_priority_score, score_to_priority, PRIORITY_ORDER
+
+# Fused categorize -> dedup -> score -> summarize stage instead of the separate categorizer/priority nodes
+ISSUE_STREAM_ENABLED = os.getenv("AUDITOR_ISSUE_STREAM", "0") == "1"
+# Issues held in memory per phase before a sorted run is spilled to disk
+ISSUE_MEMORY_BUDGET = int(os.getenv("AUDITOR_ISSUE_MEMORY_BUDGET", "100000"))
+# Rows per pickle batch in a run file
+SPILL_BATCH = 2048
+
+
+def _write_run(path: str, rows: List[tuple]) -> None:
+    with open(path, "wb") as f:
+        for i in range(0, len(rows), SPILL_BATCH):
+            pickle.dump(rows[i:i + SPILL_BATCH], f, pickle.HIGHEST_PROTOCOL)
+
+
+def _read_run(path: str) -> Iterator[tuple]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+class RankedIssues:
+    """
+    The final ranking: IssueRecords, highest priority first. Backed by an
+    in-memory list or by sorted runs on disk that are merged lazily on each
+    iteration, so only one batch per run is in memory at a time.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        records: Optional[List[IssueRecord]] = None,
+        runs: Optional[List[str]] = None,
+        owner: Any = None,
+    ):
+        self._count = count
+        self._records = records
+        self._runs = runs or []
+        # Whatever removes the run files when collected (the IssueStream) must live as long as we do
+        self._owner = owner
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[IssueRecord]:
+        if self._records is not None:
+            return iter(self._records)
+        merged = heapq.merge(*(_read_run(p) for p in self._runs), key=itemgetter(0))
+        return (IssueRecord.from_row(row) for _, row in merged)
+
+    @property
+    def spilled(self) -> bool:
+        return self._records is None
+
+
+class IssueStream:
+    """
+    Memory-bounded replacement for merge_and_categorize_issues() followed by
+    assign_priorities() and the two summaries.
+
+    Issues are categorized as they are added (from any iterable, e.g. an
+    analyzer generator). finish() deduplicates them, scores them and counts
+    the summaries in one pass, and returns the ranked RankedIssues. Whenever
+    more than `memory_budget` issues are buffered, the buffer is sorted and
+    spilled as a run file. Runs are combined by an external k-way merge, so
+    peak memory stays around one budget's worth of records however many
+    issues come in. The order and the summaries match the in-memory stages.
+
+    Runs go to a directory of `workspace` (repo_tools.workspace.Workspace)
+    when given, otherwise to a temp directory removed with this object.
+    """
+
+    def __init__(
+        self,
+        centrality: Optional[Dict[str, float]] = None,
+        memory_budget: Optional[int] = None,
+        workspace: Any = None,
+    ):
+        self.centrality = centrality or {}
+        self.memory_budget = max(1, ISSUE_MEMORY_BUDGET if memory_budget is None else memory_budget)
+        self.workspace = workspace
+        self.categorized_summary: Dict[str, Any] = {}
+        self.priority_summary: Dict[str, Any] = {}
+        self._seq = 0
+        self._buffer: List[tuple] = []  # (id, seq, row)
+        self._runs: List[str] = []
+        self._dir: Optional[str] = None
+        self._spills = 0
+
+    # -- input --------------------------------------------------------------
+
+    def add_static(self, issues: Iterable[Dict[str, Any]]) -> None:
+        for it in issues or []:
+            self._add(categorize_static_issue(it))
+
+    def add_llm(self, issues: Iterable[Dict[str, Any]]) -> None:
+        for it in issues or []:
+            self._add(categorize_llm_issue(it))
+
+    def add_records(self, records: Iterable[Any]) -> None:
+        """
+        Issues categorized elsewhere (e.g. by the monorepo shards).
+        """
+        for it in records or []:
+            self._add(as_record(it))
+
+    def _add(self, rec: IssueRecord) -> None:
+        self._buffer.append((rec.id, self._seq, rec.to_row()))
+        self._seq += 1
+        if len(self._buffer) >= self.memory_budget:
+            self._spill(self._buffer, "dedup")
+            self._buffer = []
+
+    # -- spilling -----------------------------------------------------------
+
+    def _spill(self, rows: List[tuple], phase: str) -> str:
+        if self._dir is None:
+            if self.workspace is not None:
+                self._dir = self.workspace.make_dir(prefix="issues_")
+            else:
+                self._dir = tempfile.mkdtemp(prefix="issues_")
+            weakref.finalize(self, shutil.rmtree, self._dir, True)
+        rows.sort(key=itemgetter(0, 1) if phase == "dedup" else itemgetter(0))
+        path = os.path.join(self._dir, f"{phase}_{self._spills}.run")
+        self._spills += 1
+        _write_run(path, rows)
+        if phase == "dedup":
+            self._runs.append(path)
+        return path
+
+    def _deduplicated(self) -> Iterator[tuple]:
+        """
+        (first seq, record) per fingerprint, folding duplicates in arrival
+        order exactly like merge_and_categorize_issues().
+        """
+        self._buffer.sort(key=itemgetter(0, 1))
+        sources = [_read_run(p) for p in self._runs] + [iter(self._buffer)]
+        merged = heapq.merge(*sources, key=itemgetter(0, 1)) if len(sources) > 1 else sources[0]
+        for _, group in groupby(merged, key=itemgetter(0)):
+            _, first_seq, row = next(group)
+            kept = IssueRecord.from_row(row)
+            for _, _, row in group:
+                kept = merge_duplicate(kept, IssueRecord.from_row(row))
+            yield first_seq, kept
+
+    # -- output -------------------------------------------------------------
+
+    def finish(self) -> RankedIssues:
+        by_severity: Dict[str, int] = {}
+        by_category: Dict[str, list] = {}  # category -> [count, first position in categorized order]
+        priorities = {p: 0 for p in PRIORITY_ORDER}
+        ranked: List[tuple] = []
+        rank_runs: List[str] = []
+        total = 0
+
+        for first_seq, rec in self._deduplicated():
+            total += 1
+            score = compute_priority_score(rec, self.centrality.get(rec.file, 0.0))
+            rec.priority_score = score
+            rec.priority = score_to_priority(score)
+            priorities[rec.priority] = priorities.get(rec.priority, 0) + 1
+
+            order = (rec._severity, -rec.confidence, rec.file or "", first_seq)
+            by_severity[rec.severity] = by_severity.get(rec.severity, 0) + 1
+            cat = by_category.get(rec.category)
+            if cat is None:
+                by_category[rec.category] = [1, order]
+            else:
+                cat[0] += 1
+                if order < cat[1]:
+                    cat[1] = order
+
+            # Same order as assign_priorities() applied to the categorized list
+            ranked.append(((-score, rec.file or "", rec._severity, -rec.confidence, first_seq), rec.to_row()))
+            if len(ranked) >= self.memory_budget:
+                rank_runs.append(self._spill(ranked, "rank"))
+                ranked = []
+
+        self._buffer = []
+        for path in self._runs:
+            os.remove(path)
+        self._runs = []
+
+        # Key order as summarize_categorized() produces it from the sorted categorized list
+        self.categorized_summary = {
+            "total": total,
+            "by_severity": {s: by_severity[s] for s in PRIORITY_ORDER if s in by_severity},
+            "by_category": {c: n for c, (n, _) in sorted(by_category.items(), key=lambda kv: kv[1][1])},
+        }
+        self.priority_summary = priorities
+
+        if not rank_runs:
+            ranked.sort(key=itemgetter(0))
+            return RankedIssues(total, records=[IssueRecord.from_row(row) for _, row in ranked])
+        if ranked:
+            rank_runs.append(self._spill(ranked, "rank"))
+        print(f"💽 Issue stream: {total} issues ranked via {len(rank_runs)} on-disk runs")
+        return RankedIssues(total, runs=rank_runs, owner=self)
@@ -0,0 +1,423 @@
+# repo_tools/job_queue.py
+import os
+import json
+import time
+import uuid
+import shutil
+from contextlib import closing
+from typing import Optional, Dict, Any
+
+from repo_tools.sqlite_store import SQLiteStore
+from repo_tools.issue_record import json_default
+
+# Shared directory for the default SQLite queue + filesystem result store.
+# Point every API process and worker at the same path (e.g. an NFS mount).
+DATA_DIR = os.getenv("AUDITOR_DATA_DIR", os.path.abspath("auditor_data"))
+
+# "sqlite:///path/to/jobs.db" (default) or "redis://host:6379/0"
+QUEUE_URL = os.getenv("AUDITOR_QUEUE_URL", "")
+# Directory path (default) or "redis://host:6379/0"
+RESULT_STORE_URL = os.getenv("AUDITOR_RESULT_STORE", "")
+
+# A claimed job is handed to another worker if its lease isn't renewed in time
+VISIBILITY_TIMEOUT = float(os.getenv("AUDITOR_VISIBILITY_TIMEOUT", "300"))
+MAX_ATTEMPTS = int(os.getenv("AUDITOR_MAX_ATTEMPTS", "3"))
+
+# Job states
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+############################
+# SQLite queue (default)
+############################
+class SQLiteJobQueue(SQLiteStore):
+    """
+    Durable job queue in a single SQLite file. Claims are leases: a worker must
+    heartbeat() before `visibility_timeout` expires or the job becomes
+    claimable again (that is how jobs of crashed workers are retried).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._init_db("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                worker_id TEXT,
+                lease_expires REAL,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, lease_expires, created_at);
+        """)
+
+    def enqueue(self, payload: Dict[str, Any], job_id: str = None, max_attempts: int = MAX_ATTEMPTS) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, payload, status, max_attempts, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, json.dumps(payload), QUEUED, max_attempts, now, now),
+            )
+        return job_id
+
+    def claim(self, worker_id: str, visibility_timeout: float = VISIBILITY_TIMEOUT) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest queued job, or a running job whose lease has
+        expired. Returns {"id", "payload", "attempts"} or None if nothing is ready.
+        """
+        conn = self._connect()
+        try:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    """
+                    SELECT id, payload, attempts, max_attempts FROM jobs
+                    WHERE status = ? OR (status = ? AND lease_expires < ?)
+                    ORDER BY created_at LIMIT 1
+                    """,
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                job_id, payload, attempts, max_attempts = row
+                if attempts >= max_attempts:
+                    # Abandoned (or failed) too often: give up on it
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, error = COALESCE(error, ?), updated_at = ? WHERE id = ?",
+                        (FAILED, "worker lease expired too many times", now, job_id),
+                    )
+                    conn.execute("COMMIT")
+                    continue
+
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = ?, lease_expires = ?, attempts = ?, updated_at = ? WHERE id = ?",
+                    (RUNNING, worker_id, now + visibility_timeout, attempts + 1, now, job_id),
+                )
+                conn.execute("COMMIT")
+                return {"id": job_id, "payload": json.loads(payload), "attempts": attempts + 1}
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id: str, worker_id: str, visibility_timeout: float = VISIBILITY_TIMEOUT) -> bool:
+        """
+        Extend the lease. Returns False if this worker no longer owns the job.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (now + visibility_timeout, now, job_id, worker_id, RUNNING),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, lease_expires = NULL, error = NULL, updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (DONE, time.time(), job_id, worker_id, RUNNING),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> str:
+        """
+        Record a failed attempt. The job is re-queued until it runs out of
+        attempts. Returns the job's new status (FAILED, unchanged, when this
+        worker no longer owns the job).
+        """
+        with closing(self._connect()) as conn:
+            # Ownership check and update in one statement: a reclaimed job is left alone
+            row = conn.execute(
+                """
+                UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END,
+                    error = ?, lease_expires = NULL, updated_at = ?
+                WHERE id = ? AND worker_id = ? AND status = ?
+                RETURNING status
+                """,
+                (QUEUED, FAILED, error, time.time(), job_id, worker_id, RUNNING),
+            ).fetchone()
+            return row[0] if row is not None else FAILED
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, status, attempts, max_attempts, worker_id, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ["id", "status", "attempts", "max_attempts", "worker_id", "error", "created_at", "updated_at"]
+        return dict(zip(keys, row))
+
+    def counts(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+
+############################
+# Redis queue (optional)
+############################
+# Requeue expired leases, then pop the next id and lease it. Runs atomically.
+_REDIS_CLAIM = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, id in ipairs(expired) do
+  redis.call('ZREM', KEYS[2], id)
+  redis.call('HSET', ARGV[4] .. id, 'status', 'queued')
+  redis.call('LPUSH', KEYS[1], id)
+end
+while true do
+  local id = redis.call('RPOP', KEYS[1])
+  if not id then return nil end
+  local key = ARGV[4] .. id
+  local attempts = tonumber(redis.call('HGET', key, 'attempts') or '0')
+  local max_attempts = tonumber(redis.call('HGET', key, 'max_attempts') or '1')
+  if attempts >= max_attempts then
+    redis.call('HSET', key, 'status', 'failed', 'updated_at', ARGV[1])
+    if not redis.call('HGET', key, 'error') then
+      redis.call('HSET', key, 'error', 'worker lease expired too many times')
+    end
+  else
+    redis.call('HSET', key, 'status', 'running', 'worker_id', ARGV[3],
+               'attempts', attempts + 1, 'updated_at', ARGV[1])
+    redis.call('ZADD', KEYS[2], ARGV[2], id)
+    return {id, redis.call('HGET', key, 'payload'), attempts + 1}
+  end
+end
+"""
+
+# The ownership check and the write of heartbeat/complete/fail run as one
+# script each, so a lease reclaimed in between can't be extended, completed
+# or re-queued a second time by its previous owner.
+_REDIS_OWNS = """
+local function owns()
+  return redis.call('HGET', KEYS[1], 'worker_id') == ARGV[2]
+     and redis.call('HGET', KEYS[1], 'status') == 'running'
+     and redis.call('ZSCORE', KEYS[2], ARGV[1])
+end
+"""
+
+_REDIS_HEARTBEAT = _REDIS_OWNS + """
+if not owns() then return 0 end
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[1])
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[4])
+return 1
+"""
+
+_REDIS_COMPLETE = _REDIS_OWNS + """
+if not owns() then return 0 end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HSET', KEYS[1], 'status', 'done', 'updated_at', ARGV[3])
+redis.call('HDEL', KEYS[1], 'error')
+return 1
+"""
+
+_REDIS_FAIL = _REDIS_OWNS + """
+if not owns() then return 'failed' end
+local attempts = tonumber(redis.call('HGET', KEYS[1], 'attempts') or '0')
+local max_attempts = tonumber(redis.call('HGET', KEYS[1], 'max_attempts') or '1')
+local status = 'failed'
+if attempts < max_attempts then status = 'queued' end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HSET', KEYS[1], 'status', status, 'error', ARGV[3], 'updated_at', ARGV[4])
+if status == 'queued' then redis.call('LPUSH', KEYS[3], ARGV[1]) end
+return status
+"""
+
+
+class RedisJobQueue:
+    """
+    Same interface as SQLiteJobQueue, backed by Redis (list of ready ids plus a
+    sorted set of lease expiries). Requires the `redis` package.
+    """
+
+    def __init__(self, url: str, prefix: str = "auditor:"):
+        import redis  # optional dependency
+
+        self.r = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.ready_key = prefix + "ready"
+        self.lease_key = prefix + "leases"
+        self.job_prefix = prefix + "job:"
+        self._claim = self.r.register_script(_REDIS_CLAIM)
+        self._heartbeat = self.r.register_script(_REDIS_HEARTBEAT)
+        self._complete = self.r.register_script(_REDIS_COMPLETE)
+        self._fail = self.r.register_script(_REDIS_FAIL)
+
+    def enqueue(self, payload: Dict[str, Any], job_id: str = None, max_attempts: int = MAX_ATTEMPTS) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        pipe = self.r.pipeline()
+        pipe.hset(self.job_prefix + job_id, mapping={
+            "id": job_id, "payload": json.dumps(payload), "status": QUEUED,
+            "attempts": 0, "max_attempts": max_attempts,
+            "created_at": now, "updated_at": now,
+        })
+        pipe.lpush(self.ready_key, job_id)
+        pipe.execute()
+        return job_id
+
+    def claim(self, worker_id: str, visibility_timeout: float = VISIBILITY_TIMEOUT) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        res = self._claim(
+            keys=[self.ready_key, self.lease_key],
+            args=[now, now + visibility_timeout, worker_id, self.job_prefix],
+        )
+        if not res:
+            return None
+        job_id, payload, attempts = res
+        return {"id": job_id, "payload": json.loads(payload), "attempts": int(attempts)}
+
+    def heartbeat(self, job_id: str, worker_id: str, visibility_timeout: float = VISIBILITY_TIMEOUT) -> bool:
+        now = time.time()
+        return bool(self._heartbeat(
+            keys=[self.job_prefix + job_id, self.lease_key],
+            args=[job_id, worker_id, now + visibility_timeout, now],
+        ))
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        return bool(self._complete(
+            keys=[self.job_prefix + job_id, self.lease_key],
+            args=[job_id, worker_id, time.time()],
+        ))
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> str:
+        return self._fail(
+            keys=[self.job_prefix + job_id, self.lease_key, self.ready_key],
+            args=[job_id, worker_id, error, time.time()],
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.r.hgetall(self.job_prefix + job_id)
+        if not job:
+            return None
+        job.pop("payload", None)
+        for k in ("attempts", "max_attempts"):
+            job[k] = int(job[k])
+        return job
+
+    def counts(self) -> Dict[str, int]:
+        counts = {}
+        for key in self.r.scan_iter(self.job_prefix + "*"):
+            status = self.r.hget(key, "status")
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+
+############################
+# Result stores
+############################
+class FileResultStore:
+    """
+    Reports and uploaded archives as files under a shared directory.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, "results"), exist_ok=True)
+        os.makedirs(os.path.join(root, "uploads"), exist_ok=True)
+
+    def _result_path(self, job_id: str) -> str:
+        return os.path.join(self.root, "results", f"{os.path.basename(job_id)}.json")
+
+    def upload_path(self, job_id: str) -> str:
+        return os.path.join(self.root, "uploads", f"{os.path.basename(job_id)}.zip")
+
+    def save_upload(self, job_id: str, fileobj) -> str:
+        path = self.upload_path(job_id)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(fileobj, out)
+        return path
+
+    def fetch_upload(self, job_id: str, dest_path: str) -> str:
+        shutil.copyfile(self.upload_path(job_id), dest_path)
+        return dest_path
+
+    def delete_upload(self, job_id: str):
+        try:
+            os.remove(self.upload_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def put_result(self, job_id: str, report: Dict[str, Any]):
+        # Write-then-rename so readers never see a half-written report
+        path = self._result_path(job_id)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(report, f, default=json_default)
+        os.replace(tmp, path)
+
+    def get_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._result_path(job_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+
+class RedisResultStore:
+    """
+    Reports and uploads as Redis values, for workers without a shared filesystem.
+    """
+
+    def __init__(self, url: str, prefix: str = "auditor:"):
+        import redis  # optional dependency
+
+        self.r = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def save_upload(self, job_id: str, fileobj) -> str:
+        self.r.set(f"{self.prefix}upload:{job_id}", fileobj.read())
+        return f"redis:{job_id}"
+
+    def fetch_upload(self, job_id: str, dest_path: str) -> str:
+        data = self.r.get(f"{self.prefix}upload:{job_id}")
+        if data is None:
+            raise FileNotFoundError(f"No upload stored for job {job_id}")
+        with open(dest_path, "wb") as f:
+            f.write(data)
+        return dest_path
+
+    def delete_upload(self, job_id: str):
+        self.r.delete(f"{self.prefix}upload:{job_id}")
+
+    def put_result(self, job_id: str, report: Dict[str, Any]):
+        self.r.set(f"{self.prefix}result:{job_id}", json.dumps(report, default=json_default))
+
+    def get_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        data = self.r.get(f"{self.prefix}result:{job_id}")
+        return json.loads(data) if data is not None else None
+
+
+def get_job_queue(url: str = None):
+    """
+    Queue selected by AUDITOR_QUEUE_URL (SQLite file under AUDITOR_DATA_DIR by default).
+    """
+    url = url or QUEUE_URL or f"sqlite:///{os.path.join(DATA_DIR, 'jobs.db')}"
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return RedisJobQueue(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteJobQueue(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported queue URL: {url}")
+
+
+def get_result_store(url: str = None):
+    """
+    Store selected by AUDITOR_RESULT_STORE (directory under AUDITOR_DATA_DIR by default).
+    """
+    url = url or RESULT_STORE_URL or DATA_DIR
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return RedisResultStore(url)
+    return FileResultStore(url)
@@ -0,0 +1,169 @@
+# repo_tools/json_stream.py
+import re
+import json
+from typing import List, Dict, Any, Optional
+
+_decoder = json.JSONDecoder()
+_COLON = re.compile(r"\s*:\s*")
+
+
+class ArrayStreamParser:
+    """
+    Incremental parser for an LLM's JSON answer that is still arriving.
+
+    feed() takes text chunks and returns the elements of the top-level array
+    `array_key` (e.g. "llm_detected_issues") that completed in them, so
+    callers can act on each one before the response ends. Markdown fences or
+    prose around the object are ignored. finish() returns the whole object:
+    the strict json.loads result when the text is valid, otherwise whatever
+    could be salvaged (complete array elements plus readable top-level fields).
+
+    keep_text=False is for large tool output read from a pipe: text already
+    scanned is dropped after each feed() and elements are only returned, not
+    kept, so memory stays around one element. finish() is then unavailable.
+    """
+
+    def __init__(self, array_key: str, keep_text: bool = True):
+        self.array_key = array_key
+        self.keep_text = keep_text
+        self.text = ""
+        self.items: List[Any] = []
+        self._pos = 0              # next character to scan
+        self._depth = 0            # current {/[ nesting
+        self._in_string = False
+        self._escape = False
+        self._string_start = None  # index of the opening quote of a depth-1 string
+        self._expect_key = False   # at depth 1, the next string is a key
+        self._key = None           # last key seen at depth 1
+        self._keys = []            # (key, end index) of every depth-1 key, for salvage
+        self._array_depth = None   # depth inside the target array
+        self._item_start = None    # index where the current element began
+
+    def feed(self, chunk: str) -> List[Any]:
+        self.text += chunk
+        text, done = self.text, []
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_start is not None:
+                        if self._expect_key:
+                            try:
+                                self._key = json.loads(text[self._string_start:i + 1])
+                                self._keys.append((self._key, i + 1))
+                            except ValueError:
+                                self._key = None
+                        self._string_start = None
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._string_start = i
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = ch == "{"
+                elif self._depth == 2 and ch == "[" and self._key == self.array_key:
+                    self._array_depth = 2
+                elif self._array_depth is not None and self._depth == 3:
+                    self._item_start = i
+            elif ch in "}]":
+                if self._array_depth is not None and self._depth == 3 and self._item_start is not None:
+                    item = self._decode(text[self._item_start:i + 1])
+                    if item is not None:
+                        if self.keep_text:
+                            self.items.append(item)
+                        done.append(item)
+                    self._item_start = None
+                elif self._depth == 2 and self._array_depth is not None:
+                    self._array_depth = None
+                self._depth = max(0, self._depth - 1)
+            elif self._depth == 1:
+                if ch == ",":
+                    self._expect_key = True
+                elif ch == ":":
+                    self._expect_key = False
+            i += 1
+        self._pos = i
+        if not self.keep_text:
+            self._discard_scanned()
+        return done
+
+    def _discard_scanned(self) -> None:
+        # Keep only the unfinished element (or depth-1 string) still being scanned
+        cut = min(x for x in (self._pos, self._item_start, self._string_start) if x is not None)
+        if not cut:
+            return
+        self.text = self.text[cut:]
+        self._pos -= cut
+        if self._item_start is not None:
+            self._item_start -= cut
+        if self._string_start is not None:
+            self._string_start -= cut
+        self._keys = []
+
+    @staticmethod
+    def _decode(fragment: str) -> Optional[Any]:
+        try:
+            return json.loads(fragment)
+        except ValueError:
+            return None  # malformed element: skip it, keep the rest
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        The complete object. Sets "_partial": True when it had to be salvaged.
+        """
+        if not self.keep_text:
+            raise RuntimeError("finish() needs the full text; this parser was created with keep_text=False")
+        clean = self.text.replace("```json", "").replace("```", "").strip()
+        start = clean.find("{")
+        if start != -1:
+            try:
+                parsed, _ = _decoder.raw_decode(clean, start)
+                if isinstance(parsed, dict):
+                    return parsed
+            except ValueError:
+                pass
+
+        salvaged: Dict[str, Any] = {"_partial": True}
+        if self.items:
+            salvaged[self.array_key] = list(self.items)
+        for key, end in self._keys:
+            if key == self.array_key or key in salvaged:
+                continue
+            value = _salvage_value(self.text, end)
+            if value is not None:
+                salvaged[key] = value
+        return salvaged
+
+
+def _salvage_value(text: str, pos: int) -> Optional[Any]:
+    """
+    The value after the key ending at `pos`, or None if it is unreadable.
+    A truncated list keeps the elements that did complete.
+    """
+    m = _COLON.match(text, pos)
+    if not m:
+        return None
+    pos = m.end()
+    try:
+        return _decoder.raw_decode(text, pos)[0]
+    except ValueError:
+        pass
+    if not text.startswith("[", pos):
+        return None
+    items, pos = [], pos + 1
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        try:
+            value, pos = _decoder.raw_decode(text, pos)
+        except ValueError:
+            break
+        items.append(value)
+    return items or None
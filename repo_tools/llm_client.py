@@ -0,0 +1,364 @@
+# repo_tools/llm_client.py
+import os
+import time
+import queue
+import threading
+from collections import deque
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_MODEL = os.getenv("AUDITOR_LLM_MODEL", "gemini-2.5-flash")
+
+# "gemini" (default) or "stub" (offline, see repo_tools/stub_llm.py)
+LLM_BACKEND = os.getenv("AUDITOR_LLM_BACKEND", "gemini")
+
+# Process-wide LLM limits, shared by every pipeline running in this process
+LLM_RPM = float(os.getenv("AUDITOR_LLM_RPM", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("AUDITOR_LLM_MAX_CONCURRENCY", "4"))
+# Set to 0 to have stream_content() wait for the whole response instead
+LLM_STREAM = os.getenv("AUDITOR_LLM_STREAM", "1") != "0"
+
+# Request hedging: a call still unanswered after the recent p95 latency gets
+# a duplicate request, and the first good answer wins
+LLM_HEDGE = os.getenv("AUDITOR_LLM_HEDGE", "0") == "1"
+HEDGE_PERCENTILE = float(os.getenv("AUDITOR_LLM_HEDGE_PERCENTILE", "95"))
+# Hedge delay until HEDGE_MIN_SAMPLES latencies are known, and its lower bound
+HEDGE_INITIAL_DELAY_MS = float(os.getenv("AUDITOR_LLM_HEDGE_INITIAL_MS", "20000"))
+HEDGE_MIN_DELAY_MS = float(os.getenv("AUDITOR_LLM_HEDGE_MIN_MS", "250"))
+HEDGE_MIN_SAMPLES = 20
+# Recent latencies kept per model
+HEDGE_WINDOW = 200
+# Hedges allowed per call (plus one), so a slow spell can't double quota use
+HEDGE_MAX_RATE = float(os.getenv("AUDITOR_LLM_HEDGE_MAX_RATE", "0.1"))
+
+_configured = False
+_models = {}
+
+
+def get_model(name: str = None):
+    """
+    Returns a (cached) Gemini model. Configuration happens on first use so that
+    pipeline profiles which never call the LLM work without GOOGLE_API_KEY.
+    """
+    global _configured
+    name = name or DEFAULT_MODEL
+
+    if LLM_BACKEND == "stub":
+        if name not in _models:
+            from repo_tools.stub_llm import StubModel
+            _models[name] = StubModel(name)
+        return _models[name]
+
+    if not _configured:
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY missing in .env")
+        genai.configure(api_key=api_key)
+        _configured = True
+
+    if name not in _models:
+        _models[name] = genai.GenerativeModel(name)
+    return _models[name]
+
+
+class RateLimiter:
+    """
+    Token bucket (requests per minute) plus a cap on concurrent requests.
+    Thread-safe; one instance is shared by all callers of generate_content().
+    """
+
+    def __init__(self, rpm: float = LLM_RPM, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.rate = rpm / 60.0 if rpm > 0 else 0.0
+        self.capacity = max(1.0, rpm / 60.0 * 5) if rpm > 0 else 1.0  # allow ~5s bursts
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max(1, max_concurrency))
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take_token(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def try_acquire(self) -> bool:
+        """
+        Non-blocking __enter__: False (and nothing taken) unless a slot and a
+        token are free right now. Release with __exit__.
+        """
+        if not self.slots.acquire(blocking=False):
+            return False
+        if self.rate:
+            with self.lock:
+                self._refill()
+                if self.tokens < 1:
+                    self.slots.release()
+                    return False
+                self.tokens -= 1
+        return True
+
+    def __enter__(self):
+        self.slots.acquire()
+        try:
+            self._take_token()
+        except BaseException:
+            self.slots.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.slots.release()
+
+
+rate_limiter = RateLimiter()
+
+
+class Hedger:
+    """
+    Hedging policy and metrics, per (call kind, model): the delay after which
+    a call is duplicated (the HEDGE_PERCENTILE of recent latencies), the cap
+    on how many calls may be duplicated, and how often the duplicate won.
+    """
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        max_rate: float = HEDGE_MAX_RATE,
+        initial_delay_ms: float = HEDGE_INITIAL_DELAY_MS,
+        min_delay_ms: float = HEDGE_MIN_DELAY_MS,
+    ):
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.initial_delay = initial_delay_ms / 1000.0
+        self.min_delay = min_delay_ms / 1000.0
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.skipped = 0      # calls past their threshold not hedged (rate cap or no free slot)
+        self._latencies = {}  # key -> deque of recent latencies (seconds)
+        self._counts = {}     # key -> {"calls", "hedged", "hedge_wins"}
+
+    def _threshold(self, key) -> float:
+        recent = self._latencies.get(key)
+        if not recent or len(recent) < HEDGE_MIN_SAMPLES:
+            return self.initial_delay
+        ordered = sorted(recent)
+        k = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100.0))
+        return max(self.min_delay, ordered[k])
+
+    def begin(self, key) -> float:
+        """
+        Counts a call; returns the seconds to wait before hedging it.
+        """
+        with self.lock:
+            self.calls += 1
+            self._counts.setdefault(key, {"calls": 0, "hedged": 0, "hedge_wins": 0})["calls"] += 1
+            return self._threshold(key)
+
+    def allow_hedge(self, key, limiter: RateLimiter) -> bool:
+        """
+        Whether to hedge now. Hedges only use spare capacity: on True a
+        `limiter` slot has been taken for the duplicate request.
+        """
+        with self.lock:
+            if self.hedged >= self.max_rate * self.calls + 1 or not limiter.try_acquire():
+                self.skipped += 1
+                return False
+            self.hedged += 1
+            self._counts[key]["hedged"] += 1
+            return True
+
+    def record(self, key, seconds: float, hedge_won: bool) -> None:
+        """
+        The latency of a finished call (a lower bound when its hedge won).
+        """
+        with self.lock:
+            self._latencies.setdefault(key, deque(maxlen=HEDGE_WINDOW)).append(seconds)
+            if hedge_won:
+                self._counts[key]["hedge_wins"] += 1
+
+    def stats(self):
+        with self.lock:
+            models = {}
+            for (kind, model), c in self._counts.items():
+                models[f"{kind}:{model}"] = dict(
+                    c,
+                    hedge_win_rate=round(c["hedge_wins"] / c["hedged"], 3) if c["hedged"] else None,
+                    hedge_after_ms=round(self._threshold((kind, model)) * 1000, 1),
+                )
+            wins = sum(c["hedge_wins"] for c in self._counts.values())
+            return {
+                "enabled": LLM_HEDGE,
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "not_hedged": self.skipped,
+                "hedge_rate": round(self.hedged / self.calls, 3) if self.calls else None,
+                "max_hedge_rate": self.max_rate,
+                "hedge_wins": wins,
+                "hedge_win_rate": round(wins / self.hedged, 3) if self.hedged else None,
+                "models": models,
+            }
+
+
+hedger = Hedger()
+_END = object()
+
+
+class _Attempt(threading.Thread):
+    """
+    One request of a hedged call, run on its own thread. Posts (self, first
+    item, error) to `results`, then keeps its iterator until release().
+    `limiter`: an already acquired RateLimiter, released when the thread ends.
+    A losing request can't be aborted while it waits for the model; its
+    answer is dropped when it arrives.
+    """
+
+    def __init__(self, open_stream, results, limiter=None):
+        super().__init__(daemon=True)
+        self.open_stream = open_stream
+        self.results = results
+        self.limiter = limiter
+        self.iterator = None
+        self.lost = False
+        self._released = threading.Event()
+        self.start()
+
+    def run(self):
+        try:
+            self._request()
+        except Exception as e:
+            self.results.put((self, None, e))
+        finally:
+            if self.limiter is not None:
+                self.limiter.__exit__(None, None, None)
+
+    def _request(self):
+        self.iterator = iter(self.open_stream())
+        self.results.put((self, next(self.iterator, _END), None))
+        self._released.wait()
+        if self.lost and hasattr(self.iterator, "close"):
+            self.iterator.close()
+
+    def release(self, lost: bool = False):
+        self.lost = lost
+        self._released.set()
+
+
+def _hedged(open_stream, key, limiter):
+    results = queue.Queue()
+    # Every attempt, the first one too, holds its own limiter slot until its
+    # thread ends: a losing primary still waiting on the model keeps counting
+    limiter.__enter__()
+    try:
+        attempts = [_Attempt(open_stream, results, limiter)]
+    except BaseException:
+        limiter.__exit__(None, None, None)
+        raise
+    start = time.monotonic()
+    delay = hedger.begin(key)
+    winner, first, failures = None, None, 0
+    try:
+        while winner is None:
+            timeout = None
+            if delay is not None:
+                timeout = max(0.0, start + delay - time.monotonic())
+            try:
+                attempt, first, error = results.get(timeout=timeout)
+            except queue.Empty:
+                delay = None
+                if hedger.allow_hedge(key, limiter):
+                    attempts.append(_Attempt(open_stream, results, limiter))
+                continue
+            if error is None:
+                winner = attempt
+                continue
+            failures += 1
+            delay = None
+            if failures == len(attempts):
+                raise error
+        hedger.record(key, time.monotonic() - start, hedge_won=winner is not attempts[0])
+    finally:
+        for attempt in attempts:
+            if attempt is not winner:
+                attempt.release(lost=True)
+
+    try:
+        if first is not _END:
+            yield first
+        yield from winner.iterator
+    finally:
+        winner.release()
+
+
+def _call(open_stream, key, limiter):
+    """
+    Items of open_stream() (a fresh request per call) under `limiter`,
+    hedged when AUDITOR_LLM_HEDGE=1: the race is on the first item.
+    """
+    if LLM_HEDGE:
+        yield from _hedged(open_stream, key, limiter)
+        return
+    with limiter:
+        yield from open_stream()
+
+
+def hedge_stats():
+    """
+    Hedging metrics of this process (see Hedger.stats()).
+    """
+    return hedger.stats()
+
+
+def generate_content(prompt: str, model_name: str = None, limiter: RateLimiter = None, **kwargs):
+    """
+    Single entry point for LLM calls: applies the shared rate limiter, so many
+    repositories scanned in parallel (e.g. /scan/batch) stay within quota.
+    limiter: a model's own RateLimiter instead (e.g. review_cascade.MODEL_TIERS).
+    With hedging on, a call slower than the model's recent p95 is sent twice.
+    """
+    model = get_model(model_name)
+    calls = _call(
+        lambda: [model.generate_content(prompt, **kwargs)],
+        ("generate", model_name or DEFAULT_MODEL), limiter or rate_limiter,
+    )
+    try:
+        return next(calls)
+    finally:
+        calls.close()
+
+
+def stream_content(prompt: str, model_name: str = None, limiter: RateLimiter = None, **kwargs):
+    """
+    Streaming variant of generate_content(): yields the response text chunk by
+    chunk as the model produces it. The rate limiter slot is held until the
+    stream is exhausted (or the generator is closed). Hedging races the
+    requests to their first chunk; the stream that gets there first is used.
+    """
+    model = get_model(model_name)
+    if LLM_STREAM:
+        open_stream = lambda: model.generate_content(prompt, stream=True, **kwargs)
+    else:
+        open_stream = lambda: [model.generate_content(prompt, **kwargs)]
+    for chunk in _call(open_stream, ("stream", model_name or DEFAULT_MODEL), limiter or rate_limiter):
+        if not LLM_STREAM:
+            yield chunk.text
+            continue
+        try:
+            text = chunk.text
+        except ValueError:
+            continue  # chunk without text parts (e.g. safety metadata only)
+        if text:
+            yield text
@@ -2,59 +2,22 @@
 import os
 import json
 import textwrap
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable
 
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Load Gemini API key from .env
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY missing in .env")
-
-genai.configure(api_key=GOOGLE_API_KEY)
-
-# Initialize Gemini 2.5 Flash
-model = genai.GenerativeModel("gemini-2.5-flash")
+from repo_tools.llm_client import stream_content
+from repo_tools.json_stream import ArrayStreamParser
+from repo_tools.dependency_graph import central_files, file_centrality
+from repo_tools.code_chunker import build_snippet
+from repo_tools.static_digest import StaticDigest
+from repo_tools.review_cascade import (
+    CASCADE_ENABLED, MODEL_TIERS, REVIEW_PROMPT, review_batches, batch_risk_reason, escalation_reason,
+    normalize_confidence,
+)
 
 ############################
 # Helpers
 ############################
-def read_snippet(file_path: str, line: Optional[int], context: int = 6) -> str:
-    """
-    Return a small snippet centered around `line` (1-indexed).
-    If line is None or file not readable, return first ~50 lines truncated.
-    """
-    try:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-    except Exception as e:
-        return f"<unable to read file: {e}>"
-
-    if not lines:
-        return ""
-
-    if line is None:
-        # return first chunk
-        snip = lines[: min(len(lines), 120)]
-        return "".join(snip)
-
-    # convert to 0-indexed
-    idx = max(0, line - 1)
-    start = max(0, idx - context)
-    end = min(len(lines), idx + context + 1)
-    snippet = lines[start:end]
-    # show markers for line numbers
-    numbered = []
-    for i, l in enumerate(snippet, start=start + 1):
-        prefix = ">> " if i == line else "   "
-        numbered.append(f"{prefix}{i:>4}: {l.rstrip()}")
-    return "\n".join(numbered)
-
-
 def top_flagged_files(static_issues: List[Dict[str, Any]], top_n: int = 8) -> List[str]:
     """
     Choose top files by issue count to include snippets for.
@@ -79,6 +42,10 @@ def llm_code_reviewer(
     repo_summary: Dict[str, Any],
     static_issues: List[Dict[str, Any]],
     max_files_with_snippets: int = 6,
+    risk_scores: Optional[List[Dict[str, Any]]] = None,
+    dependency_graph: Optional[Dict[str, Any]] = None,
+    on_issue: Optional[Callable[[Dict[str, Any]], None]] = None,
+    static_digest: Optional[StaticDigest] = None,
 ) -> Dict[str, Any]:
     """
     Use an LLM to produce contextual review feedback.
@@ -88,12 +55,26 @@ def llm_code_reviewer(
       - code_files: list of code file paths (absolute)
       - repo_summary: parsed JSON produced by Agent 1 (dict)
       - static_issues: list of issue dicts produced by Agent 2
+      - risk_scores: optional repo_tools.risk_scorer.score_files() ranking; when
+        given, the riskiest files (and their hot lines) get the snippets instead
+        of the files with the most static findings. Snippets show the whole
+        enclosing functions of every flagged line of a file, merged into hunks
+        (repo_tools.code_chunker.build_snippet)
+      - dependency_graph: optional repo_tools.dependency_graph index; its
+        central modules go into the prompt and the bounded file list keeps
+        the most central files first
+      - on_issue: optional callback, called with each llm_detected_issues
+        element as soon as it has streamed in complete
+      - static_digest: optional repo_tools.static_digest.StaticDigest of the
+        static issues (streaming mode); read instead of static_issues, which
+        is then only a bounded sample
 
     Output (dict):
       {
         "llm_detected_issues": [...],
         "overall_quality_score": float,
-        "recommendations": [...]
+        "recommendations": [...],
+        "routing": {...}   # review cascade decisions (repo_tools.review_cascade), when enabled
       }
     """
 
@@ -109,7 +90,17 @@ def llm_code_reviewer(
             pass
         code_list_small.append({"path": rel, "size_bytes": size})
 
-    flagged_files = top_flagged_files(static_issues, top_n=max_files_with_snippets)
+    centrality = file_centrality(dependency_graph)
+    if centrality:
+        code_list_small.sort(key=lambda f: -centrality.get(f["path"].replace(os.sep, "/"), 0.0))
+
+    digest = static_digest if static_digest is not None else StaticDigest.of(static_issues)
+    risk_by_file = {}
+    if risk_scores:
+        flagged_files = [r["file"] for r in risk_scores[:max_files_with_snippets]]
+        risk_by_file = {r["file"]: r for r in risk_scores[:max_files_with_snippets]}
+    else:
+        flagged_files = digest.top_files(max_files_with_snippets)
     flagged_files = flagged_files[:max_files_with_snippets]
 
     snippets = {}
@@ -118,89 +109,67 @@ def llm_code_reviewer(
         candidates = [c for c in code_files if os.path.relpath(c, repo_path) == f or c.endswith(f)]
         if candidates:
             path = candidates[0]
-            # choose a representative line if available from static issues
-            # pick the first matching issue's line if present
-            lines = [it.get("line") for it in static_issues if it.get("file") == f and it.get("line")]
-            line = lines[0] if lines else None
+            # every flagged line of the file, the risk scorer's hot lines first
+            risk = risk_by_file.get(f)
+            lines = (risk["hot_lines"] if risk is not None else []) + digest.lines(f)
+            chunk = build_snippet(path, lines)
             snippets[f] = {
                 "rel_path": f,
-                "snippet": read_snippet(path, line, context=6),
-                "sample_line": line
+                "snippet": chunk["snippet"],
+                "flagged_lines": chunk["lines"],
             }
+            if risk is not None:
+                snippets[f]["risk_score"] = risk["score"]
+                snippets[f]["risk_reasons"] = risk["reasons"]
         else:
-            snippets[f] = {"rel_path": f, "snippet": "<file not found on disk>", "sample_line": None}
+            snippets[f] = {"rel_path": f, "snippet": "<file not found on disk>", "flagged_lines": []}
 
     # 2) Build structured input JSON (embedded into prompt)
     input_payload = {
         "repo_summary": repo_summary,
         "top_code_files": code_list_small[:200],  # keep it bounded
-        "static_issues_sample": static_issues[:200],  # bounded
+        "static_issues_sample": digest.sample,  # bounded
         "flagged_file_snippets": snippets
     }
+    if dependency_graph:
+        input_payload["module_structure"] = central_files(dependency_graph, 15)
 
-    # Create instructions: ask LLM to return strict JSON with schema
-    prompt = textwrap.dedent(f"""
-    You are an expert senior software engineer and code reviewer.
-
-    You are given structured information about a repository and deterministic static analysis results.
-    Your job: analyze the repo context and static issues, then produce:
-      1) A list "llm_detected_issues": potential issues not caught (or clarified) by static tools, each with:
-         - id (short unique string)
-         - file (relative path)
-         - line (number or null)
-         - category (one of: security, performance, bug, maintainability, readability, style, tests)
-         - severity (critical, high, medium, low)
-         - description (short explanation of the problem)
-         - suggestion (concrete fix or next steps)
-      2) overall_quality_score: a float 0.0 - 10.0 (higher is better)
-      3) recommendations: ordered list of 1-6 high-level recommendations (short strings)
-
-    IMPORTANT: Respond with **ONLY** a single valid JSON object adhering to the EXACT schema below.
-    Do NOT include any extra prose outside the JSON.
-
-    JSON schema:
-    {{
-      "llm_detected_issues": [
-        {{
-          "id": "ISSUE-1",
-          "file": "path/to/file.py",
-          "line": 123,
-          "category": "maintainability",
-          "severity": "high",
-          "description": "...",
-          "suggestion": "..."
-        }},
-        ...
-      ],
-      "overall_quality_score": 7.1,
-      "recommendations": ["Fix X", "Add tests for Y", ...]
-    }}
-
-    INPUT DATA (do not modify):
-    {json.dumps(input_payload, indent=2)}
-
-    Remember:
-    - Be concise but precise.
-    - Prefer concrete actionable suggestions.
-    - When labeling severity, prefer security as higher priority if it can lead to data loss.
-    - If unsure about a specific line, set line to null and explain in description.
-    """)
-
-    # Call LLM
-    response = model.generate_content(prompt)
-    raw = response.text
-
-    # Parse LLM output (should be JSON)
+    if not CASCADE_ENABLED:
+        return _review(REVIEW_PROMPT, input_payload, on_issue=on_issue)
+    return _cascade_review(input_payload, snippets, digest, on_issue)
+
+
+def _review(
+    template: str,
+    input_payload: Dict[str, Any],
+    model_name: Optional[str] = None,
+    limiter: Any = None,
+    on_issue: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    One reviewer call: the prompt `template` (review_cascade.REVIEW_PROMPT or
+    TRIAGE_PROMPT) filled with input_payload, streamed and parsed into
+    {"llm_detected_issues", "overall_quality_score", "recommendations"}.
+    """
+    prompt = textwrap.dedent(template.format(input_json=json.dumps(input_payload, indent=2)))
+
+    # Call LLM (streamed): issues are parsed and handed to on_issue as they complete
+    parser = ArrayStreamParser("llm_detected_issues")
     try:
-        parsed = json.loads(raw)
-    except json.JSONDecodeError:
-        # fallback: try to extract JSON block
-        try:
-            start = raw.index("{")
-            end = raw.rfind("}") + 1
-            candidate = raw[start:end]
-            parsed = json.loads(candidate)
-        except Exception as e:
+        for chunk in stream_content(prompt, model_name, limiter=limiter):
+            for issue in parser.feed(chunk):
+                if on_issue is not None and isinstance(issue, dict):
+                    on_issue(issue)
+    except Exception as e:
+        # A dropped stream still leaves the issues that arrived complete
+        if not parser.items:
+            raise
+        print(f"⚠️  LLM stream ended early ({e}); keeping {len(parser.items)} parsed issues")
+    raw = parser.text
+
+    parsed = parser.finish()
+    if parsed.pop("_partial", False):
+        if not parsed.get("llm_detected_issues"):
             # Last resort: return a safe fallback structure
             return {
                 "llm_detected_issues": [],
@@ -210,6 +179,10 @@ def llm_code_reviewer(
                 ],
                 "raw_response": raw
             }
+        # Malformed or truncated JSON: keep every issue that parsed
+        parsed["raw_response"] = raw
+    issues = parsed.get("llm_detected_issues")
+    parsed["llm_detected_issues"] = [it for it in issues if isinstance(it, dict)] if isinstance(issues, list) else []
 
     # Ensure keys exist & normalized
     parsed.setdefault("llm_detected_issues", [])
@@ -227,3 +200,117 @@ def llm_code_reviewer(
         parsed["overall_quality_score"] = 5.0
 
     return parsed
+
+
+def _batch_payload(
+    input_payload: Dict[str, Any],
+    snippets: Dict[str, Any],
+    digest: StaticDigest,
+    files: List[str],
+    tier: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    The review input narrowed to one batch of flagged files.
+    """
+    payload = {"repo_summary": input_payload["repo_summary"]}
+    if tier["repo_context"]:
+        payload.update((k, v) for k, v in input_payload.items() if k != "repo_summary")
+    payload["static_issues_sample"] = digest.issues_for(files, tier["static_issues_per_batch"])
+    payload["flagged_file_snippets"] = {f: snippets[f] for f in files}
+    return payload
+
+
+def _cascade_review(
+    input_payload: Dict[str, Any],
+    snippets: Dict[str, Any],
+    digest: StaticDigest,
+    on_issue: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Cheap-to-expensive review (repo_tools.review_cascade): the triage model
+    reviews the flagged files in small batches, concurrently; the batches
+    that are high-risk to begin with (risk score, severe static findings)
+    skip triage. Those and the batches whose triage found something
+    high-risk or unsure (or failed) are then reviewed together by the strong
+    model, in one call carrying the repo context once, and its answer
+    replaces their triage ones. Issues keep the batches' order, with the
+    strong model's in place of the first escalated batch. The result's
+    "routing" records every decision.
+    """
+    triage_tier, review_tier = MODEL_TIERS["triage"], MODEL_TIERS["review"]
+    routing = {"triage_model": triage_tier["model"], "review_model": review_tier["model"], "batches": []}
+
+    batches = review_batches(snippets)
+    if not batches:
+        # Nothing flagged to triage: the whole-repo review goes straight to the strong model
+        result = _review(review_tier["prompt"], input_payload, review_tier["model"], review_tier["limiter"], on_issue)
+        routing["batches"].append({
+            "files": [], "model": review_tier["model"], "escalated": False,
+            "reason": "no flagged files to triage", "issues": len(result["llm_detected_issues"]),
+        })
+        result["routing"] = routing
+        return result
+
+    def triage(files):
+        try:
+            payload = _batch_payload(input_payload, snippets, digest, files, triage_tier)
+            return _review(triage_tier["prompt"], payload, triage_tier["model"], triage_tier["limiter"]), None
+        except Exception as e:
+            return None, e
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(batches)
+    escalated: List[int] = []
+    risky = [batch_risk_reason(files, snippets, digest) for files in batches]
+    with ThreadPoolExecutor(max_workers=len(batches)) as threads:
+        triaged = [None if r is not None else threads.submit(triage, files) for files, r in zip(batches, risky)]
+        for i, (files, future) in enumerate(zip(batches, triaged)):
+            if future is None:
+                reason = risky[i]
+            else:
+                result, error = future.result()
+                reason = f"triage failed ({error})" if error is not None else escalation_reason(result)
+            decision = {"files": files, "model": triage_tier["model"], "escalated": reason is not None, "reason": reason}
+            routing["batches"].append(decision)
+            if reason is None:
+                results[i] = result
+                decision["issues"] = len(normalize_confidence(result["llm_detected_issues"]))
+                for issue in result["llm_detected_issues"] if on_issue is not None else ():
+                    on_issue(issue)
+            else:
+                escalated.append(i)
+
+    review_result = None
+    if escalated:
+        # One strong-model call for every escalated batch; a failure fails the
+        # review, as without the cascade
+        files = [f for i in escalated for f in batches[i]]
+        payload = _batch_payload(input_payload, snippets, digest, files, review_tier)
+        review_result = _review(review_tier["prompt"], payload, review_tier["model"], review_tier["limiter"], on_issue)
+        for i in escalated:
+            decision = routing["batches"][i]
+            decision["model"] = review_tier["model"]
+            decision["issues"] = sum(1 for it in review_result["llm_detected_issues"] if it.get("file") in batches[i])
+
+    n = len(escalated)
+    print(f"🪜 Review cascade: {len(batches) - n} of {len(batches)} batches settled by "
+          f"{triage_tier['model']}, {n} escalated to {review_tier['model']}")
+
+    # Each batch is scored by whichever model settled it
+    scores = [review_result["overall_quality_score"] if r is None else r["overall_quality_score"] for r in results]
+    if review_result is not None:
+        results[escalated[0]] = review_result
+    results = [r for r in results if r is not None]
+
+    combined = {
+        "llm_detected_issues": [it for r in results for it in r["llm_detected_issues"]],
+        "overall_quality_score": round(sum(scores) / len(scores), 2),
+        "recommendations": list(dict.fromkeys(
+            rec for r in results if isinstance(r["recommendations"], list)
+            for rec in r["recommendations"] if isinstance(rec, str)
+        ))[:6],
+        "routing": routing,
+    }
+    raw = [r["raw_response"] for r in results if "raw_response" in r]
+    if raw:
+        combined["raw_response"] = "\n\n".join(raw)
+    return combined
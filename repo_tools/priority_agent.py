@@ -1,6 +1,8 @@
 # repo_tools/priority_agent.py
 from typing import List, Dict, Any
 
+from repo_tools.issue_record import IssueRecord, as_record
+
 # Priority ranking — full pipeline uses these
 PRIORITY_ORDER = ["critical", "high", "medium", "low"]
 
@@ -24,10 +26,15 @@ CATEGORY_WEIGHT = {
 }
 
 
-def compute_priority_score(issue: Dict[str, Any]) -> float:
+# Extra points for an issue in the repo's most central module (scaled by centrality)
+CENTRALITY_WEIGHT = 10
+
+
+def compute_priority_score(issue: Dict[str, Any], centrality: float = 0.0) -> float:
     """
     Computes a weighted priority score combining severity + category + confidence.
     Purpose: convert messy inputs into a clean ranking.
+    centrality: import-graph centrality (0..1) of the issue's file.
     """
 
     severity = issue.get("severity", "medium").lower()
@@ -38,7 +45,7 @@ def compute_priority_score(issue: Dict[str, Any]) -> float:
     cat_score = CATEGORY_WEIGHT.get(category, 20)
 
     # Weighted formula — fully deterministic
-    score = (sev_score * 0.6) + (cat_score * 0.3) + (confidence * 20)
+    score = (sev_score * 0.6) + (cat_score * 0.3) + (confidence * 20) + (centrality * CENTRALITY_WEIGHT)
 
     return float(score)
 
@@ -57,33 +64,39 @@ def score_to_priority(score: float) -> str:
     return "low"
 
 
-def assign_priorities(categorized_issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def assign_priorities(
+    categorized_issues: List[Any],
+    centrality: Dict[str, float] = None,
+) -> List[IssueRecord]:
     """
     For each issue:
-      - Calculate a numeric priority score
+      - Calculate a numeric priority score (boosted for central files when
+        `centrality` {file: 0..1} is given)
       - Convert to human-friendly priority
       - Sort by highest priority
+
+    IssueRecords are scored in place (no per-issue copy); plain dicts are
+    converted to records first.
     """
 
     results = []
+    centrality = centrality or {}
 
     for it in categorized_issues:
-        score = compute_priority_score(it)
-        priority = score_to_priority(score)
-
-        new_obj = dict(it)
-        new_obj["priority_score"] = score
-        new_obj["priority"] = priority
+        it = as_record(it)
+        score = compute_priority_score(it, centrality.get(it.file, 0.0))
+        it.priority_score = score
+        it.priority = score_to_priority(score)
 
-        results.append(new_obj)
+        results.append(it)
 
     # Sort issues by score DESC, break ties by file name
-    results.sort(key=lambda x: (-x["priority_score"], x.get("file", "")))
+    results.sort(key=lambda x: (-x.priority_score, x.file or ""))
 
     return results
 
 
-def summarize_priorities(issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+def summarize_priorities(issues: List[Any]) -> Dict[str, Any]:
     """
     Creates a summary useful for dashboards:
     {
@@ -1,11 +1,13 @@
 # repo_tools/repo_loader.py
 import os
 import zipfile
-import tempfile
 import shutil
 import mimetypes
+import fnmatch
 from git import Repo
 
+from repo_tools.workspace import get_workspace_manager
+
 
 CODE_EXTENSIONS = {
     ".py", ".js", ".ts", ".java", ".cpp", ".c", ".go", ".php",
@@ -13,39 +15,74 @@ CODE_EXTENSIONS = {
 }
 
 
+# Files that mark the root of an independent sub-project inside a monorepo
+SHARD_MARKERS = {"setup.py", "pyproject.toml", "package.json", "go.mod"}
+
+# Extra shard roots, e.g. "services/*,libs/*" (matched against repo-relative dirs)
+SHARD_GLOBS = [g.strip() for g in os.getenv("AUDITOR_SHARD_GLOBS", "").split(",") if g.strip()]
+
+
 def is_code_file(file_path):
     ext = os.path.splitext(file_path)[1].lower()
     return ext in CODE_EXTENSIONS
 
 
-def extract_zip(zip_path):
-    temp_dir = tempfile.mkdtemp(prefix="repo_")
+def extract_zip(zip_path, workspace=None):
+    """
+    Extracts a ZIP into a fresh directory owned by `workspace`.
+    The uncompressed size is checked against the workspace quota first and
+    small archives land on the RAM-backed scratch root.
+    """
+    workspace = workspace or get_workspace_manager().create()
     with zipfile.ZipFile(zip_path, "r") as z:
+        expanded = sum(info.file_size for info in z.infolist())
+        temp_dir = workspace.make_dir(prefix="repo_", size_hint=expanded)
         z.extractall(temp_dir)
     return temp_dir
 
 
-def clone_git_repo(git_url):
-    temp_dir = tempfile.mkdtemp(prefix="repo_")
+def clone_git_repo(git_url, workspace=None):
+    workspace = workspace or get_workspace_manager().create()
+    temp_dir = workspace.make_dir(prefix="repo_")
     Repo.clone_from(git_url, temp_dir)
+    # Size of a clone is only known afterwards
+    workspace.check_quota()
     return temp_dir
 
 
-def load_repository(input_path=None, git_url=None):
+def load_repository(input_path=None, git_url=None, workspace=None):
     """
     Loads a repository from ZIP or Git URL.
     Returns the extracted repo path & list of code files.
+
+    Files are written into `workspace` (see repo_tools/workspace.py); the caller
+    owns it and is responsible for cleaning it up once the run ends. Without one,
+    a workspace from the default manager is used and removed at process exit.
     """
     if not input_path and not git_url:
         raise ValueError("Provide either a ZIP file or a Git URL.")
 
     # Extract files
     if input_path:
-        repo_path = extract_zip(input_path)
+        repo_path = extract_zip(input_path, workspace=workspace)
     else:
-        repo_path = clone_git_repo(git_url)
+        repo_path = clone_git_repo(git_url, workspace=workspace)
+
+    code_files, shard_roots = walk_code_files(repo_path)
 
+    return {
+        "repo_path": repo_path,
+        "code_files": code_files,
+        "shards": detect_shards(repo_path, code_files, marker_roots=shard_roots)
+    }
+
+
+def walk_code_files(repo_path):
+    """
+    (code files in walk order, shard marker roots) of a repository on disk.
+    """
     code_files = []
+    shard_roots = set()
 
     # Walk through repo and collect code files
     for root, dirs, files in os.walk(repo_path):
@@ -53,12 +90,59 @@ def load_repository(input_path=None, git_url=None):
         if "node_modules" in root or ".git" in root:
             continue
 
+        if root != repo_path and SHARD_MARKERS.intersection(files):
+            shard_roots.add(root)
+
         for f in files:
             full_path = os.path.join(root, f)
             if is_code_file(full_path):
                 code_files.append(full_path)
 
-    return {
-        "repo_path": repo_path,
-        "code_files": code_files
-    }
+    return code_files, shard_roots
+
+
+def detect_shards(repo_path, code_files, marker_roots=None, globs=None):
+    """
+    Splits a monorepo into sub-projects.
+
+    A shard root is any directory below repo_path containing one of
+    SHARD_MARKERS, or matching one of the configured globs. Every code file is
+    assigned to its deepest enclosing shard root; files outside all of them form
+    a "." shard. Returns [] when there are fewer than two shards (nothing to split).
+    """
+    globs = SHARD_GLOBS if globs is None else globs
+    roots = set(marker_roots or [])
+
+    if globs:
+        for root, dirs, files in os.walk(repo_path):
+            if "node_modules" in root or ".git" in root:
+                continue
+            rel = os.path.relpath(root, repo_path).replace(os.sep, "/")
+            if rel != "." and any(fnmatch.fnmatch(rel, g) for g in globs):
+                roots.add(root)
+
+    # Deepest roots first so nested projects win over their parents
+    ordered = sorted(roots, key=lambda r: r.count(os.sep), reverse=True)
+
+    buckets = {}
+    for file_path in code_files:
+        owner = repo_path
+        for r in ordered:
+            if file_path.startswith(r + os.sep):
+                owner = r
+                break
+        buckets.setdefault(owner, []).append(file_path)
+
+    if len(buckets) < 2:
+        return []
+
+    shards = []
+    for root in sorted(buckets):
+        shards.append({
+            "name": os.path.relpath(root, repo_path).replace(os.sep, "/"),
+            "root": root,
+            "code_files": buckets[root],
+            # Other shards inside this one: tools that walk the whole root skip them
+            "nested": sorted(r for r in roots if r.startswith(root + os.sep)),
+        })
+    return shards
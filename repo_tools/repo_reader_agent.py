@@ -1,21 +1,8 @@
 import os
 import re
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Load Gemini API key from .env
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY missing in .env")
-
-genai.configure(api_key=GOOGLE_API_KEY)
-
-# Initialize Gemini 2.5 Flash
-model = genai.GenerativeModel("gemini-2.5-flash")
+from repo_tools.llm_client import generate_content
+from repo_tools.dependency_graph import central_files
 
 
 def summarize_file_structure(repo_path, code_files):
@@ -37,24 +24,89 @@ def summarize_file_structure(repo_path, code_files):
     return tree
 
 
-def llm_repo_reader(repo_path, code_files):
+EXTENSION_LANGUAGES = {
+    ".py": "Python", ".js": "JavaScript", ".ts": "TypeScript", ".java": "Java",
+    ".cpp": "C++", ".c": "C", ".go": "Go", ".php": "PHP", ".rb": "Ruby",
+    ".swift": "Swift", ".kt": "Kotlin", ".rs": "Rust",
+}
+
+
+def basic_repo_summary(repo_path, code_files, dependency_graph=None):
+    """
+    Deterministic summary built from the file list only (no LLM call).
+    Used by the fast profile and as a placeholder until the LLM summary is ready.
+    important_files are the most central modules of `dependency_graph` when
+    given, topped up with the largest files.
+    """
+    languages = {}
+    sizes = []
+    for file_path in code_files:
+        ext = os.path.splitext(file_path)[1].lower()
+        lang = EXTENSION_LANGUAGES.get(ext, ext or "unknown")
+        languages[lang] = languages.get(lang, 0) + 1
+        try:
+            sizes.append((os.path.getsize(file_path), file_path))
+        except OSError:
+            pass
+
+    sizes.sort(reverse=True)
+    important = [c["file"] for c in central_files(dependency_graph, 5)]
+    for _, p in sizes:
+        if len(important) >= 5:
+            break
+        rel = os.path.relpath(p, repo_path).replace(os.sep, "/")
+        if rel not in important:
+            important.append(rel)
+
+    return {
+        "project_type": "unknown (static summary)",
+        "languages": sorted(languages, key=languages.get, reverse=True),
+        "important_files": important,
+        "missing_elements": [],
+        "concerns": [],
+        "file_count": len(code_files),
+        "total_bytes": sum(s for s, _ in sizes),
+    }
+
+
+def llm_repo_reader(repo_path, code_files, dependency_graph=None, directories=None):
     """
     Uses Gemini to summarize the repository.
     Returns a Python dict (parsed JSON).
+
+    With a `dependency_graph`, the prompt carries its most central modules
+    instead of the flat file list. With `directories` (a bounded list from
+    repo_tools.dir_summaries.select_directory_summaries), those replace the
+    full directory tree, so the prompt size no longer grows with the repo.
     """
 
-    file_tree = summarize_file_structure(repo_path, code_files)
+    if directories is not None:
+        tree_section = (
+            "Directory overview (largest subtrees expanded, the rest collapsed):\n"
+            + "\n".join(json.dumps(d) for d in directories)
+        )
+    else:
+        tree_section = f"Directory tree:\n{summarize_file_structure(repo_path, code_files)}"
+
+    if dependency_graph:
+        modules = "\n".join(
+            f"- {c['file']} (imported by {c['fan_in']}, imports {c['fan_out']})"
+            for c in central_files(dependency_graph, 15)
+        ) or "- (no internal imports found)"
+        file_section = f"Most central modules (from the import graph):\n{modules}"
+    elif directories is not None:
+        file_section = f"Code files: {len(code_files)}"
+    else:
+        file_section = f"Code files:\n{code_files}"
 
     prompt = f"""
 You are a senior software engineer. Analyze this repository structure:
 
 Repository path: {repo_path}
 
-Code files:
-{code_files}
+{file_section}
 
-Directory tree:
-{file_tree}
+{tree_section}
 
 Respond ONLY in valid JSON with keys:
 - project_type
@@ -64,7 +116,7 @@ Respond ONLY in valid JSON with keys:
 - concerns
 """
 
-    response = model.generate_content(prompt)
+    response = generate_content(prompt)
 
     raw = response.text.strip()
 
@@ -0,0 +1,203 @@
+# repo_tools/review_cascade.py
+import os
+from typing import List, Dict, Any, Optional
+
+from repo_tools.llm_client import DEFAULT_MODEL, RateLimiter
+
+# Review cascade: a cheap model triages batches of files, the strong model
+# only re-reviews the batches that need it. Set to 0 for one strong-model call.
+CASCADE_ENABLED = os.getenv("AUDITOR_LLM_CASCADE", "1") != "0"
+# Flagged files (with their snippets) per triage batch
+CASCADE_BATCH_FILES = int(os.getenv("AUDITOR_CASCADE_BATCH_FILES", "2"))
+# A triage finding below this confidence sends its batch to the strong model
+ESCALATE_MIN_CONFIDENCE = float(os.getenv("AUDITOR_CASCADE_MIN_CONFIDENCE", "0.7"))
+# Findings this severe need a higher triage confidence to be kept
+ESCALATE_SEVERITIES = {"critical", "high"}
+ESCALATE_SEVERE_MIN_CONFIDENCE = float(os.getenv("AUDITOR_CASCADE_SEVERE_MIN_CONFIDENCE", "0.9"))
+# High-risk triage findings go to the strong model however sure the triage model is
+ESCALATE_ALWAYS_SEVERITIES = {"critical"}
+ESCALATE_SECURITY_SEVERITIES = {"critical", "high"}
+# Batches this risky skip triage: a file at or above this risk score
+# (repo_tools.risk_scorer), or with a static security finding this severe
+ESCALATE_RISK_SCORE = float(os.getenv("AUDITOR_CASCADE_RISK_SCORE", "60"))
+ESCALATE_STATIC_SEVERITIES = {"HIGH", "CRITICAL"}
+
+
+REVIEW_PROMPT = """
+    You are an expert senior software engineer and code reviewer.
+
+    You are given structured information about a repository and deterministic static analysis results.
+    Your job: analyze the repo context and static issues, then produce:
+      1) A list "llm_detected_issues": potential issues not caught (or clarified) by static tools, each with:
+         - id (short unique string)
+         - file (relative path)
+         - line (number or null)
+         - category (one of: security, performance, bug, maintainability, readability, style, tests)
+         - severity (critical, high, medium, low)
+         - description (short explanation of the problem)
+         - suggestion (concrete fix or next steps)
+      2) overall_quality_score: a float 0.0 - 10.0 (higher is better)
+      3) recommendations: ordered list of 1-6 high-level recommendations (short strings)
+
+    IMPORTANT: Respond with **ONLY** a single valid JSON object adhering to the EXACT schema below.
+    Do NOT include any extra prose outside the JSON.
+
+    JSON schema:
+    {{
+      "llm_detected_issues": [
+        {{
+          "id": "ISSUE-1",
+          "file": "path/to/file.py",
+          "line": 123,
+          "category": "maintainability",
+          "severity": "high",
+          "description": "...",
+          "suggestion": "..."
+        }},
+        ...
+      ],
+      "overall_quality_score": 7.1,
+      "recommendations": ["Fix X", "Add tests for Y", ...]
+    }}
+
+    INPUT DATA (do not modify):
+    {input_json}
+
+    Remember:
+    - Be concise but precise.
+    - Prefer concrete actionable suggestions.
+    - When labeling severity, prefer security as higher priority if it can lead to data loss.
+    - If unsure about a specific line, set line to null and explain in description.
+    - Snippets show whole enclosing functions/classes; ">>" marks flagged lines and "..." marks code left out.
+    """
+
+TRIAGE_PROMPT = """
+    You are a code reviewer doing a quick first pass over a few files of a repository.
+
+    For the flagged file snippets below (with their static analysis findings), list the
+    likely problems as "llm_detected_issues", each with id, file (relative path), line
+    (number or null), category (security, performance, bug, maintainability, readability,
+    style, tests), severity (critical, high, medium, low), description, suggestion and
+    confidence: a float 0.0 - 1.0, how sure you are that it is a real problem.
+    Also give overall_quality_score (0.0 - 10.0, higher is better) and 1-3 recommendations.
+
+    Respond with ONLY a single valid JSON object:
+    {{
+      "llm_detected_issues": [
+        {{"id": "ISSUE-1", "file": "path/to/file.py", "line": 12, "category": "bug",
+          "severity": "medium", "description": "...", "suggestion": "...", "confidence": 0.8}}
+      ],
+      "overall_quality_score": 7.0,
+      "recommendations": ["..."]
+    }}
+
+    INPUT DATA (do not modify):
+    {input_json}
+
+    Report only what the code shown supports; use a low confidence when unsure.
+    """
+
+# Everything model-specific, in one place. limiter=None shares llm_client's
+# process-wide limiter (AUDITOR_LLM_RPM / AUDITOR_LLM_MAX_CONCURRENCY).
+MODEL_TIERS: Dict[str, Dict[str, Any]] = {
+    "triage": {
+        "model": os.getenv("AUDITOR_LLM_TRIAGE_MODEL", "gemini-2.5-flash-lite"),
+        "limiter": RateLimiter(
+            rpm=float(os.getenv("AUDITOR_LLM_TRIAGE_RPM", "120")),
+            max_concurrency=int(os.getenv("AUDITOR_LLM_TRIAGE_MAX_CONCURRENCY", "8")),
+        ),
+        "prompt": TRIAGE_PROMPT,
+        # Only the batch itself: no file list or module structure
+        "repo_context": False,
+        "static_issues_per_batch": 50,
+    },
+    "review": {
+        "model": DEFAULT_MODEL,
+        "limiter": None,
+        "prompt": REVIEW_PROMPT,
+        "repo_context": True,
+        "static_issues_per_batch": 200,
+    },
+}
+
+
+def review_batches(snippets: Dict[str, Any], batch_files: int = CASCADE_BATCH_FILES) -> List[List[str]]:
+    """
+    The flagged files in groups of `batch_files`, keeping their order (riskiest first).
+    """
+    files = list(snippets)
+    n = max(1, batch_files)
+    return [files[i:i + n] for i in range(0, len(files), n)]
+
+
+def _confidence(issue: Dict[str, Any]) -> Optional[float]:
+    try:
+        return min(1.0, max(0.0, float(issue.get("confidence"))))
+    except (TypeError, ValueError):
+        return None
+
+
+def batch_risk_reason(
+    files: List[str],
+    snippets: Dict[str, Any],
+    digest: Any,
+    risk_score: float = ESCALATE_RISK_SCORE,
+) -> Optional[str]:
+    """
+    Why a batch goes straight to the strong model, before any triage, or
+    None: one of its files has a risk score of at least `risk_score`, or a
+    severe static security finding (`digest`: repo_tools.static_digest.StaticDigest).
+    """
+    for f in files:
+        score = snippets.get(f, {}).get("risk_score")
+        if score is not None and score >= risk_score:
+            return f"high-risk file (risk score {score:.1f}) {f}"
+        severe = digest.security_severities.get(f, set()) & ESCALATE_STATIC_SEVERITIES
+        if severe:
+            return f"{'/'.join(sorted(severe)).lower()} static security finding in {f}"
+    return None
+
+
+def escalation_reason(
+    triage: Dict[str, Any],
+    min_confidence: float = ESCALATE_MIN_CONFIDENCE,
+    severe_min_confidence: float = ESCALATE_SEVERE_MIN_CONFIDENCE,
+) -> Optional[str]:
+    """
+    Why a triaged batch goes to the strong model, or None to keep the
+    triage result: the triage answer was unusable, a finding is high-risk
+    (critical, or a high/critical security finding) whatever its confidence,
+    or the model was not sure enough of a finding for its severity
+    (critical/high findings need `severe_min_confidence`, the rest
+    `min_confidence`).
+    """
+    if triage.get("raw_response") is not None:
+        return "triage response malformed or truncated"
+    for it in triage.get("llm_detected_issues", []):
+        severity = str(it.get("severity", "")).lower()
+        category = str(it.get("category", "")).lower()
+        if severity in ESCALATE_ALWAYS_SEVERITIES or (
+            category == "security" and severity in ESCALATE_SECURITY_SEVERITIES
+        ):
+            return f"high-risk finding ({category or 'unknown'}/{severity}) in {it.get('file')}"
+        confidence = _confidence(it)
+        severe = severity in ESCALATE_SEVERITIES
+        if confidence is None or confidence < (severe_min_confidence if severe else min_confidence):
+            shown = "none" if confidence is None else f"{confidence:.2f}"
+            kind = f"unsure {severity} finding" if severe else "low-confidence finding"
+            return f"{kind} (confidence {shown}) in {it.get('file')}"
+    return None
+
+
+def normalize_confidence(issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Triage issues with a usable 0..1 confidence kept as a float (others dropped from the issue).
+    """
+    for it in issues:
+        if "confidence" in it:
+            confidence = _confidence(it)
+            if confidence is None:
+                del it["confidence"]
+            else:
+                it["confidence"] = confidence
+    return issues
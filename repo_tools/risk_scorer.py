@@ -0,0 +1,221 @@
+# repo_tools/risk_scorer.py
+import os
+import re
+import math
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+# Below this many files the prepass runs inline (process start-up would dominate)
+RISK_PARALLEL_MIN_FILES = int(os.getenv("AUDITOR_RISK_PARALLEL_MIN_FILES", "64"))
+RISK_WORKERS = int(os.getenv("AUDITOR_RISK_WORKERS", str(os.cpu_count() or 2)))
+# Commits scanned for churn (0 disables the git log call)
+CHURN_MAX_COMMITS = int(os.getenv("AUDITOR_CHURN_MAX_COMMITS", "500"))
+
+# Calls/constructs worth a reviewer's look in any of the CODE_EXTENSIONS languages
+DANGEROUS_API = re.compile(
+    r"\beval\s*\(|\bexec\s*\(|os\.system|subprocess|shell\s*=\s*True|pickle\.loads?|yaml\.load\s*\("
+    r"|marshal\.loads|__import__|innerHTML|document\.write|child_process|new Function\s*\("
+    r"|exec\.Command|Runtime\.getRuntime|ProcessBuilder|\bunsafe\b|\bstrcpy\s*\(|\bsprintf\s*\(|\bgets\s*\("
+    r"|\bsystem\s*\(|\bpopen\s*\(|md5|sha1\b|verify\s*=\s*False|\bpassword\s*[:=]|\bsecret\s*[:=]"
+    r"|(?i:\b(select|insert|update|delete)\b.*[\"']\s*(\+|%|\.format))"
+)
+BRANCH = re.compile(r"\b(if|elif|else if|for|foreach|while|case|catch|except|switch)\b|&&|\|\|")
+COMMENT = re.compile(r"^\s*(#|//|/\*|\*)")
+
+# Score = sum of weight * signal (see score_files)
+RISK_WEIGHTS = {
+    "static": 1.0,          # weighted static findings (STATIC_FINDING_WEIGHTS)
+    "dangerous_api": 3.0,   # per hit, capped at DANGER_CAP hits
+    "branch_density": 10.0, # branches per LOC
+    "max_nesting": 1.5,     # per level
+    "size": 1.0,            # log2(1 + LOC)
+    "churn": 2.0,           # log2(1 + commits touching the file)
+    "centrality": 8.0,      # import-graph centrality, 0..1 (repo_tools.dependency_graph)
+}
+DANGER_CAP = 10
+# tool/type -> severity -> weight of one finding; style noise is capped per file
+STATIC_FINDING_WEIGHTS = {
+    "security": {"HIGH": 12.0, "MEDIUM": 6.0, "LOW": 2.0},
+    "complexity": {"_per_point": 0.4},
+    "style": {"_each": 0.1, "_cap": 2.0},
+}
+
+
+def file_metrics(path: str) -> Dict[str, Any]:
+    """
+    Cheap language-agnostic metrics for one file (runs in worker processes).
+    """
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            lines = f.readlines()
+    except OSError:
+        return {"path": path, "bytes": 0, "loc": 0, "branches": 0, "max_nesting": 0,
+                "nest_line": None, "dangerous": []}
+
+    loc = branches = max_nesting = 0
+    nest_line, dangerous, brace_depth = None, [], 0
+    for i, line in enumerate(lines, start=1):
+        stripped = line.strip()
+        if not stripped or COMMENT.match(line):
+            continue
+        loc += 1
+        branches += len(BRANCH.findall(stripped))
+        if DANGEROUS_API.search(stripped):
+            dangerous.append(i)
+
+        # Indentation for Python-like code, brace depth for C-like code
+        indent = len(line) - len(line.lstrip(" \t"))
+        depth = max(line[:indent].count("\t") + line[:indent].count(" ") // 4, brace_depth)
+        if depth > max_nesting:
+            max_nesting, nest_line = depth, i
+        brace_depth = max(0, brace_depth + stripped.count("{") - stripped.count("}"))
+
+    return {
+        "path": path,
+        "bytes": sum(len(l) for l in lines),
+        "loc": loc,
+        "branches": branches,
+        "max_nesting": max_nesting,
+        "nest_line": nest_line,
+        "dangerous": dangerous[:50],
+    }
+
+
+def git_churn(repo_path: str, max_commits: int = CHURN_MAX_COMMITS) -> Dict[str, int]:
+    """
+    Commits touching each file (repo-relative path) in the last `max_commits`;
+    empty when the repo has no git history (e.g. ZIP uploads).
+    """
+    if max_commits <= 0 or not os.path.isdir(os.path.join(repo_path, ".git")):
+        return {}
+    try:
+        out = subprocess.run(
+            ["git", "-C", repo_path, "log", f"-n{max_commits}", "--format=", "--name-only"],
+            capture_output=True, text=True, timeout=60,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return {}
+    churn = {}
+    for name in out.splitlines():
+        if name:
+            churn[name] = churn.get(name, 0) + 1
+    return churn
+
+
+class StaticWeights:
+    """
+    Per-file weighted finding totals and per-line weights (for hot lines),
+    accumulated one finding at a time so a stream of issues never has to be
+    held in memory.
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.lines: Dict[str, Dict[int, float]] = {}
+        self._style: Dict[str, float] = {}
+
+    def add(self, it: Dict[str, Any]) -> None:
+        if not isinstance(it, dict) or not it.get("file"):
+            return
+        f, kind = it["file"], it.get("type")
+        if kind == "security":
+            w = STATIC_FINDING_WEIGHTS["security"].get(str(it.get("severity") or "").upper(), 2.0)
+        elif kind == "complexity":
+            w = STATIC_FINDING_WEIGHTS["complexity"]["_per_point"] * float(it.get("value") or 0)
+        else:
+            cfg = STATIC_FINDING_WEIGHTS["style"]
+            w = cfg["_each"]
+            if self._style.get(f, 0.0) + w > cfg["_cap"]:
+                w = 0.0
+            self._style[f] = self._style.get(f, 0.0) + w
+        self.totals[f] = self.totals.get(f, 0.0) + w
+        if it.get("line") and w:
+            per_file = self.lines.setdefault(f, {})
+            per_file[it["line"]] = per_file.get(it["line"], 0.0) + w
+
+
+def _static_weights(static_issues: List[Dict[str, Any]]) -> StaticWeights:
+    weights = StaticWeights()
+    for it in static_issues or []:
+        weights.add(it)
+    return weights
+
+
+def score_files(
+    repo_path: str,
+    code_files: List[str],
+    static_issues: List[Dict[str, Any]] = None,
+    executor=None,
+    centrality: Dict[str, float] = None,
+    static_weights: Optional[StaticWeights] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Risk-rank every code file, riskiest first:
+      [{"file", "score", "hot_lines", "reasons", "metrics"}, ...]
+    `file` is repo-relative (like static issue paths). `executor` is an
+    optional process pool to reuse (e.g. the shared AnalyzerPool's).
+    `centrality`: {file: 0..1} from the import graph; widely imported
+    modules rank higher. `static_weights`: the findings already weighed as
+    they were produced (repo_tools.static_digest); `static_issues` is then
+    not read.
+    """
+    centrality = centrality or {}
+    files = list(code_files or [])
+    if executor is not None:
+        metrics = list(executor.map(file_metrics, files, chunksize=32))
+    elif len(files) >= RISK_PARALLEL_MIN_FILES and RISK_WORKERS > 1:
+        with ProcessPoolExecutor(max_workers=RISK_WORKERS) as pool:
+            metrics = list(pool.map(file_metrics, files, chunksize=32))
+    else:
+        metrics = [file_metrics(f) for f in files]
+
+    churn = git_churn(repo_path)
+    if static_weights is None:
+        static_weights = _static_weights(static_issues)
+    static_totals, line_weights = static_weights.totals, static_weights.lines
+    w = RISK_WEIGHTS
+
+    ranked = []
+    for m in metrics:
+        rel = os.path.relpath(m["path"], repo_path).replace(os.sep, "/")
+        loc = max(m["loc"], 1)
+        parts = {
+            "static": w["static"] * static_totals.get(rel, 0.0),
+            "dangerous_api": w["dangerous_api"] * min(len(m["dangerous"]), DANGER_CAP),
+            "branch_density": w["branch_density"] * m["branches"] / loc,
+            "max_nesting": w["max_nesting"] * m["max_nesting"],
+            "size": w["size"] * math.log2(1 + m["loc"]),
+            "churn": w["churn"] * math.log2(1 + churn.get(rel, 0)),
+            "centrality": w["centrality"] * centrality.get(rel, 0.0),
+        }
+
+        # Lines worth showing: weighted findings first, then risky API calls, then the deepest nesting
+        candidates = dict(line_weights.get(rel, {}))
+        for ln in m["dangerous"]:
+            candidates[ln] = candidates.get(ln, 0.0) + w["dangerous_api"]
+        if m["nest_line"] and not candidates:
+            candidates[m["nest_line"]] = 1.0
+        hot_lines = [ln for ln, _ in sorted(candidates.items(), key=lambda kv: (-kv[1], kv[0]))[:3]]
+
+        ranked.append({
+            "file": rel,
+            "score": round(sum(parts.values()), 2),
+            "hot_lines": hot_lines,
+            "reasons": [k for k, v in sorted(parts.items(), key=lambda kv: -kv[1]) if v >= 1.0][:3],
+            "metrics": {
+                "loc": m["loc"], "bytes": m["bytes"], "branches": m["branches"],
+                "max_nesting": m["max_nesting"], "dangerous_api_hits": len(m["dangerous"]),
+                "churn": churn.get(rel, 0), "centrality": centrality.get(rel, 0.0),
+            },
+        })
+
+    ranked.sort(key=lambda r: (-r["score"], r["file"]))
+    return ranked
+
+
+def risk_hotspots(risk_scores: List[Dict[str, Any]], n: int = 10) -> List[Dict[str, Any]]:
+    """
+    Compact top-n view of score_files() output for reports.
+    """
+    return [{"file": r["file"], "score": r["score"], "reasons": r["reasons"]} for r in (risk_scores or [])[:n]]
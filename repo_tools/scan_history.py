@@ -0,0 +1,241 @@
+# repo_tools/scan_history.py
+import os
+import re
+import time
+from contextlib import closing
+from typing import Optional, Dict, Any, List
+
+from repo_tools.job_queue import DATA_DIR
+from repo_tools.sqlite_store import SQLiteStore
+
+# SQLite file holding per-project scan history; "off" disables it
+HISTORY_DB = os.getenv("AUDITOR_HISTORY_DB", os.path.join(DATA_DIR, "history.db"))
+
+SEVERITIES = ["critical", "high", "medium", "low"]
+
+
+def project_name(source: str) -> str:
+    """
+    Default project key for an upload filename or Git URL:
+    "https://github.com/org/app.git" -> "app", "app-v2.zip" -> "app-v2".
+    """
+    base = os.path.basename((source or "").rstrip("/").replace("\\", "/"))
+    base = re.sub(r"\.(zip|git)$", "", base, flags=re.IGNORECASE)
+    return base or "default"
+
+
+class ScanHistory(SQLiteStore):
+    """
+    Per-project scan history. Each scan keeps only its set of issue
+    fingerprints (the categorizer's stable `id`) plus a few display columns,
+    so diffs between any two scans are set operations on the
+    (scan_id, fingerprint) primary key rather than report reloads.
+
+    Severity counts and new/fixed counts against the project's previous scan
+    are computed once at ingest, which makes trend queries a plain range scan.
+    """
+
+    def __init__(self, path: str = HISTORY_DB):
+        self.path = path
+        self._init_db("""
+            CREATE TABLE IF NOT EXISTS history_scans (
+                id TEXT PRIMARY KEY,
+                project TEXT NOT NULL,
+                ref TEXT,
+                created_at REAL NOT NULL,
+                previous_id TEXT,
+                total INTEGER NOT NULL,
+                critical INTEGER NOT NULL,
+                high INTEGER NOT NULL,
+                medium INTEGER NOT NULL,
+                low INTEGER NOT NULL,
+                new_count INTEGER,
+                fixed_count INTEGER,
+                quality_score REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_history_project ON history_scans(project, created_at);
+
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                scan_id TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                file TEXT,
+                line INTEGER,
+                severity TEXT,
+                category TEXT,
+                source TEXT,
+                description TEXT,
+                PRIMARY KEY (scan_id, fingerprint)
+            ) WITHOUT ROWID;
+        """)
+
+    ############################
+    # Ingest
+    ############################
+    def record_scan(self, scan_id: str, project: str, report: Dict[str, Any], ref: str = None) -> Dict[str, Any]:
+        """
+        Add a finished report to the project's history. Returns the stored
+        trend row (severity counts plus new/fixed vs. the previous scan).
+        """
+        rows, counts = {}, {s: 0 for s in SEVERITIES}
+        for it in report.get("issues") or []:
+            fp = it.get("id")
+            if not fp or fp in rows:
+                continue
+            line = it.get("line")
+            rows[fp] = (
+                scan_id, fp, it.get("file"), line if isinstance(line, int) else None,
+                it.get("severity"), it.get("category"), it.get("source"),
+                (it.get("description") or "")[:300],
+            )
+            if it.get("severity") in counts:
+                counts[it["severity"]] += 1
+
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                prev = conn.execute(
+                    "SELECT id FROM history_scans WHERE project = ? AND id != ? ORDER BY created_at DESC LIMIT 1",
+                    (project, scan_id),
+                ).fetchone()
+                previous_id = prev[0] if prev else None
+
+                conn.execute("DELETE FROM fingerprints WHERE scan_id = ?", (scan_id,))
+                conn.executemany("INSERT INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows.values())
+
+                new_count = fixed_count = None
+                if previous_id:
+                    new_count = self._count_missing(conn, scan_id, previous_id)
+                    fixed_count = self._count_missing(conn, previous_id, scan_id)
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO history_scans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (scan_id, project, ref, now, previous_id, len(rows),
+                     counts["critical"], counts["high"], counts["medium"], counts["low"],
+                     new_count, fixed_count, report.get("quality_score")),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get_scan(scan_id)
+
+    @staticmethod
+    def _count_missing(conn, scan_id: str, other_id: str) -> int:
+        # Fingerprints of scan_id that other_id doesn't have (PK lookups only)
+        return conn.execute(
+            """
+            SELECT COUNT(*) FROM fingerprints a
+            WHERE a.scan_id = ? AND NOT EXISTS (
+                SELECT 1 FROM fingerprints b WHERE b.scan_id = ? AND b.fingerprint = a.fingerprint
+            )
+            """,
+            (scan_id, other_id),
+        ).fetchone()[0]
+
+    ############################
+    # Queries
+    ############################
+    _SCAN_COLUMNS = ["id", "project", "ref", "created_at", "previous_id", "total",
+                     "critical", "high", "medium", "low", "new_count", "fixed_count", "quality_score"]
+
+    def _scan_row(self, row) -> Dict[str, Any]:
+        d = dict(zip(self._SCAN_COLUMNS, row))
+        d["by_severity"] = {s: d.pop(s) for s in SEVERITIES}
+        return d
+
+    def get_scan(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(self._SCAN_COLUMNS)} FROM history_scans WHERE id = ?", (scan_id,)
+            ).fetchone()
+        return self._scan_row(row) if row else None
+
+    def list_projects(self) -> List[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT project, COUNT(*), MAX(created_at) FROM history_scans GROUP BY project ORDER BY project"
+            ).fetchall()
+        return [{"project": p, "scans": n, "last_scan_at": t} for p, n, t in rows]
+
+    def trend(self, project: str, limit: int = 100, since: float = None) -> List[Dict[str, Any]]:
+        """
+        Precomputed per-scan counts for a project, oldest first (the newest
+        `limit` scans, optionally only those after `since`).
+        """
+        sql = f"SELECT {', '.join(self._SCAN_COLUMNS)} FROM history_scans WHERE project = ?"
+        params = [project]
+        if since is not None:
+            sql += " AND created_at >= ?"
+            params.append(since)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(max(1, int(limit)))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._scan_row(r) for r in reversed(rows)]
+
+    def latest_scans(self, project: str, n: int = 2) -> List[str]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id FROM history_scans WHERE project = ? ORDER BY created_at DESC LIMIT ?", (project, n)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def diff(self, base_id: str, head_id: str, limit: int = 100, include_persisting: bool = False) -> Dict[str, Any]:
+        """
+        new = head - base, fixed = base - head, persisting = head & base.
+        Counts are exact; the issue lists are capped at `limit` each.
+        """
+        _COLS = "a.fingerprint, a.file, a.line, a.severity, a.category, a.source, a.description"
+        keys = ["id", "file", "line", "severity", "category", "source", "description"]
+
+        def missing(conn, scan_id, other_id):
+            rows = conn.execute(
+                f"""
+                SELECT {_COLS} FROM fingerprints a
+                WHERE a.scan_id = ? AND NOT EXISTS (
+                    SELECT 1 FROM fingerprints b WHERE b.scan_id = ? AND b.fingerprint = a.fingerprint
+                )
+                ORDER BY a.file, a.line LIMIT ?
+                """,
+                (scan_id, other_id, limit),
+            ).fetchall()
+            return [dict(zip(keys, r)) for r in rows]
+
+        with closing(self._connect()) as conn:
+            new_count = self._count_missing(conn, head_id, base_id)
+            fixed_count = self._count_missing(conn, base_id, head_id)
+            head_total = conn.execute("SELECT COUNT(*) FROM fingerprints WHERE scan_id = ?", (head_id,)).fetchone()[0]
+            out = {
+                "base": base_id,
+                "head": head_id,
+                "counts": {"new": new_count, "fixed": fixed_count, "persisting": head_total - new_count},
+                "new": missing(conn, head_id, base_id),
+                "fixed": missing(conn, base_id, head_id),
+            }
+            if include_persisting:
+                rows = conn.execute(
+                    f"""
+                    SELECT {_COLS} FROM fingerprints a
+                    JOIN fingerprints b ON b.scan_id = ? AND b.fingerprint = a.fingerprint
+                    WHERE a.scan_id = ? ORDER BY a.file, a.line LIMIT ?
+                    """,
+                    (base_id, head_id, limit),
+                ).fetchall()
+                out["persisting"] = [dict(zip(keys, r)) for r in rows]
+        return out
+
+
+_history = None
+
+
+def get_scan_history() -> Optional[ScanHistory]:
+    """
+    Process-wide history at AUDITOR_HISTORY_DB, or None when it is off.
+    """
+    global _history
+    if HISTORY_DB.lower() in ("", "off", "none"):
+        return None
+    if _history is None:
+        _history = ScanHistory(HISTORY_DB)
+    return _history
@@ -0,0 +1,279 @@
+# repo_tools/secret_scanner.py
+import os
+import re
+import mmap
+import math
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable
+
+from repo_tools.repo_loader import is_code_file
+
+try:  # optional: true Aho-Corasick prefilter (pip install pyahocorasick)
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Set to 0 to leave the secret scanner out of run_static_analyzers
+SECRET_SCAN_ENABLED = os.getenv("AUDITOR_SECRET_SCAN", "1") != "0"
+# Files above this size are skipped (minified bundles, data dumps)
+SECRET_MAX_FILE_BYTES = int(os.getenv("AUDITOR_SECRET_MAX_FILE_BYTES", str(50 * 1024 * 1024)))
+# Below this many files the scan runs inline
+SECRET_PARALLEL_MIN_FILES = int(os.getenv("AUDITOR_SECRET_PARALLEL_MIN_FILES", "64"))
+SECRET_WORKERS = int(os.getenv("AUDITOR_SECRET_WORKERS", str(os.cpu_count() or 2)))
+# The Aho-Corasick automaton matches str, so files are decoded for it this many bytes at a time
+AC_CHUNK_BYTES = 1024 * 1024
+
+# Non-code files that commonly carry credentials
+CONFIG_EXTENSIONS = {
+    ".env", ".yml", ".yaml", ".json", ".ini", ".cfg", ".conf", ".toml", ".properties",
+    ".xml", ".sh", ".bash", ".ps1", ".tf", ".tfvars", ".pem", ".key", ".npmrc", ".pypirc",
+}
+CONFIG_NAMES = {"dockerfile", ".env", ".npmrc", ".pypirc", ".netrc", "credentials", "id_rsa", "id_dsa"}
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv"}
+
+# Values that are obviously not real credentials
+PLACEHOLDER = re.compile(rb"(?i)(your[_-]|example|changeme|placeholder|dummy|xxxx|<[^>]*>|\$\{|\{\{|\*\*\*)")
+
+# id, description, prefilter anchors (literal bytes), confirming regex,
+# severity, minimum Shannon entropy (bits/char) of the captured secret.
+# Anchors marked case-insensitive are expanded to lower/UPPER/Title variants.
+SECRET_RULES = [
+    {"id": "aws-access-key", "name": "AWS access key id", "anchors": [b"AKIA", b"ASIA", b"AGPA", b"AROA"],
+     "regex": rb"\b((?:AKIA|ASIA|AGPA|AROA)[0-9A-Z]{16})\b", "severity": "HIGH", "entropy": 3.0},
+    {"id": "aws-secret-key", "name": "AWS secret access key", "anchors": [b"aws_secret"], "nocase": True,
+     "regex": rb"(?i)aws_secret_access_key\s*[:=]\s*[\"']?([A-Za-z0-9/+=]{40})", "severity": "CRITICAL", "entropy": 3.5},
+    {"id": "google-api-key", "name": "Google API key", "anchors": [b"AIza"],
+     "regex": rb"(AIza[0-9A-Za-z_\-]{35})", "severity": "HIGH", "entropy": 3.0},
+    {"id": "github-token", "name": "GitHub token", "anchors": [b"ghp_", b"gho_", b"ghu_", b"ghs_", b"ghr_", b"github_pat_"],
+     "regex": rb"\b(gh[pousr]_[A-Za-z0-9]{36,255}|github_pat_[A-Za-z0-9_]{22,255})", "severity": "HIGH", "entropy": 3.0},
+    {"id": "slack-token", "name": "Slack token", "anchors": [b"xoxb-", b"xoxp-", b"xoxa-", b"xoxr-", b"xoxs-"],
+     "regex": rb"(xox[bpars]-[0-9A-Za-z-]{10,})", "severity": "HIGH", "entropy": 3.0},
+    {"id": "slack-webhook", "name": "Slack webhook URL", "anchors": [b"hooks.slack.com/"],
+     "regex": rb"(https://hooks\.slack\.com/services/[A-Za-z0-9/_-]{20,})", "severity": "MEDIUM", "entropy": 0},
+    {"id": "stripe-key", "name": "Stripe live key", "anchors": [b"sk_live_", b"rk_live_"],
+     "regex": rb"\b([sr]k_live_[0-9a-zA-Z]{16,})", "severity": "HIGH", "entropy": 2.5},
+    {"id": "private-key", "name": "private key block", "anchors": [b"-----BEGIN"],
+     "regex": rb"(-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY(?: BLOCK)?-----)",
+     "severity": "CRITICAL", "entropy": 0},
+    {"id": "jwt", "name": "JSON web token", "anchors": [b"eyJ"],
+     "regex": rb"\b(eyJ[A-Za-z0-9_-]{10,}\.eyJ[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,})", "severity": "MEDIUM", "entropy": 3.0},
+    {"id": "url-credentials", "name": "credentials in URL", "anchors": [b"://"],
+     "regex": rb"[a-zA-Z][a-zA-Z0-9+.-]*://[^/\s:@'\"]{1,64}:([^/\s:@'\"]{6,128})@[^\s'\"]+", "severity": "HIGH", "entropy": 2.5},
+    {"id": "generic-secret", "name": "hard-coded secret",
+     "anchors": [b"password", b"passwd", b"secret", b"token", b"api_key", b"apikey", b"api-key", b"access_key", b"private_key"],
+     "nocase": True,
+     "regex": rb"(?i)(?:password|passwd|secret|token|api[_-]?key|access[_-]?key|private[_-]?key)[\w.-]*[\"']?\s*(?:[:=]|:=|=>)\s*[\"']([^\"'\s]{8,})[\"']",
+     "severity": "MEDIUM", "entropy": 3.0},
+]
+
+# Compiled once per process (workers compile their own copy on first use)
+_compiled = None
+
+
+def _variants(anchor: bytes, nocase: bool) -> Iterable[bytes]:
+    if not nocase:
+        return [anchor]
+    return {anchor.lower(), anchor.upper(), anchor.title(), anchor.capitalize()}
+
+
+def _compile():
+    """
+    -> (prefilter, rules). The prefilter maps every anchor to the indexes of
+    the rules it can start, so each candidate is confirmed by one or two
+    regexes instead of all of them.
+    """
+    global _compiled
+    if _compiled is not None:
+        return _compiled
+
+    rules = [dict(r, compiled=re.compile(r["regex"])) for r in SECRET_RULES]
+    anchor_rules = {}
+    for i, r in enumerate(rules):
+        for a in r["anchors"]:
+            for v in _variants(a, r.get("nocase", False)):
+                anchor_rules.setdefault(v, set()).add(i)
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for anchor, idx in anchor_rules.items():
+            automaton.add_word(anchor.decode("latin-1"), (len(anchor), sorted(idx)))
+        automaton.make_automaton()
+        prefilter = ("ac", (automaton, max(len(a) for a in anchor_rules)))
+    else:
+        # One alternation of literals (longest first); scanned in C over the mmap
+        ordered = sorted(anchor_rules, key=len, reverse=True)
+        prefilter = ("re", (re.compile(b"|".join(re.escape(a) for a in ordered)), anchor_rules))
+
+    _compiled = (prefilter, rules)
+    return _compiled
+
+
+def _candidates(buf, prefilter):
+    """
+    Yields (offset, rule_indexes) for every anchor occurrence.
+    """
+    kind, engine = prefilter
+    if kind == "ac":
+        automaton, longest = engine
+        # Decode one chunk at a time, never the whole file. Each window runs
+        # longest-1 bytes past its chunk so anchors straddling the boundary are
+        # seen whole; those are reported by the chunk they start in.
+        size = len(buf)
+        for pos in range(0, size, AC_CHUNK_BYTES):
+            limit = pos + AC_CHUNK_BYTES
+            text = buf[pos:limit + longest - 1].decode("latin-1")
+            for end, (length, idx) in automaton.iter(text):
+                start = pos + end - length + 1
+                if start < limit:
+                    yield start, idx
+    else:
+        pattern, anchor_rules = engine
+        for m in pattern.finditer(buf):
+            yield m.start(), anchor_rules[m.group()]
+
+
+def shannon_entropy(data: bytes) -> float:
+    if not data:
+        return 0.0
+    n = len(data)
+    return -sum(c / n * math.log2(c / n) for c in Counter(data).values())
+
+
+def _redact(secret: bytes) -> str:
+    s = secret.decode("utf-8", "replace")
+    return (s[:4] + "…" + f"({len(s)} chars)") if len(s) > 8 else "…"
+
+
+def scan_file(path: str, rel_path: str = None) -> List[Dict[str, Any]]:
+    """
+    Scan one file through a read-only mmap. Returns static-issue dicts.
+    """
+    try:
+        size = os.path.getsize(path)
+        if size == 0 or size > SECRET_MAX_FILE_BYTES:
+            return []
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if b"\x00" in mm[:8192]:
+                return []  # binary
+            return _scan_buffer(mm, rel_path or path)
+    except (OSError, ValueError):
+        return []
+
+
+def _scan_buffer(buf, file_label: str) -> List[Dict[str, Any]]:
+    prefilter, rules = _compile()
+    issues, seen = [], set()
+    line_no, line_pos = 1, 0
+
+    for offset, rule_idx in _candidates(buf, prefilter):
+        # Confirm only on the line holding the anchor
+        start = buf.rfind(b"\n", 0, offset) + 1
+        end = buf.find(b"\n", offset)
+        end = len(buf) if end == -1 else end
+        line = buf[start:min(end, start + 4096)]
+
+        if start > line_pos:
+            line_no += buf[line_pos:start].count(b"\n")
+            line_pos = start
+
+        for i in rule_idx:
+            if (i, line_no) in seen:
+                continue
+            rule = rules[i]
+            m = rule["compiled"].search(line)
+            if not m:
+                continue
+            secret = m.group(1) if m.groups() else m.group(0)
+            if rule["entropy"] and shannon_entropy(secret) < rule["entropy"]:
+                continue
+            if rule["entropy"] and PLACEHOLDER.search(secret):
+                continue
+            seen.add((i, line_no))
+            issues.append({
+                "file": file_label,
+                "line": line_no,
+                "severity": rule["severity"],
+                "type": "security",
+                "tool": "secrets",
+                "rule": rule["id"],
+                "message": f"Possible {rule['name']} committed to source: {_redact(secret)}",
+            })
+
+    # A line matched by a specific rule doesn't need the generic one as well
+    specific = {it["line"] for it in issues if it["rule"] != "generic-secret"}
+    return [it for it in issues if it["rule"] != "generic-secret" or it["line"] not in specific]
+
+
+def scan_files(paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Scan a batch of files (the unit of work sent to pool workers).
+    """
+    issues = []
+    for p in paths:
+        issues.extend(scan_file(p))
+    return issues
+
+
+def is_secret_target(path: str) -> bool:
+    """
+    Whether the scanner looks at this file (a code or config file), by name only.
+    """
+    name = os.path.basename(path)
+    ext = os.path.splitext(name)[1].lower()
+    return is_code_file(path) or ext in CONFIG_EXTENSIONS or name.lower() in CONFIG_NAMES or name.startswith(".env")
+
+
+def secret_scan_targets(repo_path: str, exclude_dirs: Iterable[str] = ()) -> List[str]:
+    """
+    Every code and config file under repo_path, skipping `exclude_dirs`
+    (absolute paths, e.g. nested monorepo shards scanned on their own).
+    """
+    excluded = {os.path.abspath(d) for d in exclude_dirs or ()}
+    targets = []
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and os.path.abspath(os.path.join(root, d)) not in excluded]
+        for name in files:
+            full = os.path.join(root, name)
+            if is_secret_target(full):
+                targets.append(full)
+    return targets
+
+
+def _batches(paths: List[str], n: int) -> List[List[str]]:
+    # Byte-balanced batches: largest files first, each to the lightest batch
+    sized = sorted(((os.path.getsize(p) if os.path.exists(p) else 0, p) for p in paths), reverse=True)
+    batches = [[] for _ in range(max(1, n))]
+    loads = [0] * len(batches)
+    for size, p in sized:
+        i = loads.index(min(loads))
+        batches[i].append(p)
+        loads[i] += size + 4096
+    return [b for b in batches if b]
+
+
+def scan_secrets(
+    repo_path: str,
+    exclude_dirs: Iterable[str] = (),
+    executor=None,
+    workers: int = SECRET_WORKERS,
+) -> List[Dict[str, Any]]:
+    """
+    Secret scan of a repository; issue paths are absolute like the other
+    analyzers' (run_static_analyzers makes them repo-relative).
+    `executor`: optional process pool (with `workers` processes) to spread
+    byte-balanced file batches over; results keep file order.
+    """
+    targets = secret_scan_targets(repo_path, exclude_dirs)
+    if executor is None and (len(targets) < SECRET_PARALLEL_MIN_FILES or workers <= 1):
+        return scan_files(targets)
+
+    batches = _batches(targets, workers * 4)
+    if executor is not None:
+        issues = [it for batch in executor.map(scan_files, batches) for it in batch]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            issues = [it for batch in pool.map(scan_files, batches) for it in batch]
+    # Batches are balanced by size, not contiguous: restore target order (stable within a file)
+    index = {p: i for i, p in enumerate(targets)}
+    return sorted(issues, key=lambda it: index.get(it["file"], len(index)))
@@ -0,0 +1,24 @@
+# repo_tools/sqlite_store.py
+import os
+import sqlite3
+from contextlib import closing
+
+
+class SQLiteStore:
+    """
+    Base for the stores kept in one SQLite file (job queue, issue store,
+    scan history, summary cache): the file is created with its schema and
+    put in WAL mode, so readers in other processes don't block the writer.
+    """
+
+    path: str
+
+    def _init_db(self, schema: str):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(schema)
+
+    def _connect(self) -> sqlite3.Connection:
+        # New connection per call: safe to use from any thread or process
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
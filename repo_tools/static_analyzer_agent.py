@@ -1,73 +1,190 @@
 import subprocess
-import json
 import os
+import sys
+import queue
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from radon.complexity import cc_visit
 from radon.cli.harvest import CCHarvester
+from repo_tools.json_stream import ArrayStreamParser
+from repo_tools.secret_scanner import scan_secrets, SECRET_SCAN_ENABLED
+from repo_tools.clone_detector import detect_clones, CLONE_DETECTION_ENABLED
 
+# Parallel Bandit/Flake8/Radon batches (tool subprocesses, or AnalyzerPool workers)
+STATIC_WORKERS = int(os.getenv("AUDITOR_STATIC_WORKERS", str(os.cpu_count() or 2)))
+# Fewer Python files than this are analyzed as one batch
+STATIC_PARALLEL_MIN_FILES = int(os.getenv("AUDITOR_STATIC_PARALLEL_MIN_FILES", "32"))
+# Files per tool invocation at most (keeps command lines short)
+STATIC_MAX_BATCH_FILES = 400
 
-def run_bandit(repo_path):
+
+# Characters read from a tool's stdout at a time
+STREAM_CHUNK = 65536
+
+
+def _bandit_issue(item):
+    return {
+        "file": item.get("filename"),
+        "line": item.get("line_number"),
+        "severity": item.get("issue_severity"),
+        "type": "security",
+        "tool": "bandit",
+        "message": item.get("issue_text")
+    }
+
+
+def _flake8_issue(line):
     """
-    Runs Bandit to detect security issues.
-    Returns a list of issue dicts.
+    The issue on one line of flake8 output (our --format), or None.
     """
     try:
-        result = subprocess.run(
-            ["bandit", "-r", repo_path, "-f", "json"],
-            capture_output=True, text=True
-        )
+        file_path, row, msg = line.rstrip("\n").split(":::")
+        return {
+            "file": file_path,
+            "line": int(row),
+            "type": "style",
+            "tool": "flake8",
+            "message": msg,
+            "severity": "LOW"
+        }
+    except ValueError:
+        return None
 
-        bandit_output = json.loads(result.stdout)
-        issues = []
 
-        for item in bandit_output.get("results", []):
+def iter_bandit(repo_path, files=None):
+    """
+    Runs Bandit to detect security issues, on `files` when given (else the
+    whole repo_path recursively), and yields issue dicts while its JSON
+    report is read from the pipe: each result is decoded as soon as it is
+    complete, so the report is never held as one string.
+    """
+    try:
+        # -q: otherwise Bandit's progress bar lands on stdout and breaks the JSON
+        targets = list(files) if files is not None else ["-r", repo_path]
+        with subprocess.Popen(
+            ["bandit", "-q", "-f", "json", *targets],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors="replace"
+        ) as proc:
+            parser = ArrayStreamParser("results", keep_text=False)
+            while True:
+                chunk = proc.stdout.read(STREAM_CHUNK)
+                if not chunk:
+                    break
+                for item in parser.feed(chunk):
+                    if isinstance(item, dict):
+                        yield _bandit_issue(item)
+
+    except Exception as e:
+        print("Bandit failed:", e)
+
+
+def iter_flake8(repo_path, files=None):
+    """
+    Runs flake8 for style issues, on `files` when given (else repo_path),
+    and yields issue dicts line by line as flake8 prints them.
+    """
+    try:
+        # A batch is already one of several parallel jobs: no flake8 multiprocessing on top
+        targets = [*files, "--jobs=1"] if files is not None else [repo_path]
+        with subprocess.Popen(
+            ["flake8", *targets, "--format=%(path)s:::%(row)d:::%(text)s"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors="replace"
+        ) as proc:
+            for line in proc.stdout:
+                issue = _flake8_issue(line)
+                if issue is not None:
+                    yield issue
+
+    except Exception as e:
+        print("Flake8 failed:", e)
+
+
+def run_bandit(repo_path, files=None):
+    """
+    iter_bandit() as a list.
+    """
+    return list(iter_bandit(repo_path, files))
+
+
+def run_flake8(repo_path, files=None):
+    """
+    iter_flake8() as a list.
+    """
+    return list(iter_flake8(repo_path, files))
+
+
+def run_bandit_inprocess(repo_path, files=None):
+    """
+    Same output as run_bandit, but through Bandit's Python API. Used by
+    long-lived analyzer workers (repo_tools/analyzer_pool.py) so each scan
+    doesn't pay for a fresh `bandit` interpreter.
+    """
+    try:
+        from bandit.core import config as b_config, manager as b_manager
+
+        mgr = b_manager.BanditManager(b_config.BanditConfig(), "file", quiet=True)
+        if files is not None:
+            mgr.discover_files(list(files), recursive=False)
+        else:
+            mgr.discover_files([repo_path], recursive=True)
+        mgr.run_tests()
+
+        issues = []
+        for item in mgr.get_issue_list():
             issues.append({
-                "file": item.get("filename"),
-                "line": item.get("line_number"),
-                "severity": item.get("issue_severity"),
+                "file": item.fname,
+                "line": item.lineno,
+                "severity": item.severity,
                 "type": "security",
                 "tool": "bandit",
-                "message": item.get("issue_text")
+                "message": item.text
             })
-
         return issues
 
     except Exception as e:
         print("Bandit failed:", e)
         return []
-    
 
-def run_flake8(repo_path):
+
+def run_flake8_inprocess(repo_path, files=None):
     """
-    Runs flake8 for style issues.
-    Returns list of issue dicts.
+    Same output as run_flake8, but by running flake8's Application in this
+    process (exactly what the `flake8` command does) with output to a temp file.
     """
+    out_fd, out_path = tempfile.mkstemp(prefix="flake8_", suffix=".txt")
+    os.close(out_fd)
     try:
-        result = subprocess.run(
-            ["flake8", repo_path, "--format=%(path)s:::%(row)d:::%(text)s"],
-            capture_output=True, text=True
-        )
+        from flake8.main.application import Application
 
-        issues = []
-        for line in result.stdout.splitlines():
-            try:
-                file_path, row, msg = line.split(":::")
-                issues.append({
-                    "file": file_path,
-                    "line": int(row),
-                    "type": "style",
-                    "tool": "flake8",
-                    "message": msg,
-                    "severity": "LOW"
-                })
-            except:
-                continue
+        targets = [*files, "--jobs=1"] if files is not None else [repo_path]
+        Application().run([
+            *targets,
+            "--format=%(path)s:::%(row)d:::%(text)s",
+            f"--output-file={out_path}",
+        ])
 
-        return issues
+        with open(out_path, "r", encoding="utf-8", errors="ignore") as f:
+            return [issue for issue in map(_flake8_issue, f) if issue is not None]
 
     except Exception as e:
         print("Flake8 failed:", e)
         return []
 
+    finally:
+        os.remove(out_path)
+
+
+def iter_radon_files(code_files):
+    """
+    Radon's issues for code_files, file by file as each is analyzed.
+    """
+    for file_path in code_files:
+        yield from run_radon_complexity(file_path)
+
+
+def run_radon_files(code_files):
+    return list(iter_radon_files(code_files))
+
 
 def run_radon_complexity(file_path):
     """
@@ -100,22 +217,203 @@ def run_radon_complexity(file_path):
     return issues
 
 
-def run_static_analyzers(repo_path, code_files):
+def python_files(code_files):
     """
-    Executes Bandit, Flake8, and Radon across repo.
-    Returns combined list of issues.
+    The files Bandit, Flake8 and Radon analyze.
     """
+    return [p for p in code_files or [] if p.endswith(".py")]
 
-    issues = []
 
-    # 1. Security issues (Bandit)
-    issues.extend(run_bandit(repo_path))
+def file_batches(paths, n):
+    """
+    Split `paths` into about n contiguous batches of similar total size in
+    bytes (at most STATIC_MAX_BATCH_FILES files each). Contiguous, so the
+    batch results concatenated keep the order of `paths`.
+    """
+    if not paths:
+        return []
+    sizes = []
+    for p in paths:
+        try:
+            sizes.append(os.path.getsize(p) + 4096)  # + per-file overhead
+        except OSError:
+            sizes.append(4096)
+    n = max(1, n, -(-len(paths) // STATIC_MAX_BATCH_FILES))
+    target = sum(sizes) / n
+
+    batches, current, done = [], [], 0
+    for p, size in zip(paths, sizes):
+        if current and (done + size / 2 > target * (len(batches) + 1) or len(current) >= STATIC_MAX_BATCH_FILES):
+            batches.append(current)
+            current = []
+        current.append(p)
+        done += size
+    batches.append(current)
+    return batches
 
-    # 2. Style issues (Flake8)
-    issues.extend(run_flake8(repo_path))
 
-    # 3. Complexity issues (Radon)
-    for file_path in code_files:
-        issues.extend(run_radon_complexity(file_path))
+_DONE = object()
+
+
+class _Drained:
+    """
+    Runs an issue generator on `executor`, handing each issue over through a
+    queue as soon as it is produced. Iterating yields them, blocking until
+    the next one arrives; whatever isn't consumed yet waits in the queue.
+    """
+
+    def __init__(self, executor, fn, *args):
+        self._queue = queue.SimpleQueue()
+        self._future = executor.submit(self._run, fn, args)
+
+    def _run(self, fn, args):
+        try:
+            for it in fn(*args):
+                self._queue.put(it)
+        finally:
+            self._queue.put(_DONE)
+
+    def __iter__(self):
+        while True:
+            it = self._queue.get()
+            if it is _DONE:
+                self._future.result()  # re-raises what the generator raised
+                return
+            yield it
+
+    def result(self):
+        return list(self)
+
+
+def _in_file_order(issues, paths):
+    # Tools may report a batch's files in any order; sort by code_files position (stable)
+    index = {p: i for i, p in enumerate(paths)}
+    return sorted(issues, key=lambda it: (index.get(it.get("file"), len(index)), it.get("line") or 0))
+
+
+def submit_python_tools(repo_path, code_files, executor=None, workers=STATIC_WORKERS):
+    """
+    Start Bandit, Flake8 and Radon on exactly the Python files of
+    code_files, in byte-balanced batches spread over `workers`.
+
+    executor: a process pool (AnalyzerPool's) to run the tools' Python APIs
+    in; without one the tool CLIs run as parallel subprocesses and Radon
+    runs in this process.
+
+    Returns a function that returns an iterator over the issues: Radon's,
+    then Flake8's, then Bandit's, each in code_files order. Every batch runs
+    (and is drained) concurrently; the iterator yields each one as soon as it
+    and the ones before it are done. Without an executor Radon's come out
+    file by file while the tool subprocesses are still running. (Bandit and
+    Flake8 only write their reports when they exit, so a batch of theirs is
+    complete when its first issue arrives and sorting it delays nothing.)
+    """
+    paths = python_files(code_files)
+    if not paths:
+        return lambda: []
+    n = 1 if len(paths) < STATIC_PARALLEL_MIN_FILES else max(1, workers)
 
+    if executor is not None:
+        # In-process APIs are cheap to start: more, smaller batches balance better
+        batches = file_batches(paths, n * 2 if n > 1 else 1)
+        radon = [executor.submit(run_radon_files, b) for b in batches]
+        flake8 = [executor.submit(run_flake8_inprocess, repo_path, b) for b in batches]
+        bandit = [executor.submit(run_bandit_inprocess, repo_path, b) for b in batches]
+        threads = ()
+    else:
+        batches = file_batches(paths, n)
+        tools = ThreadPoolExecutor(max_workers=max(1, min(len(batches) * 2, workers)))
+        flake8 = [_Drained(tools, iter_flake8, repo_path, b) for b in batches]
+        bandit = [_Drained(tools, iter_bandit, repo_path, b) for b in batches]
+        # Radon is pure Python: started once the subprocesses are, on its own thread
+        own = ThreadPoolExecutor(max_workers=1)
+        radon = [_Drained(own, iter_radon_files, paths)]
+        threads = (tools, own)
+
+    def collect():
+        try:
+            # Radon already reports per file in order, and batches are contiguous
+            for f in radon:
+                yield from f if isinstance(f, _Drained) else f.result()
+            for f in flake8:
+                yield from _in_file_order(f.result(), paths)
+            for f in bandit:
+                yield from _in_file_order(f.result(), paths)
+        finally:
+            for t in threads:
+                t.shutdown(wait=True)
+
+    return collect
+
+
+def iter_relative_paths(issues, repo_path):
+    """
+    Yields `issues` with tool-reported paths rewritten relative to repo_path
+    (posix separators), so reports and issue fingerprints don't depend on
+    the temp extraction dir.
+    """
+    root = os.path.abspath(repo_path)
+    # One relpath (and one interned string) per distinct file, not per issue
+    seen = {}
+    for it in issues:
+        f = it.get("file") if isinstance(it, dict) else None
+        if f:
+            rel = seen.get(f)
+            if rel is None:
+                rel = f
+                if os.path.isabs(f):
+                    r = os.path.relpath(f, root)
+                    if not r.startswith(".."):
+                        rel = r.replace(os.sep, "/")
+                rel = seen[f] = sys.intern(rel)
+            it["file"] = rel
+        yield it
+
+
+def relativize_issue_paths(issues, repo_path):
+    """
+    iter_relative_paths() applied in place; returns `issues`.
+    """
+    for _ in iter_relative_paths(issues, repo_path):
+        pass
     return issues
+
+
+def iter_static_analyzers(repo_path, code_files, exclude_dirs=None):
+    """
+    run_static_analyzers() without a pool, as a generator: issues (same
+    order, repo-relative paths) come out while the analyzers still run. In
+    streaming mode static_analyzer_node feeds them to IssueStream.add_static(),
+    which categorizes them in the meantime instead of waiting for the whole list.
+    """
+    def issues():
+        # 1.-3. Security (Bandit), style (Flake8) and complexity (Radon) issues,
+        # on the Python files of code_files only, in parallel batches
+        yield from submit_python_tools(repo_path, code_files)()
+
+        # 4. Hard-coded credentials in code and config files (all languages)
+        if SECRET_SCAN_ENABLED:
+            yield from scan_secrets(repo_path, exclude_dirs or ())
+
+        # 5. Copy-pasted blocks across code_files
+        if CLONE_DETECTION_ENABLED:
+            yield from detect_clones(repo_path, code_files)
+
+    return iter_relative_paths(issues(), repo_path)
+
+
+def run_static_analyzers(repo_path, code_files, pool=None, exclude_dirs=None):
+    """
+    Executes Bandit, Flake8, Radon, the secret scanner and clone detection across repo
+    (Bandit, Flake8 and Radon see exactly code_files, not everything under repo_path).
+    Returns combined list of issues, with file paths relative to repo_path.
+
+    pool: optional AnalyzerPool; when given, the analyzers run
+    concurrently in its long-lived worker processes.
+    exclude_dirs: directories the secret scanner skips (nested monorepo shards).
+    """
+
+    if pool is not None:
+        return relativize_issue_paths(pool.run(repo_path, code_files, exclude_dirs=exclude_dirs), repo_path)
+
+    return list(iter_static_analyzers(repo_path, code_files, exclude_dirs))
@@ -0,0 +1,93 @@
+# repo_tools/static_digest.py
+import os
+import heapq
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from repo_tools.risk_scorer import StaticWeights
+
+# Issues kept for the reviewer prompt's static_issues_sample
+STATIC_SAMPLE_SIZE = int(os.getenv("AUDITOR_STATIC_SAMPLE_SIZE", "200"))
+# Issues kept per file for the review cascade's per-batch samples (the review tier's cap)
+STATIC_SAMPLE_PER_FILE = int(os.getenv("AUDITOR_STATIC_SAMPLE_PER_FILE", "200"))
+
+
+class StaticDigest:
+    """
+    What the stages after static analysis read from its findings, collected
+    as the findings stream by: the first STATIC_SAMPLE_SIZE issues, the first
+    STATIC_SAMPLE_PER_FILE issues of each file, per-file finding counts,
+    flagged lines and security severities, the risk scorer's weights and the
+    distinct (type, severity) pairs. Its size grows with the number of files
+    and lines, never with how many findings a noisy repository produces.
+    """
+
+    def __init__(self):
+        self.sample: List[Dict[str, Any]] = []
+        self.file_counts: Dict[str, int] = {}
+        self.file_lines: Dict[str, Dict[int, None]] = {}  # flagged lines, first seen first
+        self.security_severities: Dict[str, Set[str]] = {}  # file -> severities of its security findings
+        self.weights = StaticWeights()
+        self._kinds: Dict[Tuple[Any, str], None] = {}
+        self._file_samples: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        self._seq = 0
+
+    @classmethod
+    def of(cls, issues: Iterable[Dict[str, Any]]) -> "StaticDigest":
+        digest = cls()
+        for it in issues or []:
+            digest.add(it)
+        return digest
+
+    def add(self, it: Dict[str, Any]) -> None:
+        if not isinstance(it, dict):
+            return
+        self._seq += 1
+        if len(self.sample) < STATIC_SAMPLE_SIZE:
+            self.sample.append(it)
+        self._kinds.setdefault((it.get("type"), str(it.get("severity") or "").upper()))
+        self.weights.add(it)
+        f = it.get("file")
+        if not f:
+            return
+        self.file_counts[f] = self.file_counts.get(f, 0) + 1
+        if it.get("type") == "security":
+            self.security_severities.setdefault(f, set()).add(str(it.get("severity") or "").upper())
+        if it.get("line"):
+            self.file_lines.setdefault(f, {}).setdefault(it["line"])
+        kept = self._file_samples.setdefault(f, [])
+        if len(kept) < STATIC_SAMPLE_PER_FILE:
+            kept.append((self._seq, it))
+
+    def collect(self, issues: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Passes `issues` through unchanged, adding each one on the way (to
+        digest a stream another consumer drains).
+        """
+        for it in issues:
+            self.add(it)
+            yield it
+
+    def kinds(self) -> List[Dict[str, Any]]:
+        """
+        One {"type", "severity"} stand-in per distinct kind of finding.
+        """
+        return [{"type": t, "severity": s} for t, s in self._kinds]
+
+    def top_files(self, n: int) -> List[str]:
+        """
+        The `n` files with the most findings (ties in first-seen order).
+        """
+        ranked = sorted(self.file_counts.items(), key=lambda x: x[1], reverse=True)
+        return [f for f, _ in ranked[:n]]
+
+    def lines(self, f: str) -> List[int]:
+        return list(self.file_lines.get(f, ()))
+
+    def issues_for(self, files: Iterable[str], limit: int) -> List[Dict[str, Any]]:
+        """
+        The first `limit` kept issues of `files`, in the order they came in.
+        """
+        runs = [self._file_samples.get(f, []) for f in set(files)]
+        merged = heapq.merge(*runs, key=lambda x: x[0])
+        return [it for _, it in islice(merged, max(0, limit))]
@@ -0,0 +1,512 @@
+# repo_tools/watch_session.py
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Set
+
+from repo_tools.repo_loader import walk_code_files, is_code_file
+from repo_tools.repo_reader_agent import basic_repo_summary
+from repo_tools.static_analyzer_agent import (
+    submit_python_tools, run_bandit_inprocess, run_flake8_inprocess, run_radon_files,
+    python_files, iter_relative_paths,
+)
+from repo_tools.secret_scanner import (
+    SECRET_SCAN_ENABLED, scan_secrets, scan_files, secret_scan_targets, is_secret_target
+)
+from repo_tools.clone_detector import CLONE_DETECTION_ENABLED, fingerprint_files, clone_issues
+from repo_tools.dependency_graph import build_dependency_graph, file_centrality, DEP_GRAPH_ENABLED
+from repo_tools.baseline import find_baseline, load_baseline
+from repo_tools.issue_categorizer_agent import merge_and_categorize_issues
+from repo_tools.issue_record import by_severity
+from repo_tools.priority_agent import assign_priorities, summarize_priorities
+from repo_tools.llm_code_reviewer_agent import llm_code_reviewer, top_flagged_files
+from graphs.issue_categorizer_node import summarize_categorized
+from graphs.profile_router_node import normalize_profile
+from graphs.aggregator_node import aggregator_node
+
+# Set to 1 to poll for changes even where inotify is available
+WATCH_POLL = os.getenv("AUDITOR_WATCH_POLL", "0") == "1"
+# Seconds between polls of the tree (polling watcher only)
+WATCH_INTERVAL = float(os.getenv("AUDITOR_WATCH_INTERVAL", "0.5"))
+# A burst of events (an editor's save, a git checkout) ends after this much quiet
+WATCH_DEBOUNCE_MS = float(os.getenv("AUDITOR_WATCH_DEBOUNCE_MS", "50"))
+# deep/auto profiles: files the first LLM review covers (most findings first)
+WATCH_REVIEW_FILES = int(os.getenv("AUDITOR_WATCH_REVIEW_FILES", "8"))
+
+# Static findings of a file in the order a full run reports them
+TOOLS = ("radon", "flake8", "bandit", "secrets", "clones")
+# Directories the loader skips (and so nobody needs to watch)
+IGNORED_DIRS = {".git", "node_modules"}
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+def _ignored(root: str) -> bool:
+    # Same test as repo_loader.walk_code_files
+    return "node_modules" in root or ".git" in root
+
+
+class InotifyWatcher:
+    """
+    Linux inotify on every directory of the tree (new directories are
+    watched as they appear). changes() returns the paths touched since the
+    last call, or None when the kernel queue overflowed and events were lost.
+    """
+
+    kind = "inotify"
+
+    def __init__(self, root: str):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = os.path.abspath(root)
+        self.dirs: Dict[int, str] = {}
+        try:
+            self._watch_tree(self.root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, top: str):
+        for root, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+            if _ignored(root):
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOENT:
+                    continue  # removed while walking
+                raise OSError(err, f"inotify_add_watch failed for {root} (fs.inotify.max_user_watches?)")
+            self.dirs[wd] = root
+
+    def _read(self, paths: Set[str]) -> bool:
+        """
+        Drains pending events into `paths`; False on queue overflow.
+        """
+        try:
+            buf = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return True
+        ok, pos = True, 0
+        while pos + _EVENT.size <= len(buf):
+            wd, mask, _, length = _EVENT.unpack_from(buf, pos)
+            name = buf[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b"\0")
+            pos += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                ok = False
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            parent = self.dirs.get(wd)
+            if parent is None:
+                continue
+            path = os.path.join(parent, os.fsdecode(name)) if name else parent
+            paths.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and not _ignored(path):
+                try:
+                    self._watch_tree(path)
+                except OSError as e:
+                    print(f"⚠️  Not watching {path}: {e}")
+        return ok
+
+    def changes(self, timeout: float) -> Optional[Set[str]]:
+        paths: Set[str] = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return paths
+        ok = self._read(paths)
+        # Wait out the rest of the burst
+        while select.select([self.fd], [], [], WATCH_DEBOUNCE_MS / 1000.0)[0]:
+            ok = self._read(paths) and ok
+        return paths if ok else None
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """
+    Fallback for platforms without inotify: compares (mtime, size) of every
+    file in the tree every WATCH_INTERVAL seconds.
+    """
+
+    kind = "polling"
+
+    def __init__(self, root: str, interval: float = WATCH_INTERVAL):
+        self.root = os.path.abspath(root)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        stamps = {}
+        for root, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stamps[path] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def changes(self, timeout: float) -> Optional[Set[str]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            time.sleep(max(0.0, min(self.interval, deadline - time.monotonic())))
+            current = self._scan()
+            old, self.snapshot = self.snapshot, current
+            paths = {p for p in current.keys() | old.keys() if current.get(p) != old.get(p)}
+            if paths or time.monotonic() >= deadline:
+                return paths
+
+    def close(self):
+        pass
+
+
+def make_watcher(root: str):
+    """
+    inotify where the platform has it (and AUDITOR_WATCH_POLL isn't set), else polling.
+    """
+    if not WATCH_POLL and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}); polling every {WATCH_INTERVAL}s")
+    return PollingWatcher(root)
+
+
+def _stamp(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _by_file(issues: Iterable[Dict[str, Any]], repo_path: str) -> Dict[str, List[Dict[str, Any]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for it in iter_relative_paths(issues, repo_path):
+        grouped.setdefault(it["file"], []).append(it)
+    return grouped
+
+
+def _in_line_order(issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # The full run sorts each tool's batch by line (stable), see _in_file_order
+    return sorted(issues, key=lambda it: it.get("line") or 0)
+
+
+class WatchSession:
+    """
+    A local directory loaded once and kept warm: its file list, every file's
+    static findings per tool, per-file categorized issues and (deep/auto
+    profiles) per-file LLM reviews stay in memory. update() re-runs only the
+    analyzers and files a change touches, then rebuilds the report from the
+    cached parts; the report equals a full non-sharded scan of the tree.
+    """
+
+    def __init__(self, repo_path: str, profile: str = "fast", baseline: Optional[str] = None):
+        self.repo_path = os.path.abspath(repo_path)
+        if not os.path.isdir(self.repo_path):
+            raise ValueError(f"Not a directory: {repo_path}")
+        self.profile = normalize_profile(profile)
+        self.review = self.profile != "fast"
+        self.baseline = find_baseline(self.repo_path, os.path.abspath(baseline) if baseline else None)
+        self._baseline_stamp = _stamp(self.baseline) if self.baseline else None
+
+        self.code_files: List[str] = []
+        self.targets: List[str] = []
+        self._stamps: Dict[str, Optional[tuple]] = {}
+        self._static: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}  # rel -> tool -> issues
+        self._prints: Dict[str, Any] = {}                              # abs -> clone fingerprints
+        self._reviews: Dict[str, Dict[str, Any]] = {}                  # rel -> LLM review of the file
+        self._records: Dict[str, List[Any]] = {}                       # rel -> categorized IssueRecords
+        self._suppressed: Dict[str, Dict[str, int]] = {}               # rel -> baseline hits per tool
+        self.graph = None
+        self.repo_summary: Dict[str, Any] = {}
+        self.report: Dict[str, Any] = {}
+        self.version = 0
+        self.last_update: Dict[str, Any] = {}
+        self.watcher_kind = None
+
+        start = time.perf_counter()
+        self._walk()
+        self._initial_scan()
+        self._refresh_repo()
+        self._review_files(top_flagged_files(self._kept_static(), top_n=WATCH_REVIEW_FILES))
+        self._categorize(set(self._static) | self._llm_files())
+        self._rebuild_report()
+        self.last_update = {"version": self.version, "files": len(self._stamps),
+                            "seconds": round(time.perf_counter() - start, 3)}
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(path, self.repo_path).replace(os.sep, "/")
+
+    def _walk(self):
+        self.code_files, _ = walk_code_files(self.repo_path)
+        self.targets = secret_scan_targets(self.repo_path) if SECRET_SCAN_ENABLED else []
+
+    def _initial_scan(self):
+        # Whole tree at once, with the same parallel batching as a scan
+        collect = submit_python_tools(self.repo_path, self.code_files)
+        for path in set(self.code_files) | set(self.targets):
+            self._stamps[path] = _stamp(path)
+        issues = list(collect())
+        for tool in ("radon", "flake8", "bandit"):
+            self._store(tool, python_files(self.code_files), [it for it in issues if it.get("tool") == tool])
+        if SECRET_SCAN_ENABLED:
+            self._store("secrets", self.targets, scan_secrets(self.repo_path))
+        if CLONE_DETECTION_ENABLED:
+            self._prints = {f[0]: f for f in fingerprint_files(self.code_files)}
+            self._store("clones", self.code_files, self._clone_issues())
+
+    def _store(self, tool: str, paths: List[str], issues: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Replaces `tool`'s findings for `paths` with `issues`; returns the files whose findings changed.
+        """
+        grouped = _by_file(issues, self.repo_path)
+        changed = set()
+        for rel in {self._rel(p) for p in paths} | set(grouped):
+            new = grouped.get(rel, [])
+            if tool in ("bandit", "flake8"):
+                new = _in_line_order(new)
+            tools = self._static.get(rel, {})
+            if tools.get(tool, []) != new:
+                changed.add(rel)
+            if new:
+                self._static.setdefault(rel, tools)[tool] = new
+            elif tools:
+                tools.pop(tool, None)
+                if not tools:
+                    del self._static[rel]
+        return changed
+
+    def _clone_issues(self) -> List[Dict[str, Any]]:
+        return clone_issues(self.repo_path, [self._prints[p] for p in self.code_files if p in self._prints])
+
+    def _kept_static(self, rels: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        baseline = load_baseline(self.baseline)
+        kept = []
+        for rel in self._static if rels is None else rels:
+            tools = self._static.get(rel, {})
+            issues = [it for tool in TOOLS for it in tools.get(tool, [])]
+            kept.extend(baseline.filter(issues)[0] if baseline is not None else issues)
+        return kept
+
+    def _llm_files(self) -> Set[str]:
+        return {it.get("file") or "<unknown>" for r in self._reviews.values() for it in r["llm_detected_issues"]}
+
+    def _review_files(self, rels: Iterable[str]) -> Set[str]:
+        """
+        (Re-)reviews each file with the LLM; returns the files whose LLM issues may have changed.
+        """
+        touched = set()
+        if not self.review:
+            return touched
+        for rel in rels:
+            old = self._reviews.pop(rel, None)
+            if old is not None:
+                touched.update(it.get("file") or "<unknown>" for it in old["llm_detected_issues"])
+            path = os.path.join(self.repo_path, rel)
+            static = self._kept_static([rel])
+            if not os.path.isfile(path) or not static or not is_code_file(path):
+                continue
+            try:
+                result = llm_code_reviewer(
+                    self.repo_path, [path], self.repo_summary, static,
+                    max_files_with_snippets=1, dependency_graph=self.graph,
+                )
+            except Exception as e:
+                print(f"⚠️  LLM review of {rel} failed: {e}")
+                continue
+            self._reviews[rel] = result
+            touched.update(it.get("file") or "<unknown>" for it in result["llm_detected_issues"])
+        return touched
+
+    def _categorize(self, rels: Iterable[str]):
+        baseline = load_baseline(self.baseline)
+        llm_by_file: Dict[str, List[Dict[str, Any]]] = {}
+        for r in self._reviews.values():
+            for it in r["llm_detected_issues"]:
+                llm_by_file.setdefault(it.get("file") or "<unknown>", []).append(it)
+
+        for rel in rels:
+            tools = self._static.get(rel, {})
+            static = [it for tool in TOOLS for it in tools.get(tool, [])]
+            self._suppressed.pop(rel, None)
+            if baseline is not None:
+                static, summary = baseline.filter(static)
+                if summary["count"]:
+                    self._suppressed[rel] = summary["by_tool"]
+            records = merge_and_categorize_issues(static, llm_by_file.get(rel, []))
+            if records:
+                self._records[rel] = records
+            else:
+                self._records.pop(rel, None)
+
+    def _refresh_repo(self):
+        if DEP_GRAPH_ENABLED:
+            self.graph = build_dependency_graph(self.repo_path, self.code_files)
+        self.repo_summary = basic_repo_summary(self.repo_path, self.code_files, self.graph)
+
+    def _suppressed_summary(self) -> Optional[Dict[str, Any]]:
+        baseline = load_baseline(self.baseline)
+        if baseline is None:
+            return None
+        by_tool: Dict[str, int] = {}
+        for tool in TOOLS:
+            n = sum(counts.get(tool, 0) for counts in self._suppressed.values())
+            if n:
+                by_tool[tool] = n
+        return {
+            "count": sum(by_tool.values()),
+            "by_tool": by_tool,
+            "baseline_size": len(baseline),
+            "baseline": os.path.basename(self.baseline),
+        }
+
+    def _rebuild_report(self):
+        categorized = [rec for records in self._records.values() for rec in records]
+        categorized.sort(key=by_severity)
+        categorized_summary = summarize_categorized(categorized)
+        prioritized = assign_priorities(categorized, file_centrality(self.graph))
+
+        state = {
+            "repo_summary": self.repo_summary,
+            "prioritized_issues": prioritized,
+            "priority_summary": summarize_priorities(prioritized),
+            "categorized_summary": categorized_summary,
+            "profile": self.profile,
+            "llm_stage": "run" if self.review else "skip",
+            "routing_reason": None if self.review else "fast profile: static analysis only",
+            "dependency_graph": self.graph,
+            "suppressed": self._suppressed_summary(),
+        }
+        if self.review and self._reviews:
+            scores = [r["overall_quality_score"] for r in self._reviews.values()]
+            state["overall_quality_score"] = round(sum(scores) / len(scores), 2)
+        self.report = aggregator_node(state)["final_output"]
+        self.version += 1
+
+    def update(self, paths: Optional[Iterable[str]] = None) -> bool:
+        """
+        Brings the session up to date with the files at `paths` (absolute;
+        None checks the whole tree). Only files whose (mtime, size) changed
+        are analyzed again. Returns True when the report was rebuilt.
+        """
+        start = time.perf_counter()
+        known = self._stamps
+        candidates = set(known) if paths is None else {os.path.abspath(p) for p in paths}
+
+        # New, deleted or moved files and directories change the file list itself
+        rewalk = paths is None or any(
+            os.path.isdir(p) or (p not in known and (is_code_file(p) or is_secret_target(p)))
+            or (p in known and not os.path.exists(p))
+            or (not os.path.exists(p) and any(k.startswith(p + os.sep) for k in known))
+            for p in candidates
+        )
+        old_code_files = self.code_files
+        if rewalk:
+            self._walk()
+            current = set(self.code_files) | set(self.targets)
+            candidates = current | set(known)
+        else:
+            current = set(known)
+
+        changed = set()
+        for p in candidates:
+            if p not in current:
+                if p in known:
+                    changed.add(p)
+                    del known[p]
+                continue
+            stamp = _stamp(p)
+            if p not in known or known[p] != stamp:
+                known[p] = stamp
+                changed.add(p)
+        # An edited baseline changes what every file suppresses
+        baseline_stamp = _stamp(self.baseline) if self.baseline else None
+        baseline_changed = baseline_stamp != self._baseline_stamp
+        self._baseline_stamp = baseline_stamp
+        if not changed and not baseline_changed:
+            return False
+
+        code_set, target_set = set(self.code_files), set(self.targets)
+        code_changed = [p for p in changed if p in code_set or not os.path.exists(p) and is_code_file(p)]
+        py = sorted(p for p in python_files(code_changed) if p in code_set)
+        dirty = set()
+
+        # Bandit/Flake8 through their Python APIs: no process start per save
+        if any(p.endswith(".py") for p in code_changed):
+            dirty |= self._store("bandit", python_files(code_changed), run_bandit_inprocess(self.repo_path, py) if py else [])
+            dirty |= self._store("flake8", python_files(code_changed), run_flake8_inprocess(self.repo_path, py) if py else [])
+            dirty |= self._store("radon", python_files(code_changed), run_radon_files(py))
+        if SECRET_SCAN_ENABLED:
+            secret_changed = [p for p in changed if p in target_set or not os.path.exists(p)]
+            dirty |= self._store("secrets", secret_changed, scan_files([p for p in secret_changed if p in target_set]))
+        if code_changed or self.code_files != old_code_files:
+            if CLONE_DETECTION_ENABLED:
+                # Only changed files are tokenized again; matching needs the whole index
+                for p in code_changed:
+                    self._prints.pop(p, None)
+                missing = [p for p in self.code_files if p not in self._prints]
+                self._prints.update((f[0], f) for f in fingerprint_files(missing))
+                self._prints = {p: self._prints[p] for p in self.code_files if p in self._prints}
+                dirty |= self._store("clones", self.code_files + code_changed, self._clone_issues())
+            self._refresh_repo()
+
+        changed_rels = {self._rel(p) for p in changed}
+        dirty |= changed_rels
+        dirty |= self._review_files(changed_rels & ({self._rel(p) for p in code_changed} | set(self._reviews)))
+        if baseline_changed:
+            dirty |= set(self._static) | set(self._records)
+        self._categorize(dirty)
+        self._rebuild_report()
+
+        self.last_update = {
+            "version": self.version,
+            "files": sorted(changed_rels),
+            "recategorized": len(dirty),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        return True
+
+    def watch(self, timeout: float = 1.0, watcher=None) -> Iterator[Dict[str, Any]]:
+        """
+        Follows filesystem changes forever, yielding last_update after every
+        rebuilt report (session.report holds the report itself).
+        """
+        watcher = watcher or make_watcher(self.repo_path)
+        self.watcher_kind = watcher.kind
+        try:
+            while True:
+                paths = watcher.changes(timeout)
+                if paths is None:
+                    print("⚠️  Missed filesystem events; re-checking the whole tree")
+                if (paths is None or paths) and self.update(paths):
+                    yield self.last_update
+        finally:
+            watcher.close()
@@ -0,0 +1,194 @@
+# repo_tools/workspace.py
+import os
+import shutil
+import tempfile
+import threading
+import atexit
+import uuid
+from contextlib import contextmanager
+from typing import Optional, List
+
+# Root for on-disk job directories (defaults to the system temp dir)
+WORKSPACE_ROOT = os.getenv("AUDITOR_WORKSPACE_ROOT") or tempfile.gettempdir()
+
+# RAM-backed root used for small repos ("" disables it)
+TMPFS_ROOT = os.getenv("AUDITOR_TMPFS_ROOT", "/dev/shm")
+
+# Repos whose expanded size is at or below this go to TMPFS_ROOT
+TMPFS_MAX_BYTES = int(os.getenv("AUDITOR_TMPFS_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Hard cap on bytes written into a single workspace (0 = unlimited)
+WORKSPACE_QUOTA_BYTES = int(os.getenv("AUDITOR_WORKSPACE_QUOTA_BYTES", str(1024 * 1024 * 1024)))
+
+
+class WorkspaceQuotaExceeded(Exception):
+    """Raised when a job tries to put more data in its workspace than allowed."""
+
+
+def dir_size(path: str) -> int:
+    """
+    Total size in bytes of all regular files below `path`.
+    """
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.lstat(os.path.join(root, f)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class Workspace:
+    """
+    Per-job scratch space. Owns one disk directory plus any extra
+    directories it allocates (e.g. on tmpfs) and removes all of them on cleanup().
+    """
+
+    def __init__(self, manager: "WorkspaceManager", job_id: str, path: str):
+        self.manager = manager
+        self.job_id = job_id
+        self.path = path
+        self._dirs: List[str] = [path]
+        self._closed = False
+
+    @property
+    def quota_bytes(self) -> int:
+        return self.manager.quota_bytes
+
+    def file_path(self, name: str) -> str:
+        """
+        Path for a single file inside the disk directory (e.g. an uploaded ZIP).
+        Only the basename of `name` is used so callers can't escape the workspace.
+        """
+        safe = os.path.basename(name or "") or "upload"
+        return os.path.join(self.path, safe)
+
+    def make_dir(self, prefix: str = "repo_", size_hint: Optional[int] = None) -> str:
+        """
+        Allocate a new directory for this job. Small payloads (size_hint <=
+        TMPFS_MAX_BYTES) are placed on the RAM-backed root when available.
+        """
+        self.reserve(size_hint or 0)
+        root = self.path
+        if size_hint is not None and self.manager.use_tmpfs_for(size_hint):
+            root = self.manager.tmpfs_root
+        d = tempfile.mkdtemp(prefix=f"{prefix}{self.job_id}_", dir=root)
+        if d not in self._dirs:
+            self._dirs.append(d)
+        return d
+
+    def used_bytes(self) -> int:
+        return sum(dir_size(d) for d in self._dirs if os.path.isdir(d))
+
+    def reserve(self, nbytes: int):
+        """
+        Fail fast if adding `nbytes` would push the workspace over its quota.
+        """
+        quota = self.quota_bytes
+        if quota and nbytes and self.used_bytes() + nbytes > quota:
+            raise WorkspaceQuotaExceeded(
+                f"Workspace {self.job_id} would exceed quota of {quota} bytes"
+            )
+
+    def check_quota(self):
+        """
+        Verify the bytes actually on disk are within quota (used after git clones,
+        where the size is not known in advance).
+        """
+        quota = self.quota_bytes
+        if quota:
+            used = self.used_bytes()
+            if used > quota:
+                raise WorkspaceQuotaExceeded(
+                    f"Workspace {self.job_id} uses {used} bytes, quota is {quota} bytes"
+                )
+
+    def cleanup(self):
+        if self._closed:
+            return
+        self._closed = True
+        for d in reversed(self._dirs):
+            shutil.rmtree(d, ignore_errors=True)
+        self.manager._forget(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+
+class WorkspaceManager:
+    """
+    Creates uniquely named per-job workspaces and guarantees their removal,
+    either when the job ends or, as a last resort, when the process exits.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        tmpfs_root: Optional[str] = None,
+        tmpfs_max_bytes: Optional[int] = None,
+        quota_bytes: Optional[int] = None,
+    ):
+        self.root = root or WORKSPACE_ROOT
+        self.tmpfs_root = TMPFS_ROOT if tmpfs_root is None else tmpfs_root
+        self.tmpfs_max_bytes = TMPFS_MAX_BYTES if tmpfs_max_bytes is None else tmpfs_max_bytes
+        self.quota_bytes = WORKSPACE_QUOTA_BYTES if quota_bytes is None else quota_bytes
+        self._live = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def use_tmpfs_for(self, size_hint: int) -> bool:
+        return bool(
+            self.tmpfs_root
+            and os.path.isdir(self.tmpfs_root)
+            and os.access(self.tmpfs_root, os.W_OK)
+            and size_hint <= self.tmpfs_max_bytes
+        )
+
+    def create(self) -> Workspace:
+        job_id = uuid.uuid4().hex[:12]
+        path = tempfile.mkdtemp(prefix=f"job_{job_id}_", dir=self.root)
+        ws = Workspace(self, job_id, path)
+        with self._lock:
+            self._live[job_id] = ws
+        return ws
+
+    @contextmanager
+    def job(self):
+        """
+        with manager.job() as ws: ...  -> everything under ws is removed afterwards.
+        """
+        ws = self.create()
+        try:
+            yield ws
+        finally:
+            ws.cleanup()
+
+    def _forget(self, ws: Workspace):
+        with self._lock:
+            self._live.pop(ws.job_id, None)
+
+    def cleanup_all(self):
+        with self._lock:
+            live = list(self._live.values())
+        for ws in live:
+            ws.cleanup()
+
+
+_default_manager: Optional[WorkspaceManager] = None
+_default_lock = threading.Lock()
+
+
+def get_workspace_manager() -> WorkspaceManager:
+    """
+    Process-wide manager configured from the AUDITOR_* environment variables.
+    """
+    global _default_manager
+    with _default_lock:
+        if _default_manager is None:
+            _default_manager = WorkspaceManager()
+            atexit.register(_default_manager.cleanup_all)
+        return _default_manager
@@ -0,0 +1,9 @@
+# tests/conftest.py
+import os
+import sys
+
+# Run from anywhere: the repo root holds the graphs/ and repo_tools/ packages
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Interactive scratch scripts (they prompt for GOOGLE_API_KEY), not tests
+collect_ignore = ["test.py", "test_2.py", "tools.py"]
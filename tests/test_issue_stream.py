@@ -0,0 +1,118 @@
+import json
+import os
+import textwrap
+
+import pytest
+
+import repo_tools.issue_stream as issue_stream
+import repo_tools.llm_client as llm_client
+import repo_tools.repo_loader as repo_loader
+import repo_tools.static_digest as static_digest
+from graphs.full_pipeline import build_full_pipeline
+from repo_tools.issue_record import json_default
+from repo_tools.review_cascade import MODEL_TIERS
+
+
+RISKY = textwrap.dedent('''
+    import os, pickle, subprocess
+    password = "Zq8kLm2Pw9xT4vR7"
+
+
+    def load(blob):
+        return pickle.loads(blob)
+
+
+    def run(cmd):
+        return subprocess.call(cmd, shell=True)
+
+
+    def tangled(a, b, c, d):
+        if a:
+            if b:
+                for i in range(c):
+                    if i % 2 and d:
+                        a += 1
+                    elif i % 3:
+                        b += 1
+                    elif i % 5 or c:
+                        c += 1
+                    else:
+                        d -= 1
+            elif c:
+                while c > 0 and d:
+                    c -= 1
+        elif b and c or d:
+            return eval(str(a))
+        return a, b, c, d
+''')
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    # Duplicated modules give the dedup and clone stages something to fold
+    root = tmp_path / "repo"
+    for pkg in ("core", "plugins"):
+        os.makedirs(root / pkg)
+        for i in range(3):
+            (root / pkg / f"mod{i}.py").write_text(RISKY + f"\nvalue_{i}=1;unused = {i}\n")
+    (root / "settings.yml").write_text("aws_secret_access_key: AKIAIOSFODNN7EXAMPLEQ\n")
+    # Both pipelines scan this same directory in place (identical walk order)
+    monkeypatch.setattr(repo_loader, "extract_zip", lambda path, workspace=None: str(root))
+    return root
+
+
+def _scan(stream_issues):
+    state = build_full_pipeline(profile="fast", stream_issues=stream_issues).invoke(
+        {"repo_input": "repo.zip", "sharding": False}
+    )
+    return state, json.dumps(state["final_output"], indent=2, default=json_default).encode()
+
+
+@pytest.mark.parametrize("budget", [100000, 3])
+def test_streamed_report_matches_in_memory(repo, monkeypatch, budget):
+    monkeypatch.setattr(issue_stream, "ISSUE_MEMORY_BUDGET", budget)
+
+    _, expected = _scan(stream_issues=False)
+    state, streamed = _scan(stream_issues=True)
+
+    # The analyzer node fed the stream; the issue stage only finished it
+    assert state["issue_stream"] is not None
+    ranked = state["prioritized_issues"]
+    assert isinstance(ranked, issue_stream.RankedIssues)
+    assert ranked.spilled == (budget < len(ranked))
+    assert len(ranked) > 20
+    assert streamed == expected
+
+
+def test_streaming_state_holds_only_a_sample(repo, monkeypatch):
+    monkeypatch.setattr(issue_stream, "ISSUE_MEMORY_BUDGET", 3)
+    monkeypatch.setattr(static_digest, "STATIC_SAMPLE_SIZE", 5)
+    monkeypatch.setattr(static_digest, "STATIC_SAMPLE_PER_FILE", 2)
+
+    in_memory, _ = _scan(stream_issues=False)
+    state, _ = _scan(stream_issues=True)
+    total = len(in_memory["static_issues"])
+    assert total > 20 and state["prioritized_issues"].spilled
+
+    # No state value keeps the analyzers' full output around
+    assert len(state["static_issues"]) == 5
+    assert not any(isinstance(v, list) and len(v) >= total for v in state.values())
+    digest = state["static_digest"]
+    assert sum(digest.file_counts.values()) == total
+    assert all(len(kept) <= 2 for kept in digest._file_samples.values())
+
+
+def test_streamed_deep_report_matches_in_memory(repo, monkeypatch):
+    # The risk prepass, router and reviewer read the digest instead of the list
+    monkeypatch.setattr(llm_client, "LLM_BACKEND", "stub")
+    monkeypatch.setattr(llm_client, "_models", {})
+    for tier in MODEL_TIERS.values():
+        llm_client.get_model(tier["model"])
+
+    deep = {"repo_input": "repo.zip", "profile": "deep", "sharding": False}
+    expected = build_full_pipeline(stream_issues=False).invoke(dict(deep))
+    streamed = build_full_pipeline(stream_issues=True).invoke(dict(deep))
+    assert streamed["risk_scores"] == expected["risk_scores"]
+    assert streamed.get("llm_routing") == expected.get("llm_routing")
+    assert (json.dumps(streamed["final_output"], default=json_default)
+            == json.dumps(expected["final_output"], default=json_default))
@@ -0,0 +1,106 @@
+# tests/test_job_queue.py
+import os
+import time
+import uuid
+import multiprocessing
+
+import pytest
+
+from repo_tools.job_queue import SQLiteJobQueue, RedisJobQueue, QUEUED, RUNNING, DONE, FAILED
+
+# Redis tests run only against a server you point them at (they use a unique key prefix)
+REDIS_URL = os.getenv("AUDITOR_TEST_REDIS_URL")
+
+
+def _open(kind, tmp_path):
+    if kind == "sqlite":
+        return SQLiteJobQueue(str(tmp_path / "jobs.db"))
+    return RedisJobQueue(REDIS_URL, prefix=f"auditor-test-{uuid.uuid4().hex}:")
+
+
+@pytest.fixture(params=[
+    "sqlite",
+    pytest.param("redis", marks=pytest.mark.skipif(not REDIS_URL, reason="AUDITOR_TEST_REDIS_URL not set")),
+])
+def queue_spec(request, tmp_path):
+    return request.param, tmp_path
+
+
+@pytest.fixture
+def queue(queue_spec):
+    q = _open(*queue_spec)
+    yield q
+    if isinstance(q, RedisJobQueue):
+        for key in q.r.scan_iter(q.prefix + "*"):
+            q.r.delete(key)
+
+
+def _claim_and_crash(kind, tmp_path, worker_id, result):
+    # A worker process that takes a job and dies without completing it
+    job = _open(kind, tmp_path).claim(worker_id, visibility_timeout=0.3)
+    result.put(job["id"] if job else None)
+
+
+def test_lease_expires_and_job_is_reclaimed(queue, queue_spec):
+    job_id = queue.enqueue({"n": 1})
+    result = multiprocessing.Queue()
+    p = multiprocessing.Process(target=_claim_and_crash, args=(*queue_spec, "crashed", result))
+    p.start()
+    p.join(30)
+    assert result.get(timeout=5) == job_id
+
+    assert queue.claim("other", visibility_timeout=5) is None  # lease still valid
+    time.sleep(0.4)
+    job = queue.claim("other", visibility_timeout=5)
+    assert job["id"] == job_id and job["attempts"] == 2
+    assert queue.get(job_id)["worker_id"] == "other"
+
+
+def test_previous_owner_cannot_touch_reclaimed_job(queue):
+    job_id = queue.enqueue({"n": 1})
+    queue.claim("a", visibility_timeout=0.1)
+    time.sleep(0.2)
+    assert queue.claim("b", visibility_timeout=5)["id"] == job_id
+
+    assert queue.heartbeat(job_id, "a") is False
+    assert queue.complete(job_id, "a") is False
+    assert queue.fail(job_id, "a", "boom") == FAILED
+    # Still b's, and not queued a second time by a's late fail()
+    assert queue.get(job_id)["status"] == RUNNING
+    assert queue.claim("c", visibility_timeout=5) is None
+    assert queue.complete(job_id, "b") is True
+    assert queue.get(job_id)["status"] == DONE
+
+
+def test_retries_until_max_attempts(queue):
+    job_id = queue.enqueue({"n": 1}, max_attempts=3)
+    statuses = []
+    for attempt in range(1, 4):
+        job = queue.claim("w", visibility_timeout=5)
+        assert job["id"] == job_id and job["attempts"] == attempt
+        statuses.append(queue.fail(job_id, "w", f"error {attempt}"))
+    assert statuses == [QUEUED, QUEUED, FAILED]
+    assert queue.claim("w", visibility_timeout=5) is None
+    info = queue.get(job_id)
+    assert info["status"] == FAILED and info["attempts"] == 3 and info["error"] == "error 3"
+
+
+def test_expired_leases_count_as_attempts(queue):
+    job_id = queue.enqueue({"n": 1}, max_attempts=2)
+    for _ in range(2):
+        assert queue.claim("w", visibility_timeout=0.05)["id"] == job_id
+        time.sleep(0.1)
+    assert queue.claim("w", visibility_timeout=5) is None
+    assert queue.get(job_id)["status"] == FAILED
+
+
+def test_heartbeat_extends_lease(queue):
+    job_id = queue.enqueue({"n": 1})
+    queue.claim("a", visibility_timeout=0.3)
+    for _ in range(4):
+        time.sleep(0.15)
+        assert queue.heartbeat(job_id, "a", visibility_timeout=0.3) is True
+    # 0.6s after the claim, well past the first lease, the job is still a's
+    assert queue.claim("b", visibility_timeout=5) is None
+    assert queue.complete(job_id, "a") is True
+    assert queue.counts() == {DONE: 1}
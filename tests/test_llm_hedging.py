@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+import repo_tools.llm_client as llm_client
+from repo_tools.llm_client import Hedger, RateLimiter, generate_content
+from repo_tools.stub_llm import StubModel
+
+
+class _Scripted:
+    """
+    Hands the n-th request to the n-th stub (the last one for the rest).
+    """
+
+    def __init__(self, *models):
+        self.models = models
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        model = self.models[min(self.calls, len(self.models) - 1)]
+        self.calls += 1
+        return model.generate_content(prompt, **kwargs)
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_BACKEND", "stub")
+    monkeypatch.setattr(llm_client, "LLM_HEDGE", True)
+    monkeypatch.setattr(llm_client, "_models", {})
+
+    def install(model, **hedger_args):
+        llm_client._models["stub"] = model
+        monkeypatch.setattr(llm_client, "hedger", Hedger(**hedger_args))
+        return llm_client.hedger
+
+    return install
+
+
+def _free_slots(limiter):
+    n = 0
+    while limiter.try_acquire():
+        n += 1
+    for _ in range(n):
+        limiter.__exit__(None, None, None)
+    return n
+
+
+def test_threshold_follows_recent_latencies():
+    hedger = Hedger(percentile=95, initial_delay_ms=1000, min_delay_ms=50)
+    key = ("generate", "stub")
+    assert hedger.begin(key) == 1.0
+
+    # Too few samples: still the initial delay
+    for ms in range(10, 200, 10):
+        hedger.record(key, ms / 1000.0, hedge_won=False)
+    assert hedger.begin(key) == 1.0
+
+    hedger.record(key, 0.2, hedge_won=False)
+    assert hedger.begin(key) == pytest.approx(0.2)
+
+    # Never below the configured minimum
+    fast = Hedger(percentile=95, min_delay_ms=50)
+    for _ in range(30):
+        fast.record(key, 0.001, hedge_won=False)
+    assert fast.begin(key) == pytest.approx(0.05)
+
+
+def test_hedge_wins_and_primary_keeps_its_slot(hedging):
+    slow = StubModel(slow_rate=1.0, slow_ms=600)
+    hedger = hedging(_Scripted(slow, StubModel()), initial_delay_ms=50)
+    limiter = RateLimiter(rpm=0, max_concurrency=2)
+
+    start = time.monotonic()
+    generate_content("hello", "stub", limiter=limiter)
+    assert time.monotonic() - start < 0.5
+
+    stats = hedger.stats()
+    assert (stats["calls"], stats["hedged"], stats["hedge_wins"]) == (1, 1, 1)
+    assert stats["models"]["generate:stub"]["hedge_win_rate"] == 1.0
+
+    # The winner's thread ends right after the call; the losing primary is
+    # still waiting on the model, and still holds its slot
+    time.sleep(0.05)
+    assert _free_slots(limiter) == 1
+    time.sleep(0.8)
+    assert _free_slots(limiter) == 2
+
+
+def test_hedges_capped_by_rate_and_free_slots(hedging):
+    hedger = hedging(StubModel(slow_rate=1.0, slow_ms=100), initial_delay_ms=10, max_rate=0.0)
+    limiter = RateLimiter(rpm=0, max_concurrency=2)
+
+    for _ in range(4):
+        generate_content("hello", "stub", limiter=limiter)
+    time.sleep(0.2)
+
+    # max_rate=0 allows a single hedge (the cap is max_rate * calls + 1)
+    stats = hedger.stats()
+    assert (stats["calls"], stats["hedged"], stats["not_hedged"]) == (4, 1, 3)
+    assert _free_slots(limiter) == 2
+
+    # With one slot, the primary holds it: nothing is left to hedge with
+    hedger = hedging(StubModel(slow_rate=1.0, slow_ms=100), initial_delay_ms=10, max_rate=1.0)
+    single = RateLimiter(rpm=0, max_concurrency=1)
+    generate_content("hello", "stub", limiter=single)
+    stats = hedger.stats()
+    assert (stats["hedged"], stats["not_hedged"]) == (0, 1)
+    time.sleep(0.05)
+    assert _free_slots(single) == 1
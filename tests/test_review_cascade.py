@@ -0,0 +1,101 @@
+import pytest
+
+import repo_tools.llm_client as llm_client
+from repo_tools.llm_code_reviewer_agent import llm_code_reviewer
+from repo_tools.review_cascade import MODEL_TIERS, batch_risk_reason, escalation_reason
+from repo_tools.static_digest import StaticDigest
+
+
+def _triage(**issue):
+    return {"llm_detected_issues": [dict({"file": "a.py"}, **issue)]}
+
+
+@pytest.mark.parametrize("issue, escalate", [
+    # A security finding the triage model is sure of stays with it
+    ({"category": "security", "severity": "low", "confidence": 0.95}, False),
+    ({"category": "bug", "severity": "high", "confidence": 0.95}, False),
+    ({"category": "bug", "severity": "medium", "confidence": 0.75}, False),
+    # Severe findings need more confidence than the rest
+    ({"category": "bug", "severity": "critical", "confidence": 0.8}, True),
+    ({"category": "style", "severity": "low", "confidence": 0.5}, True),
+    ({"category": "style", "severity": "low"}, True),
+    # High-risk findings escalate however sure the triage model is
+    ({"category": "security", "severity": "high", "confidence": 0.99}, True),
+    ({"category": "bug", "severity": "critical", "confidence": 0.99}, True),
+])
+def test_escalation_combines_risk_severity_and_confidence(issue, escalate):
+    assert (escalation_reason(_triage(**issue)) is not None) == escalate
+
+
+def test_malformed_triage_escalates():
+    assert escalation_reason({"llm_detected_issues": [], "raw_response": "{"}) is not None
+
+
+def test_risky_batches_skip_triage():
+    digest = StaticDigest.of([
+        {"file": "a.py", "line": 1, "type": "security", "severity": "MEDIUM"},
+        {"file": "b.py", "line": 1, "type": "security", "severity": "HIGH"},
+        {"file": "c.py", "line": 1, "type": "complexity", "severity": "HIGH"},
+    ])
+    snippets = {"a.py": {"risk_score": 30.0}, "b.py": {}, "c.py": {}, "d.py": {"risk_score": 75.0}}
+    assert batch_risk_reason(["a.py", "c.py"], snippets, digest) is None
+    assert "static security finding in b.py" in batch_risk_reason(["a.py", "b.py"], snippets, digest)
+    assert "risk score 75.0" in batch_risk_reason(["c.py", "d.py"], snippets, digest)
+
+
+@pytest.fixture
+def stub_models(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_BACKEND", "stub")
+    monkeypatch.setattr(llm_client, "_models", {})
+    # Created up front: concurrent triage calls would otherwise race to create them
+    return {tier["model"]: llm_client.get_model(tier["model"]) for tier in MODEL_TIERS.values()}
+
+
+def test_escalated_batches_share_one_review_call(tmp_path, stub_models):
+    # Flagged in this order, so the triage batches are [a, b], [c, d], [e, f]
+    names = ["a.py", "b.py", "c.py", "d.py", "e.py", "f.py"]
+    risky = {"b.py", "e.py"}
+    code_files, static_issues = [], []
+    for rank, name in enumerate(names):
+        path = tmp_path / name
+        body = "def run(x):\n    return eval(x)\n" if name in risky else "def run(x):\n    return x\n"
+        path.write_text(body)
+        code_files.append(str(path))
+        static_issues += [{"file": name, "line": 2, "tool": "flake8"}] * (len(names) - rank)
+
+    result = llm_code_reviewer(str(tmp_path), code_files, {}, static_issues)
+
+    routing = result["routing"]
+    assert [b["files"] for b in routing["batches"]] == [["a.py", "b.py"], ["c.py", "d.py"], ["e.py", "f.py"]]
+    assert [b["escalated"] for b in routing["batches"]] == [True, False, True]
+    assert [b["model"] for b in routing["batches"]] == [
+        MODEL_TIERS["review"]["model"], MODEL_TIERS["triage"]["model"], MODEL_TIERS["review"]["model"],
+    ]
+
+    # One triage call per batch, one strong-model call for both escalated batches
+    assert stub_models[MODEL_TIERS["triage"]["model"]].calls == 3
+    assert stub_models[MODEL_TIERS["review"]["model"]].calls == 1
+
+    # The strong model's issues take the first escalated batch's place
+    assert [it["file"] for it in result["llm_detected_issues"]] == ["a.py", "b.py", "e.py", "f.py", "c.py", "d.py"]
+
+
+def test_severe_static_finding_goes_straight_to_review(tmp_path, stub_models):
+    names = ["a.py", "b.py", "c.py", "d.py"]
+    code_files, static_issues = [], []
+    for rank, name in enumerate(names):
+        path = tmp_path / name
+        path.write_text("def run(x):\n    return x\n")
+        code_files.append(str(path))
+        static_issues += [{"file": name, "line": 2, "tool": "flake8"}] * (len(names) - rank)
+    static_issues.append({"file": "c.py", "line": 1, "tool": "bandit", "type": "security", "severity": "HIGH"})
+
+    result = llm_code_reviewer(str(tmp_path), code_files, {}, static_issues)
+
+    routing = result["routing"]
+    assert [b["files"] for b in routing["batches"]] == [["a.py", "b.py"], ["c.py", "d.py"]]
+    assert [b["escalated"] for b in routing["batches"]] == [False, True]
+    assert routing["batches"][1]["reason"] == "high static security finding in c.py"
+    # The risky batch was never triaged
+    assert stub_models[MODEL_TIERS["triage"]["model"]].calls == 1
+    assert stub_models[MODEL_TIERS["review"]["model"]].calls == 1
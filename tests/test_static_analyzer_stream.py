@@ -0,0 +1,36 @@
+import threading
+
+import repo_tools.static_analyzer_agent as static_analyzer_agent
+from repo_tools.static_analyzer_agent import submit_python_tools
+
+
+COMPLEX = "def f(a, b, c, d, e):\n" + "".join(
+    f"    if a == {i} or b == {i}:\n        return {i}\n" for i in range(8)
+) + "    return 0\n"
+
+
+def test_issues_flow_while_bandit_runs(tmp_path, monkeypatch):
+    files = []
+    for i in range(3):
+        path = tmp_path / f"m{i}.py"
+        path.write_text(COMPLEX + "x=1\n")
+        files.append(str(path))
+
+    bandit_exits = threading.Event()
+
+    def slow_bandit(repo_path, files=None):
+        # Bandit only reports when it exits; hold it until Radon's and Flake8's issues are out
+        assert bandit_exits.wait(10)
+        yield {"file": files[0], "line": 1, "type": "security", "tool": "bandit", "severity": "HIGH"}
+
+    monkeypatch.setattr(static_analyzer_agent, "iter_bandit", slow_bandit)
+
+    seen = []
+    for issue in submit_python_tools(str(tmp_path), files)():
+        seen.append(issue["tool"])
+        if issue["tool"] == "flake8" and not bandit_exits.is_set():
+            bandit_exits.set()
+
+    # Everything but Bandit's issue was out before Bandit exited
+    assert seen[:3] == ["radon"] * 3
+    assert "flake8" in seen and seen.count("bandit") == 1 and seen[-1] == "bandit"
@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import textwrap
+
+import pytest
+
+import repo_tools.repo_loader as repo_loader
+from graphs.full_pipeline import build_full_pipeline
+from repo_tools.baseline import write_baseline
+from repo_tools.issue_record import json_default
+from repo_tools.watch_session import WatchSession
+
+
+MODULE = textwrap.dedent('''
+    import os, subprocess
+
+
+    def run(cmd):
+        return subprocess.call(cmd, shell=True)
+
+
+    def pick(a, b, c):
+        if a and b:
+            for i in range(c):
+                if i % 2:
+                    a += 1
+                elif i % 3 or b:
+                    b += 1
+                else:
+                    c -= 1
+        elif c:
+            return eval(str(a))
+        return a,b,c
+''')
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    root = tmp_path / "repo"
+    for pkg in ("app", "lib"):
+        os.makedirs(root / pkg)
+        for i in range(3):
+            (root / pkg / f"m{i}.py").write_text(MODULE + f"\nflag_{i}=True;x = {i}\n")
+    (root / "app" / "main.py").write_text("import app.m0\n\nprint( app.m0.run('ls'))\n")
+    # The full pipeline scans the watched tree in place (same walk order)
+    monkeypatch.setattr(repo_loader, "extract_zip", lambda path, workspace=None: str(root))
+    return root
+
+
+@pytest.fixture
+def full_report():
+    pipeline = build_full_pipeline(profile="fast")
+
+    def scan():
+        state = pipeline.invoke({"repo_input": "repo.zip", "profile": "fast", "sharding": False})
+        return json.loads(json.dumps(state["final_output"], default=json_default))
+
+    return scan
+
+
+def _same(session, full_report):
+    assert json.loads(json.dumps(session.report, default=json_default)) == full_report()
+
+
+def test_updates_match_a_full_scan(repo, full_report):
+    session = WatchSession(str(repo), profile="fast")
+    assert session.report["total_issues"] > 20
+    _same(session, full_report)
+
+    modified = str(repo / "app" / "m1.py")
+    with open(modified, "a") as f:
+        f.write("\n\ndef risky(x):\n    password = 'hunter2hunter2'\n    return eval(x)\n")
+    assert session.update([modified])
+    _same(session, full_report)
+
+    created = str(repo / "lib" / "copy.py")
+    shutil.copy(str(repo / "app" / "m0.py"), created)
+    assert session.update([created])
+    _same(session, full_report)
+
+    deleted = str(repo / "lib" / "m2.py")
+    os.remove(deleted)
+    assert session.update([deleted])
+    _same(session, full_report)
+
+    os.makedirs(repo / "conf")
+    (repo / "conf" / "settings.yml").write_text("aws_secret_access_key: AKIAIOSFODNN7EXAMPLEQ\n")
+    assert session.update([str(repo / "conf")])
+    _same(session, full_report)
+
+    # Nothing changed since the last update
+    assert not session.update([modified])
+
+
+def test_baseline_edits_match_a_full_scan(repo, full_report):
+    session = WatchSession(str(repo), profile="fast")
+    baseline = str(repo / ".auditor-baseline.json")
+    write_baseline(baseline, session.report["issues"][:10])
+
+    # A repo-root baseline is picked up by both a new session and the pipeline
+    session = WatchSession(str(repo), profile="fast")
+    assert session.report["suppressed"]["count"] == 10
+    _same(session, full_report)
+
+    modified = str(repo / "lib" / "m0.py")
+    with open(modified, "a") as f:
+        f.write("\nimport pickle\n\n\ndef load(b):\n    return pickle.loads(b)\n")
+    assert session.update([modified])
+    _same(session, full_report)
+
+    write_baseline(baseline, session.report["issues"][:25])
+    assert session.update([baseline])
+    _same(session, full_report)
+
+    session.update(None)
+    _same(session, full_report)
@@ -0,0 +1,145 @@
+import os
+import socket
+import argparse
+import threading
+import traceback
+
+from graphs.full_pipeline import build_full_pipeline
+from repo_tools.workspace import get_workspace_manager
+from repo_tools.job_queue import get_job_queue, get_result_store, VISIBILITY_TIMEOUT
+from repo_tools.issue_store import get_issue_store
+from repo_tools.scan_history import get_scan_history, project_name
+
+
+class ScanWorker:
+    """
+    Pulls scan jobs from the shared queue, runs the pipeline and writes the
+    report to the shared result store. Run any number of these, on any host,
+    against the same AUDITOR_QUEUE_URL / AUDITOR_RESULT_STORE.
+    """
+
+    def __init__(self, concurrency=1, visibility_timeout=VISIBILITY_TIMEOUT, poll_interval=1.0, queue=None, store=None,
+                 issue_store=None, history=None):
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.queue = queue or get_job_queue()
+        self.store = store or get_result_store()
+        self.issue_store = issue_store or get_issue_store()
+        self.history = history or get_scan_history()
+        self.pipeline = build_full_pipeline()
+        self._stop = threading.Event()
+        self.processed = 0
+        self._lock = threading.Lock()
+
+    def stop(self):
+        self._stop.set()
+
+    def _heartbeat(self, job_id, done: threading.Event):
+        # Renew the lease well before it expires; stops once the job finishes
+        interval = max(self.visibility_timeout / 3.0, 0.1)
+        while not done.wait(interval):
+            if not self.queue.heartbeat(job_id, self.worker_id, self.visibility_timeout):
+                print(f"⚠️  [{self.worker_id}] Lost lease on job {job_id}")
+                return
+
+    def run_job(self, job):
+        job_id, payload = job["id"], job["payload"]
+        print(f"📥 [{self.worker_id}] Job {job_id} (attempt {job['attempts']})")
+
+        done = threading.Event()
+        hb = threading.Thread(target=self._heartbeat, args=(job_id, done), daemon=True)
+        hb.start()
+
+        try:
+            with get_workspace_manager().job() as workspace:
+                inputs = {"workspace": workspace, "profile": payload.get("profile")}
+                if payload.get("git_url"):
+                    inputs["git_url"] = payload["git_url"]
+                else:
+                    inputs["repo_input"] = self.store.fetch_upload(
+                        job_id, workspace.file_path(payload.get("filename") or "upload.zip")
+                    )
+                if payload.get("sharding") is False:
+                    inputs["sharding"] = False
+
+                result = self.pipeline.invoke(inputs)
+
+                # Still inside the workspace: a streamed ranking is read from its run files
+                report = result.get("final_output", {})
+                self.store.put_result(job_id, report)
+                # The job id doubles as the scan id for /scan/{scan_id}/issues and history diffs
+                try:
+                    if self.issue_store is not None:
+                        self.issue_store.save_report(job_id, report)
+                    if self.history is not None:
+                        project = payload.get("project") or project_name(payload.get("git_url") or payload.get("filename"))
+                        self.history.record_scan(job_id, project, report, ref=payload.get("ref"))
+                except Exception as e:
+                    print(f"⚠️  [{self.worker_id}] Could not index job {job_id}: {e}")
+            done.set()
+            if self.queue.complete(job_id, self.worker_id):
+                self.store.delete_upload(job_id)
+                print(f"✅ [{self.worker_id}] Job {job_id} done")
+
+        except Exception as e:
+            done.set()
+            traceback.print_exc()
+            status = self.queue.fail(job_id, self.worker_id, str(e))
+            if status != "queued":
+                self.store.delete_upload(job_id)
+            print(f"❌ [{self.worker_id}] Job {job_id} failed ({status}): {e}")
+
+        finally:
+            done.set()
+            with self._lock:
+                self.processed += 1
+
+    def _slot(self, max_jobs, exit_when_idle):
+        # One slot = at most one job in flight, so `concurrency` bounds the worker
+        while not self._stop.is_set():
+            with self._lock:
+                if max_jobs and self.processed >= max_jobs:
+                    return
+            job = self.queue.claim(self.worker_id, self.visibility_timeout)
+            if job is None:
+                if exit_when_idle:
+                    return
+                self._stop.wait(self.poll_interval)
+                continue
+            self.run_job(job)
+
+    def run(self, max_jobs=0, exit_when_idle=False):
+        print(f"👷 Worker {self.worker_id} started (concurrency={self.concurrency})")
+        slots = [
+            threading.Thread(target=self._slot, args=(max_jobs, exit_when_idle), daemon=True)
+            for _ in range(self.concurrency)
+        ]
+        for t in slots:
+            t.start()
+        try:
+            for t in slots:
+                while t.is_alive():
+                    t.join(timeout=0.5)
+        except KeyboardInterrupt:
+            print("🛑 Stopping worker (running jobs will be retried elsewhere once their lease expires)")
+            self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI Code Auditor scan worker")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("AUDITOR_WORKER_CONCURRENCY", "1")),
+                        help="Max scans this worker runs at once")
+    parser.add_argument("--visibility-timeout", type=float, default=VISIBILITY_TIMEOUT,
+                        help="Seconds before an un-renewed job is handed to another worker")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--max-jobs", type=int, default=0, help="Exit after this many jobs (0 = run forever)")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args()
+
+    ScanWorker(
+        concurrency=args.concurrency,
+        visibility_timeout=args.visibility_timeout,
+        poll_interval=args.poll_interval,
+    ).run(max_jobs=args.max_jobs, exit_when_idle=args.exit_when_idle)